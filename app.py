@@ -1,15 +1,18 @@
 import streamlit as st
-import pandas as pd
-from datetime import datetime
-import io
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.pdfgen import canvas
-from reportlab.lib.units import inch, mm
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT
-from reportlab.lib import colors
-import base64
+import functools
+import os
+import sys
+import tempfile
+import uuid
+
+# Only the light modules load at startup: ReportLab is imported on the first
+# PDF render (get_pdf_cache) and pandas only when a batch export is read
+from cit_profile.fields import FORM_HEADERS, PROFILE_FIELDS, REQUIRED_FIELDS, field_label
+from cit_profile.forms import pdf_filename, row_to_record
+from cit_profile.metrics import METRICS, profile_call
+from cit_profile.preview import field_values, missing_fields, preview_html, summary_markdown
+from cit_profile.sheet import EXPORT_TYPES
+from cit_profile.text import create_text_profile
 
 # Set page config
 st.set_page_config(
@@ -50,188 +53,112 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-def create_pdf_profile(data):
-    import io
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
-    from reportlab.lib.pagesizes import A4
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib.enums import TA_CENTER
-    from reportlab.lib.units import inch
-    from reportlab.lib import colors
+# "canvas" draws the fixed layout directly; "platypus" is the original layout engine
+PDF_LAYOUT = os.environ.get("CIT_PDF_LAYOUT", "canvas")
+# How PDFs are written: "default", "email-small", "print" or "archive" (see cit_profile.output)
+PDF_OUTPUT = os.environ.get("CIT_PDF_OUTPUT", "default")
 
-    buffer = io.BytesIO()
-
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=A4,
-        rightMargin=25,
-        leftMargin=25,
-        topMargin=25,
-        bottomMargin=25
-    )
-
-    styles = getSampleStyleSheet()
-
-    header_style = ParagraphStyle(
-        "header",
-        fontSize=9,
-        alignment=TA_CENTER,
-        spaceAfter=4
-    )
-
-    title_style = ParagraphStyle(
-        "title",
-        fontSize=14,
-        alignment=TA_CENTER,
-        textColor=colors.HexColor("#0a7a3b"),
-        spaceAfter=10,
-        fontName="Helvetica-Bold"
-    )
-
-    label_style = ParagraphStyle(
-        "label",
-        fontSize=9,
-        fontName="Helvetica-Bold",
-        leading=11
-    )
-
-    value_style = ParagraphStyle(
-        "value",
-        fontSize=9,
-        fontName="Helvetica",
-        leading=11,
-        wordWrap="CJK"
-    )
-
-    content = []
-
-    # ---------- HEADER (LOGO LEFT, TEXT RIGHT) ----------
-    logo = Image("assets/logo.jpg", width=165, height=70)
-    
-    right_header = Paragraph(
-        """
-        <para align="right">
-        No. 37, 32nd Lane Colombo 06.<br/>
-        Tel: +94 11 236 1793 / +94 77 736 5964<br/>
-        Reg. No R/2552/C/238 (MRCA)
-        </para>
-        """,
-        ParagraphStyle(
-            "right_header",
-            fontSize=12,
-            fontName="Helvetica",
-            leading=14
-        )
-    )
-    
-    header_table = Table(
-        [[logo, right_header]],
-        colWidths=[1.9 * inch, 4.8 * inch]
-    )
+@st.cache_resource
+def get_pdf_cache():
+    """One PDF cache per server process; set CIT_PDF_CACHE_DIR to keep PDFs across restarts"""
+    from cit_profile.cache import PDFCache
     
-    header_table.setStyle(TableStyle([
-        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-        ("LEFTPADDING", (0, 0), (-1, -1), 0),
-        ("RIGHTPADDING", (0, 0), (-1, -1), 0),
-        ("TOPPADDING", (0, 0), (-1, -1), 0),
-        ("BOTTOMPADDING", (0, 0), (-1, -1), 0),
+    return PDFCache(max_items=128, disk_dir=os.environ.get("CIT_PDF_CACHE_DIR"), layout=PDF_LAYOUT,
+                    output=PDF_OUTPUT)
+
+@st.cache_resource
+def get_job_queue():
+    """Background batch jobs, shared by every session; set CIT_JOB_DIR to choose where results are kept"""
+    from cit_profile import create_pdf_profile
+    from cit_profile.jobs import JobQueue
+    from cit_profile.pdf import get_template
     
-        # Add extra top padding ONLY to the right cell (column 1)
-        ("TOPPADDING", (1, 0), (1, 0), 15),  # <-- 15 points down
-    ]))
-
-    content.append(Spacer(1, 25))   # SPACE ABOVE LOGO
-    
-    content.append(header_table)
-    content.append(Spacer(1, 40))
+    return JobQueue(os.environ.get("CIT_JOB_DIR") or os.path.join(tempfile.gettempdir(), "cit_jobs"),
+                    render=functools.partial(create_pdf_profile, layout=PDF_LAYOUT, output=PDF_OUTPUT),
+                    template=get_template(output=PDF_OUTPUT))
+
+def get_client_id():
+    """Identifies this browser tab across refreshes (kept in the URL) for fair job scheduling"""
+    if "client" not in st.query_params:
+        st.query_params["client"] = uuid.uuid4().hex[:12]
+    return st.query_params["client"]
+
+def show_batch_job(job_id, running):
+    """Progress of a background batch; polls once a second while the job runs"""
+    @st.fragment(run_every=1.0 if running else None)
+    def job_status():
+        queue = get_job_queue()
+        job = queue.get(job_id)
+        if job is None:
+            # Expired while the page was open: stop polling and forget it
+            st.query_params.pop("job", None)
+            for key in ("batch_mapping", "batch_issues", "batch_duplicates", "batch_skipped"):
+                st.session_state.pop(key, None)
+            st.session_state.batch_expired = True
+            st.rerun()
+        
+        if job.status == "queued":
+            st.info(f"⏳ Waiting to start ({queue.position(job_id) or 0} batch(es) ahead)")
+        elif job.status == "running":
+            st.progress(job.progress, text=f"Generating profiles... {job.processed} of {job.total}")
         
-    content.append(Paragraph(
-        "New Admission Applicant Profile",
-        ParagraphStyle(
-            "green_title",
-            fontSize=16,
-            alignment=TA_CENTER,
-            fontName="Helvetica-Bold",
-            textColor=colors.HexColor("#0a7a3b"),
-            spaceAfter=25
+        if not job.done:
+            if st.button("Cancel Batch"):
+                queue.cancel(job_id)
+                st.rerun()
+            return
+        
+        if running:
+            st.rerun()   # redraw the whole page once, without the polling
+        
+        if job.status == "failed":
+            st.error(f"❌ Batch failed: {job.error}")
+            return
+        if job.status == "cancelled":
+            st.warning("Batch cancelled")
+            return
+        
+        st.success(f"Generated {job.rendered} of {job.total} profiles")
+        st.caption(f"{job.elapsed:.1f}s · {job.pdfs_per_sec:.1f} PDFs/sec")
+        if job.errors:
+            st.error(f"⚠️ {len(job.errors)} row(s) skipped")
+            st.dataframe(sorted(job.errors, key=lambda error: error["row"]),
+                         use_container_width=True, hide_index=True)
+        
+        # The bytes themselves, not a callable: Streamlit deletes a file made on
+        # click as soon as other sessions' reruns find it unreferenced, often
+        # before the browser has fetched it
+        if job.merged:
+            label, file_name, mime = "📄 Download Merged PDF", "CIT_Applications.pdf", "application/pdf"
+        else:
+            label, file_name, mime = "📦 Download All Profiles (ZIP)", "CIT_Applications.zip", "application/zip"
+        st.download_button(
+            label=label,
+            data=read_file(job.output_path),
+            file_name=file_name,
+            mime=mime,
+            use_container_width=True
         )
-    ))
-
-    rows = [
-        ("Full Name", data["full_name"]),
-        ("Address", data["address"]),
-        ("Mobile (Whatsapp)", data["whatsapp_mobile"]),
-        ("Mobile", data["mobile"]),
-        ("Date of Birth", data["dob"]),
-        ("Place of Birth", data["place_of_birth"]),
-        ("N.I.C No", data.get("nic") or "-"),
-        ("Languages Spoken", data["languages"]),
-        ("Name of School/College attended", data["school_attended"]),
-        ("Name of Institute/College last attended", data["last_institute"]),
-        ("Medium of Instruction", data["medium"]),
-        ("Last standard acquired", data["last_standard"]),
-        ("Year and Last month attended", data["last_attended"]),
-        ("Have you completed memorizing the Quran?", data["quran_memorized"]),
-        ("If yes, how many Juzu’?", data.get("juz_count") or "-"),
-        ("Name of Islamic Institute last attended", data["islamic_institute"]),
-        ("City/ Location", data["city_location"]),
-        ("Duration attended", data["duration"]),
-        ("Reason for leaving/intending to leave", data["reason_leaving"]),
-        ("Parent/Guardian Full Name", data["parent_name"]),
-        ("Parent/Guardian Address", data["parent_address"]),
-        ("Father Residing (Inland/Overseas)", data["father_residing"]),
-        ("Occupation", data["occupation"]),
-        ("Parent/Guardian Mobile No.", data["parent_mobile"]),
-        ("WhatsApp No.", data["parent_whatsapp"]),
-        ("Language(s) spoken at home", data["home_languages"]),
-    ]
-
-    table_data = [
-        [Paragraph(label, label_style), Paragraph(value, value_style)]
-        for label, value in rows
-    ]
-
-    table = Table(
-        table_data,
-        colWidths=[2.6 * inch, 4.0 * inch]
-    )
-
-    table.setStyle(TableStyle([
-        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-        ("BACKGROUND", (0, 0), (0, -1), colors.HexColor("#e9f5ea")),
-        ("VALIGN", (0, 0), (-1, -1), "TOP"),
-        ("LEFTPADDING", (0, 0), (-1, -1), 4),
-        ("RIGHTPADDING", (0, 0), (-1, -1), 4),
-        ("TOPPADDING", (0, 0), (-1, -1), 3),
-        ("BOTTOMPADDING", (0, 0), (-1, -1), 3),
-    ]))
-
-    content.append(table)
-
-    content.append(Spacer(1, 14))
-    content.append(Paragraph("<b>Additional Notes:</b>", styles["Normal"]))
-
-    doc.build(content)
-    buffer.seek(0)
-    return buffer.getvalue()
+    
+    job_status()
 
-def get_download_link(pdf_bytes, filename):
-    """Generate a download link for the PDF"""
-    b64 = base64.b64encode(pdf_bytes).decode()
-    href = f'<a href="data:application/pdf;base64,{b64}" download="{filename}" style="display: inline-block; padding: 0.5rem 1rem; background-color: #4CAF50; color: white; text-decoration: none; border-radius: 4px; border: none; cursor: pointer; text-align: center;">📥 Download PDF</a>'
-    return href
+def read_file(path):
+    with open(path, "rb") as f:
+        return f.read()
 
 # Title
 st.title("📄 CIT Applicant Profile Generator")
 st.markdown("---")
 
-# Sidebar for data input
-with st.sidebar:
+# Sidebar for data input. A fragment: switching the input method or working
+# with a batch reruns only the sidebar, not the form, preview and exports
+@st.fragment
+def data_input():
     st.header("📋 Data Input Options")
     
     input_option = st.radio(
         "Choose input method:",
-        ["Manual Entry", "Paste Google Forms Data"]
+        ["Manual Entry", "Paste Google Forms Data", "Upload Google Forms Export (Batch)"]
     )
     
     if input_option == "Paste Google Forms Data":
@@ -246,76 +173,142 @@ with st.sidebar:
         if st.button("Parse Google Forms Data"):
             if pasted_data:
                 try:
-                    # Split by tab
-                    fields = pasted_data.strip().split('\t')
+                    # Split by tab and map to our form fields
+                    data = row_to_record(pasted_data.strip().split('\t'))
                     
-                    # Check if we have enough fields (should be 26)
-                    if len(fields) >= 27:
-                        # Map to our form fields
-                        data = {
-                            "timestamp": fields[0],
-                        
-                            "full_name": fields[1],
-                            "address": fields[2],
-                            "whatsapp_mobile": fields[3],
-                            "mobile": fields[4],
-                            "dob": fields[5],
-                            "place_of_birth": fields[6],
-                            "nic": fields[7],
-                            "languages": fields[8],
-                        
-                            "school_attended": fields[9],
-                            "last_institute": fields[10],
-                            "medium": fields[11],
-                            "last_standard": fields[12],
-                            "last_attended": fields[13],
-                        
-                            "quran_memorized": fields[14],
-                            "juz_count": fields[15],
-                        
-                            "islamic_institute": fields[16],
-                            "city_location": fields[17],
-                            "duration": fields[18],
-                            "reason_leaving": fields[19],
-                        
-                            "parent_name": fields[20],
-                            "parent_address": fields[21],
-                            "father_residing": fields[22],
-                            "occupation": fields[23],
-                            "parent_mobile": fields[24],
-                            "parent_whatsapp": fields[25],
-                            "home_languages": fields[26],
-                        }
-
-                        
-                        # Store in session state
+                    # Store in session state
+                    with METRICS.timer("session_state"):
                         for key, value in data.items():
                             st.session_state[key] = value
-                        
-                        st.success("Data parsed successfully!")
-                    else:
-                        st.error(f"Expected 26+ fields, got {len(fields)}. Please check your data format.")
+                    
+                except ValueError as e:
+                    st.error(str(e))
                 except Exception as e:
                     st.error(f"Error parsing data: {str(e)}")
+                else:
+                    # The form and preview are outside this fragment
+                    st.session_state.parsed = True
+                    st.rerun()
             else:
                 st.warning("Please paste some data first")
+        elif st.session_state.pop("parsed", False):
+            st.success("Data parsed successfully!")
         
         st.markdown("---")
         st.markdown("**Sample Google Forms Format:**")
-        st.code("""Timestamp\tFull Name\tAddress\tMobile (Whatsapp)\tMobile\tDate of Birth\t...
-1/3/2026 18:07:21\tMohammed Aslam Muhammed\t19, Ibrahim Road...""")
+        st.code("\t".join(FORM_HEADERS[:6]) + "\t...\n"
+                "1/3/2026 18:07:21\tMohammed Aslam Muhammed\t19, Ibrahim Road...")
+    
+    if input_option == "Upload Google Forms Export (Batch)":
+        from cit_profile.dedupe import KEEP_CHOICES, find_duplicates
+        from cit_profile.exporters import FORMAT_LABELS
+        from cit_profile.jobs import QueueFull
+        from cit_profile.sheet import iter_rows, load_export
+        from cit_profile.validation import validate_export
+        
+        st.info("Upload the whole Google Forms export to generate every profile at once")
+        uploaded_export = st.file_uploader(
+            "Google Forms export:",
+            type=EXPORT_TYPES,
+            help="Download the responses sheet as TSV, CSV or XLSX. The first row must be the header row"
+        )
+        
+        merged_output = st.checkbox(
+            "One merged PDF (for printing)",
+            help="All profiles in a single PDF, one page each, instead of a ZIP of separate files"
+        )
+        export_formats = st.multiselect(
+            "Include in the ZIP:",
+            list(FORMAT_LABELS),
+            default=["pdf"],
+            format_func=FORMAT_LABELS.get,
+            disabled=merged_output,
+            help="Word and text profiles per applicant, plus one Excel sheet and one JSON file of all applicants"
+        )
+        
+        skip_duplicates = st.checkbox(
+            "Skip repeated submissions",
+            value=False,
+            help="Applicants who submitted the form more than once get a single profile. Left off, every "
+                 "submission is rendered and the likely repeats are listed for checking"
+        )
+        keep_submission = st.radio(
+            "Keep submission:",
+            KEEP_CHOICES,
+            horizontal=True,
+            disabled=not skip_duplicates
+        )
+        
+        if st.button("Generate Batch", disabled=uploaded_export is None):
+            try:
+                df, mapping = load_export(uploaded_export, uploaded_export.name)
+                validation = validate_export(df)
+            except Exception as e:
+                st.error(f"Error reading export: {str(e)}")
+            else:
+                # Rows that failed validation are listed in the job's report, not rendered
+                applicants = validation.valid
+                dedupe = find_duplicates(applicants, keep=keep_submission)
+                if skip_duplicates:
+                    applicants = dedupe.df
+                
+                try:
+                    job = get_job_queue().submit(
+                        iter_rows(applicants),
+                        owner=get_client_id(),
+                        merged=merged_output,
+                        errors=validation.error_rows(),
+                        formats=export_formats or ["pdf"]
+                    )
+                except QueueFull as e:
+                    st.error(f"⏳ {e}. Please try again in a few minutes.")
+                else:
+                    # In the URL, so a refresh finds the job again
+                    st.query_params["job"] = job.id
+                    st.session_state.batch_mapping = mapping
+                    st.session_state.batch_issues = validation.issues
+                    st.session_state.batch_duplicates = dedupe.duplicates
+                    st.session_state.batch_skipped = skip_duplicates
+        
+        job_id = st.query_params.get("job")
+        job = get_job_queue().get(job_id) if job_id else None
+        if (job_id and job is None) or st.session_state.pop("batch_expired", False):
+            st.warning("This batch has expired. Please generate it again.")
+        if job:
+            show_batch_job(job.id, running=not job.done)
+            
+            mapping = st.session_state.get("batch_mapping")
+            if mapping:
+                if mapping.positional:
+                    st.warning("Header row not recognised; columns were mapped by position")
+                elif mapping.missing:
+                    st.warning(f"No column found for: {', '.join(field_label(key) for key in mapping.missing)}")
+                with st.expander("Column mapping"):
+                    st.dataframe(mapping.rows(), use_container_width=True, hide_index=True)
+            
+            issues = st.session_state.get("batch_issues")
+            if issues is not None and len(issues):
+                warnings = issues[issues["severity"] == "warning"]
+                with st.expander(f"Validation issues ({len(issues) - len(warnings)} errors, {len(warnings)} warnings)"):
+                    st.dataframe(issues, use_container_width=True, hide_index=True)
+            
+            duplicates = st.session_state.get("batch_duplicates")
+            if duplicates is not None and len(duplicates):
+                if st.session_state.get("batch_skipped"):
+                    title = f"Repeated submissions skipped ({len(duplicates)})"
+                else:
+                    title = f"Possible repeated submissions, all rendered ({len(duplicates)})"
+                with st.expander(title):
+                    st.dataframe(duplicates, use_container_width=True, hide_index=True)
+
+with st.sidebar:
+    data_input()
     
     st.markdown("---")
     st.info("Fill out all fields in the main form and click 'Generate Profile'")
 
 # Initialize session state
-for field in ['full_name', 'address', 'whatsapp_mobile', 'mobile', 'dob', 
-              'place_of_birth', 'nic', 'languages', 'school_attended', 
-              'last_institute', 'medium', 'last_standard', 'last_attended', 
-              'quran_memorized', 'juz_count', 'islamic_institute', 'city_location', 
-              'duration', 'reason_leaving', 'parent_name', 'parent_address', 
-              'father_residing', 'occupation', 'parent_mobile', 'parent_whatsapp', 
-              'home_languages']:
+for field in PROFILE_FIELDS:
     if field not in st.session_state:
         st.session_state[field] = ""
 
@@ -400,11 +393,15 @@ with st.form("applicant_form"):
     # Submit button
     submitted = st.form_submit_button("Generate Profile", type="primary")
 
-# Display generated profile
-if submitted or any(st.session_state.get(field, '') for field in ['full_name', 'address']):
-    st.markdown("---")
-    st.markdown("## 📋 Generated Applicant Profile")
-    st.markdown("---")
+# Display generated profile. Preview, validation and exports are fragments
+# reading the fields from session state; what they show is memoized on the
+# field values, so a full rerun with the same applicant only re-sends it
+def current_values():
+    return field_values(st.session_state)
+
+@st.fragment
+def profile_preview():
+    values = current_values()
     
     # Create the profile display similar to PDF
     with st.container():
@@ -429,50 +426,9 @@ if submitted or any(st.session_state.get(field, '') for field in ['full_name', '
         with col_left:
             st.markdown("#### Applicant Details")
             
-            # Create a clean display
-            profile_data = [
-                ("Full Name", st.session_state.full_name),
-                ("Address", st.session_state.address),
-                ("Mobile (WhatsApp)", st.session_state.whatsapp_mobile),
-                ("Mobile", st.session_state.mobile),
-                ("Date of Birth", st.session_state.dob),
-                ("Place of Birth", st.session_state.place_of_birth),
-                ("NIC No", st.session_state.nic or "Not provided"),
-                ("Languages Spoken", st.session_state.languages),
-                ("School/College Attended", st.session_state.school_attended),
-                ("Last Institute Attended", st.session_state.last_institute),
-                ("Medium of Instruction", st.session_state.medium),
-                ("Last Standard Acquired", st.session_state.last_standard),
-                ("Year & Month Last Attended", st.session_state.last_attended),
-                ("Completed Memorizing Quran?", st.session_state.quran_memorized),
-            ]
-            
-            if st.session_state.quran_memorized == "Yes":
-                profile_data.append(("If Yes, How Many Juz?", st.session_state.juz_count))
-            
-            profile_data.extend([
-                ("Islamic Institute Last Attended", st.session_state.islamic_institute),
-                ("City/Location", st.session_state.city_location),
-                ("Duration Attended", st.session_state.duration),
-                ("Reason for Leaving", st.session_state.reason_leaving),
-                ("Parent/Guardian Full Name", st.session_state.parent_name),
-                ("Parent/Guardian Address", st.session_state.parent_address),
-                ("Father Residing", st.session_state.father_residing),
-                ("Occupation", st.session_state.occupation),
-                ("Parent/Guardian Mobile No.", st.session_state.parent_mobile),
-                ("WhatsApp No.", st.session_state.parent_whatsapp),
-                ("Language(s) spoken at home", st.session_state.home_languages),
-            ])
-            
-            # Display all fields
-            for label, value in profile_data:
-                if value:  # Only show if there's a value
-                    st.markdown(f"""
-                    <div style='margin-bottom: 15px;'>
-                        <div class='info-label'>{label}</div>
-                        <div class='info-value'>{value}</div>
-                    </div>
-                    """, unsafe_allow_html=True)
+            # Display all fields, as one element
+            with METRICS.timer("preview"):
+                st.markdown(preview_html(values), unsafe_allow_html=True)
         
         with col_right:
             st.markdown("#### Additional Information")
@@ -486,131 +442,121 @@ if submitted or any(st.session_state.get(field, '') for field in ['full_name', '
             
             # Summary section
             st.markdown("##### Profile Summary")
-            
-            summary_data = {
-                "Applicant Name": st.session_state.full_name,
-                "Date of Birth": st.session_state.dob,
-                "Last Education": f"{st.session_state.last_standard} ({st.session_state.last_attended})",
-                "Current Status": f"Studied at {st.session_state.last_institute} for {st.session_state.duration}",
-                "Parent Contact": st.session_state.parent_mobile,
-            }
-            
-            for key, value in summary_data.items():
-                if value:
-                    st.markdown(f"**{key}:** {value}")
+            st.markdown(summary_markdown(values))
             
             st.markdown("---")
             
-            # Validation status
-            required_fields = ['full_name', 'address', 'mobile', 'dob', 'parent_name', 'parent_mobile']
-            
-            missing_fields = [field for field in required_fields if not st.session_state.get(field, '')]
-            
-            if missing_fields:
-                st.error(f"⚠️ Missing {len(missing_fields)} required field(s)")
-                for field in missing_fields:
-                    field_name = field.replace('_', ' ').title()
-                    st.caption(f"• {field_name}")
-            else:
-                st.success("✅ All required fields are complete!")
+            validation_status()
+
+@st.fragment
+def validation_status():
+    missing = missing_fields(current_values())
+    
+    if missing:
+        st.error(f"⚠️ Missing {len(missing)} required field(s)")
+        for field in missing:
+            st.caption(f"• {field_label(field)}")
+    else:
+        st.success("✅ All required fields are complete!")
+
+@st.fragment
+def export_options():
+    values = current_values()
     
-    # Download buttons
     st.markdown("---")
     st.markdown("### 📥 Export Options")
     
     # Create PDF if all required fields are filled
-    if not missing_fields:
-        # Prepare data for PDF
-        pdf_data = {}
-        for field in ['full_name', 'address', 'whatsapp_mobile', 'mobile', 'dob', 
-                     'place_of_birth', 'nic', 'languages', 'school_attended', 
-                     'last_institute', 'medium', 'last_standard', 'last_attended', 
-                     'quran_memorized', 'juz_count', 'islamic_institute', 'city_location', 
-                     'duration', 'reason_leaving', 'parent_name', 'parent_address', 
-                     'father_residing', 'occupation', 'parent_mobile', 'parent_whatsapp', 
-                     'home_languages']:
-            pdf_data[field] = st.session_state.get(field, '')
-        
-        # Generate PDF
-        pdf_bytes = create_pdf_profile(pdf_data)
-        
-        # Create download buttons
-        col_dl1, col_dl2, col_dl3 = st.columns(3)
-        
-        with col_dl1:
-            # Generate filename
-            name_part = st.session_state.full_name.replace(" ", "_") if st.session_state.full_name else "Applicant"
-            filename = f"CIT_Application_{name_part}.pdf"
-            
-            # Use Streamlit's download button
+    if missing_fields(values):
+        st.warning("Please fill all required fields (marked with *) before downloading PDF")
+        return
+    
+    # Prepare data for PDF
+    pdf_data = dict(zip(PROFILE_FIELDS, values))
+    pdf_cache = get_pdf_cache()
+    
+    # Create download buttons. The files are made here rather than on click
+    # (which Streamlit cannot keep alive under concurrent sessions, see
+    # show_batch_job); the PDF cache keeps the PDF as long as no field has
+    # changed, and clicking does not rerun anything
+    col_dl1, col_dl2, col_dl3 = st.columns(3)
+    
+    with col_dl1:
+        pdf_bytes = pdf_cache.get_or_render(pdf_data)   # timed as pdf_* stages; "download" is the button alone
+        with METRICS.timer("download"):
             st.download_button(
                 label="📥 Download as PDF",
                 data=pdf_bytes,
-                file_name=filename,
+                file_name=pdf_filename(pdf_data["full_name"]),
                 mime="application/pdf",
+                on_click="ignore",
                 use_container_width=True
             )
-        
-        with col_dl2:
-            # Create formatted text for copying
-            profile_text = f"""CIT APPLICANT PROFILE
-=============================
-
-APPLICANT INFORMATION:
----------------------
-Full Name: {st.session_state.full_name}
-Address: {st.session_state.address}
-Mobile: {st.session_state.mobile} (WhatsApp: {st.session_state.whatsapp_mobile})
-Date of Birth: {st.session_state.dob}
-Place of Birth: {st.session_state.place_of_birth}
-NIC No: {st.session_state.nic or 'Not provided'}
-Languages Spoken: {st.session_state.languages}
-
-EDUCATIONAL BACKGROUND:
-----------------------
-School/College Attended: {st.session_state.school_attended}
-Last Institute Attended: {st.session_state.last_institute}
-Medium of Instruction: {st.session_state.medium}
-Last Standard Acquired: {st.session_state.last_standard}
-Year & Month Last Attended: {st.session_state.last_attended}
-
-Quran Memorization: {st.session_state.quran_memorized}
-{f'Juz Count: {st.session_state.juz_count}' if st.session_state.quran_memorized == 'Yes' else ''}
-
-Islamic Institute: {st.session_state.islamic_institute}
-City/Location: {st.session_state.city_location}
-Duration Attended: {st.session_state.duration}
-Reason for Leaving: {st.session_state.reason_leaving}
-
-PARENT/GUARDIAN INFORMATION:
----------------------------
-Parent/Guardian Name: {st.session_state.parent_name}
-Parent/Guardian Address: {st.session_state.parent_address}
-Father Residing: {st.session_state.father_residing}
-Occupation: {st.session_state.occupation}
-Parent Mobile: {st.session_state.parent_mobile}
-Parent WhatsApp: {st.session_state.parent_whatsapp}
-Languages at Home: {st.session_state.home_languages}
-
-Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-"""
-            
+    
+    with col_dl2:
+        text_profile = create_text_profile(pdf_data)
+        with METRICS.timer("download"):
             st.download_button(
                 label="📋 Download as Text",
-                data=profile_text,
-                file_name=f"CIT_Application_{name_part}.txt",
+                data=text_profile,
+                file_name=pdf_filename(pdf_data["full_name"], ext="txt"),
                 mime="text/plain",
+                on_click="ignore",
                 use_container_width=True
             )
+    
+    with col_dl3:
+        if st.button("🔄 Clear Form", use_container_width=True):
+            for key in list(st.session_state.keys()):
+                if key not in ['_']:  # Don't clear internal streamlit keys
+                    st.session_state[key] = ""
+            st.rerun()
+    
+    cache_stats = pdf_cache.stats
+    st.caption(
+        f"PDF cache: {cache_stats.hits} hits · {cache_stats.disk_hits} disk hits · "
+        f"{cache_stats.misses} misses · {len(pdf_cache)} stored ({pdf_cache.nbytes / 1024:.0f} KB)"
+    )
+
+if submitted or any(st.session_state.get(field, '') for field in ['full_name', 'address']):
+    st.markdown("---")
+    st.markdown("## 📋 Generated Applicant Profile")
+    st.markdown("---")
+    
+    profile_preview()
+    export_options()
+
+# Timings for this server process (all sessions). A fragment, so profiling a
+# render or refreshing the table leaves the rest of the page alone
+@st.fragment
+def performance_panel():
+    with st.expander("🔧 Performance"):
+        stages = METRICS.summary()
+        if stages:
+            # A markdown table, so the collapsed panel never loads pandas
+            rows = [f"| {s['stage']} | {s['count']} | {s['mean_ms']} | {s['p95_ms']} | {s['total_ms']} |" for s in stages]
+            st.markdown("| stage | count | mean ms | p95 ms | total ms |\n|---|---:|---:|---:|---:|\n" + "\n".join(rows))
+        else:
+            st.caption("Nothing measured yet")
+        # The strings themselves, and a batch's DataFrames with their contents (pandas counts them)
+        state_bytes = sum(sys.getsizeof(key) + sys.getsizeof(value) for key, value in st.session_state.items())
+        st.caption(f"This session: {len(st.session_state)} state keys, about {state_bytes / 1024:.1f} KB")
         
-        with col_dl3:
-            if st.button("🔄 Clear Form", use_container_width=True):
-                for key in list(st.session_state.keys()):
-                    if key not in ['_']:  # Don't clear internal streamlit keys
-                        st.session_state[key] = ""
-                st.rerun()
-    else:
-        st.warning("Please fill all required fields (marked with *) before downloading PDF")
+        # Bypasses the PDF cache, so there is always a render to profile
+        record = {field: st.session_state.get(field, '') for field in PROFILE_FIELDS}
+        if st.button("Profile one PDF render", disabled=any(not record[field] for field in REQUIRED_FIELDS)):
+            from cit_profile import create_pdf_profile
+            
+            _, report_text = profile_call(create_pdf_profile, record, layout=PDF_LAYOUT, output=PDF_OUTPUT)
+            st.code(report_text, language=None)
+        
+        st.download_button(
+            "Metrics (Prometheus)",
+            data=METRICS.to_prometheus(),
+            file_name="cit_metrics.prom",
+            mime="text/plain",
+            on_click="ignore"
+        )
 
 # Instructions in sidebar
 with st.sidebar:
@@ -632,6 +578,8 @@ with st.sidebar:
     - **Juz Count**: Only if memorized Quran
     - **All other fields**: Required
     """)
+    
+    performance_panel()
 
 # Footer
 st.markdown("---")
@@ -0,0 +1,245 @@
+"""
+Concurrent staff sessions against the Streamlit app: where does it degrade?
+
+Starts `streamlit run` headless, then for each count in --sessions opens
+that many tabs at once (each a thread with its own websocket, talking to
+the server as app_reruns.Tab does) and has every tab work through --cycles
+applicants:
+
+    parse       paste a new applicant's Google Forms row, "Parse Google Forms Data"
+    generate    "Generate Profile" (renders the PDF, through the PDF cache)
+    download    "📥 Download as PDF" (fetches the PDF the button holds)
+
+Every cycle is a different applicant, so each generate is a PDF cache miss,
+as it is for an office working through its applicants. Reports per level
+the cycles per second and the latency percentiles of a cycle and of each
+step, the server's CPU time per cycle and its RSS before and after (the
+tabs stay connected until it is read), and what each session and the
+shared PDF cache hold, as the app's own Performance panel and export
+captions report them. Latency has degraded at the first level whose cycle
+p95 is more than --degrade times that of the first level.
+
+"lost PDFs" are downloads whose file was gone when the tab fetched it (a
+404), which a browser would show as a failed download. It should stay 0:
+the download buttons hold their bytes, and a file Streamlit made on the
+click instead could be deleted by other sessions' script runs before the
+fetch.
+
+The server and the tabs share the machine, so the client's own CPU time is
+reported too. CPU and RSS come from /proc and are only reported on Linux.
+The app reads its settings from the environment (CIT_PDF_LAYOUT,
+CIT_PDF_OUTPUT, ...), which the server inherits.
+
+    python -m benchmarks.app_load --sessions 1 2 4 8 16 --cycles 5
+    python -m benchmarks.app_load --sessions 4 8 --think 2   # staff who read the preview first
+"""
+import argparse
+import os
+import random
+import re
+import threading
+import time
+import urllib.error
+
+from websockets.sync.client import connect
+
+from .app_reruns import ROOT, Tab, free_port, start_server
+from .synthetic import applicant_row
+
+STEPS = ("parse", "generate", "download")
+INPUT_METHOD = "Choose input method:"
+PASTE = "Paste Google Forms row here:"
+
+
+class Session:
+    __slots__ = ("steps", "cycles", "failed_downloads", "state_kb", "cache", "error")
+
+    def __init__(self):
+        self.steps = {"first paint": [], **{step: [] for step in STEPS}}
+        self.cycles = []   # seconds per cycle, without think time
+        self.failed_downloads = 0
+        self.state_kb = None
+        self.cache = None  # (PDFs stored, KB)
+        self.error = None
+
+
+def work(tab, first_applicant, args, session):
+    rnd = random.Random(first_applicant)
+    session.steps["first paint"].append(tab.rerun().seconds)
+    tab.rerun(value=(INPUT_METHOD, "Paste Google Forms Data"))
+    for n in range(args.cycles):
+        if n:
+            pause(args.think)
+        tab.values[PASTE] = "\t".join(applicant_row(first_applicant + n, rnd))
+        seconds = {"parse": tab.click("Parse Google Forms Data").seconds}
+        pause(args.think)
+        seconds["generate"] = tab.rerun(trigger="Generate Profile").seconds
+        pause(args.think)
+        try:
+            seconds["download"] = tab.click("📥 Download as PDF").seconds
+        except urllib.error.HTTPError:
+            # A file the page no longer holds; counted, as it should never happen
+            session.failed_downloads += 1
+            continue
+        for step, value in seconds.items():
+            session.steps[step].append(value)
+        session.cycles.append(sum(seconds.values()))
+
+    tab.rerun()   # for the captions after the last download
+    state = re.search(r"about ([\d.]+) KB", tab.text("This session:") or "")
+    cache = re.search(r"(\d+) stored \((\d+) KB\)", tab.text("PDF cache:") or "")
+    session.state_kb = float(state.group(1)) if state else None
+    session.cache = (int(cache.group(1)), int(cache.group(2))) if cache else None
+
+
+def pause(seconds):
+    if seconds:
+        time.sleep(seconds)
+
+
+def run_session(port, first_applicant, args, finished, release, session):
+    ws = None
+    try:
+        ws = connect(f"ws://localhost:{port}/_stcore/stream", subprotocols=["streamlit"],
+                     origin=f"http://localhost:{port}", max_size=None)
+        work(Tab(ws, port), first_applicant, args, session)
+    except Exception as e:
+        session.error = f"{type(e).__name__}: {e}"
+    finished.wait()
+    release.wait()   # stay connected while the server is measured
+    if ws is not None:
+        ws.close()
+
+
+def server_usage(pid):
+    """(CPU seconds, RSS in MB) of process `pid`, or (None, None) without /proc"""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open(f"/proc/{pid}/status") as f:
+            rss_kb = next(int(line.split()[1]) for line in f if line.startswith("VmRSS:"))
+    except (OSError, StopIteration):
+        return None, None
+    # utime and stime: fields 14 and 15 of stat, counting the state (after the command name) as 3
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK"), rss_kb / 1024
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[int(q * (len(values) - 1))]
+
+
+def run_level(port, pid, count, first_applicant, args):
+    finished = threading.Barrier(count + 1)
+    release = threading.Event()
+    sessions = [Session() for _ in range(count)]
+    threads = [
+        threading.Thread(target=run_session,
+                         args=(port, first_applicant + i * args.cycles, args, finished, release, session))
+        for i, session in enumerate(sessions)
+    ]
+    cpu_before, rss_before = server_usage(pid)
+    client_before = time.process_time()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    finished.wait()
+    elapsed = time.perf_counter() - started
+    cpu_after, rss_after = server_usage(pid)
+    client_cpu = time.process_time() - client_before
+    release.set()
+    for thread in threads:
+        thread.join()
+    return {
+        "sessions": sessions, "elapsed": elapsed, "client_cpu": client_cpu,
+        "cpu": None if cpu_before is None else cpu_after - cpu_before,
+        "rss": (rss_before, rss_after),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 2, 4, 8, 16],
+                        help="concurrent sessions of each level, in order (default: %(default)s)")
+    parser.add_argument("--cycles", type=int, default=5, help="applicants each session works through per level")
+    parser.add_argument("--think", type=float, default=0.0, help="seconds a session waits between steps")
+    parser.add_argument("--degrade", type=float, default=2.0,
+                        help="cycle p95 over the first level's that counts as degraded (default: %(default)s)")
+    parser.add_argument("--app", default=os.path.join(ROOT, "app.py"))
+    args = parser.parse_args()
+
+    port = free_port()
+    server = start_server(os.path.abspath(args.app), port)
+    levels = []
+    try:
+        # One session first for the imports, the template and the fonts
+        warm = run_level(port, server.pid, 1, 0, argparse.Namespace(cycles=1, think=0.0))
+        if warm["sessions"][0].error:
+            raise RuntimeError(f"warm-up session failed: {warm['sessions'][0].error}")
+        rss_start = warm["rss"][1]
+        first_applicant = 1
+        for count in args.sessions:
+            levels.append((count, run_level(port, server.pid, count, first_applicant, args)))
+            first_applicant += count * args.cycles
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(f"{args.cycles} cycle(s) per session, think time {args.think:g}s; latencies in ms")
+    print(f"{'sessions':>8s} {'cycles/s':>9s} {'cycle p50':>10s} {'p95':>8s} {'p99':>8s} "
+          + " ".join(f"{step + ' p95':>12s}" for step in ("first paint", *STEPS)) + f" {'lost PDFs':>10s} {'failed':>7s}")
+    baseline, degraded = None, None
+    for count, level in levels:
+        ok = [session for session in level["sessions"] if not session.error]
+        cycles = [seconds * 1000 for session in ok for seconds in session.cycles]
+        errors = len(level["sessions"]) - len(ok)
+        lost = sum(session.failed_downloads for session in level["sessions"])
+        if not cycles:
+            print(f"{count:8d} {'no cycle completed':>30s} {lost:10d} {errors:7d}")
+            continue
+        p95 = percentile(cycles, 0.95)
+        baseline = baseline or p95
+        if degraded is None and p95 > args.degrade * baseline:
+            degraded = count, p95
+        steps = [percentile([s * 1000 for session in ok for s in session.steps[step]], 0.95)
+                 for step in ("first paint", *STEPS)]
+        print(f"{count:8d} {len(cycles) / level['elapsed']:9.2f} {percentile(cycles, 0.5):10.0f} {p95:8.0f} "
+              f"{percentile(cycles, 0.99):8.0f} " + " ".join(f"{ms:12.0f}" for ms in steps) + f" {lost:10d} {errors:7d}")
+
+    errors = {session.error for _, level in levels for session in level["sessions"] if session.error}
+    for error in sorted(errors):
+        print(f"  session failed: {error}")
+
+    print(f"\n{'sessions':>8s} {'server cpu':>12s} {'cpu busy':>9s} {'client cpu':>11s} {'rss before':>11s} "
+          f"{'rss after':>10s} {'per session':>12s} {'state/session':>14s} {'PDF cache':>17s}")
+    for count, level in levels:
+        ok = [session for session in level["sessions"] if not session.error]
+        # Lost downloads were still generated, so they count as cycles here
+        done = sum(len(session.cycles) + session.failed_downloads for session in ok) or 1
+        state = [session.state_kb for session in ok if session.state_kb is not None]
+        cache = max((session.cache for session in ok if session.cache), default=None)
+        rss_before, rss_after = level["rss"]
+        if level["cpu"] is None:
+            resources = f"{'n/a':>12s} {'n/a':>9s}"
+        else:
+            resources = f"{level['cpu'] * 1000 / done:6.0f} ms/cy {level['cpu'] / level['elapsed']:9.0%}"
+        memory = (f"{rss_before:8.1f} MB {rss_after:7.1f} MB {(rss_after - rss_before) / count * 1024:9.0f} KB"
+                  if rss_before is not None else f"{'n/a':>11s} {'n/a':>10s} {'n/a':>12s}")
+        print(f"{count:8d} {resources} {level['client_cpu'] * 1000 / done:6.0f} ms/cy {memory} "
+              + (f"{sum(state) / len(state):11.1f} KB" if state else f"{'n/a':>14s}")
+              + (f" {cache[0]:4d} PDFs {cache[1]:5d} KB" if cache else f" {'n/a':>17s}"))
+    if rss_start is not None:
+        print(f"(server RSS after the warm-up session: {rss_start:.1f} MB; cpu busy is server CPU time over wall "
+              f"time, {os.cpu_count()} CPU(s) here)")
+
+    first_count = levels[0][0] if levels else None
+    if degraded:
+        print(f"\nLatency degrades at {degraded[0]} concurrent sessions: cycle p95 {degraded[1]:.0f} ms, over "
+              f"{args.degrade:g}x the {baseline:.0f} ms of {first_count}")
+    elif baseline:
+        print(f"\nCycle p95 stayed within {args.degrade:g}x of {first_count} session(s) ({baseline:.0f} ms) "
+              f"up to {levels[-1][0]} sessions")
+
+
+if __name__ == "__main__":
+    main()
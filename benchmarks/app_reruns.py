@@ -0,0 +1,259 @@
+"""
+Server time and bytes sent per Streamlit rerun, measured like a browser tab.
+
+Starts `streamlit run` headless and talks to it over its websocket the way
+the frontend does: widget states go up in a rerun request (with the id of
+the fragment the widget lives in, if any), deltas come back until the
+script finishes. Each step reports the time the script ran on the server
+(from Streamlit's page profile, which it only sends with usage stats on;
+without a browser attached nothing is reported anywhere), the round trip
+from request to script_finished, and the bytes of messages received.
+Large elements the tab already holds are sent as a reference, as they
+would be to a browser.
+Download clicks include fetching the file (and, for a file made on click,
+asking the server to make it).
+
+    first paint         a new tab
+    submit form         all fields filled in, "Generate Profile"
+    rerun, unchanged    the same state again (e.g. pressing R)
+    switch input method the sidebar radio
+    profile a render    the Performance panel's button
+    download PDF        clicking the download button
+    clear form          the Clear Form button
+
+    python -m benchmarks.app_reruns --repeat 5
+    python -m benchmarks.app_reruns --app /path/to/other/checkout/app.py
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+from websockets.sync.client import connect
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FINISHED_EARLY_FOR_RERUN = ForwardMsg.ScriptFinishedStatus.Value("FINISHED_EARLY_FOR_RERUN")
+
+# Form labels -> values of one complete applicant
+RECORD = {
+    "Full Name*": "Mohammed Aslam Muhammed",
+    "Address*": "19, Ibrahim Road, Akurana",
+    "Mobile (WhatsApp)*": "0772226866",
+    "Mobile*": "0772226866",
+    "Date of Birth*": "19 February 2009",
+    "Place of Birth*": "Akurana",
+    "Languages Spoken*": "English, Tamil",
+    "School/College Attended*": "Hejazz International",
+    "Last Institute Attended*": "Al Haqqaniyyah Arabic College",
+    "Medium of Instruction*": "English",
+    "Last Standard Acquired*": "GCE (O/L)",
+    "Year & Month Last Attended*": "2023, June",
+    "Islamic Institute Last Attended*": "Al Haqqaniyyah Arabic College",
+    "City/Location*": "Kandy",
+    "Duration Attended*": "3 years",
+    "Reason for Leaving*": "Wants to be with parents and continue studies",
+    "Parent/Guardian Full Name*": "Ahamad Farook Mohammed Shifas",
+    "Parent/Guardian Address*": "38/C Kawdana Road, Dehiwala",
+    "Occupation*": "Business",
+    "Parent/Guardian Mobile No.*": "0772226866",
+    "WhatsApp No.*": "0772226866",
+    "Language(s) spoken at home*": "English, Tamil",
+}
+
+
+class Step:
+    __slots__ = ("script", "seconds", "bytes", "messages", "reran")
+
+    def __init__(self, script=0.0, seconds=0.0, nbytes=0, messages=0, reran=True):
+        self.script = script
+        self.seconds = seconds
+        self.bytes = nbytes
+        self.messages = messages
+        self.reran = reran
+
+
+class Tab:
+    """One browser tab: keeps the widgets and texts of the last run and the messages it may be sent references to"""
+
+    def __init__(self, ws, port):
+        self.ws = ws
+        self.port = port
+        self.session_id = None
+        self.widgets = {}   # label -> (element type, element proto, fragment id)
+        self.values = {}    # label -> string value the user has set
+        self.texts = {}     # delta path -> markdown body, most recently sent last
+        self.held = {}      # hash -> cacheable message, for references to it
+
+    def rerun(self, trigger=None, value=None):
+        """Send a rerun as the frontend would for a click on `trigger` / a change to `value` (label, new value)"""
+        msg = BackMsg()
+        state = msg.rerun_script
+        state.cached_message_hashes.extend(sorted(self.held))
+        if value:
+            self.values[value[0]] = value[1]
+        scope = trigger or (value and value[0])
+        if scope:
+            _, _, fragment_id = self.widgets[scope]
+            if fragment_id:
+                state.fragment_id = fragment_id
+        for label, text in self.values.items():
+            if label in self.widgets:
+                widget = state.widget_states.widgets.add()
+                widget.id = self.widgets[label][1].id
+                widget.string_value = text
+        if trigger:
+            widget = state.widget_states.widgets.add()
+            widget.id = self.widgets[trigger][1].id
+            widget.trigger_value = True
+
+        started = time.perf_counter()
+        self.ws.send(msg.SerializeToString())
+        step = Step()
+        while True:
+            data = self.ws.recv()
+            forward = ForwardMsg()
+            forward.ParseFromString(data)
+            kind = forward.WhichOneof("type")
+            if kind == "page_profile":   # only here for the measurement
+                step.script += forward.page_profile.exec_time / 1e6
+                continue
+            step.bytes += len(data)
+            step.messages += 1
+            if kind == "ref_hash":   # a message the tab already holds
+                forward = self.held[forward.ref_hash]
+                kind = forward.WhichOneof("type")
+            elif forward.metadata.cacheable:
+                self.held[forward.hash] = forward
+            if kind == "new_session" and forward.new_session.initialize.session_id:
+                self.session_id = forward.new_session.initialize.session_id
+            elif kind == "delta" and forward.delta.WhichOneof("type") == "new_element":
+                element = forward.delta.new_element
+                element_type = element.WhichOneof("type")
+                widget = getattr(element, element_type)
+                if hasattr(widget, "label") and hasattr(widget, "id"):
+                    self.widgets[widget.label] = (element_type, widget, forward.delta.fragment_id)
+                elif element_type == "markdown":
+                    path = tuple(forward.metadata.delta_path)
+                    self.texts.pop(path, None)
+                    self.texts[path] = widget.body
+            elif kind == "script_finished" and forward.script_finished != FINISHED_EARLY_FOR_RERUN:
+                break
+        step.seconds = time.perf_counter() - started
+        return step
+
+    def text(self, prefix):
+        """The markdown or caption last sent that starts with `prefix`, or None"""
+        for body in reversed(self.texts.values()):
+            if body.startswith(prefix):
+                return body
+        return None
+
+    def click(self, label):
+        element_type, widget, _ = self.widgets[label]
+        if element_type != "download_button":
+            return self.rerun(trigger=label)
+
+        started = time.perf_counter()
+        step = Step(reran=not widget.ignore_rerun)
+        url = widget.url
+        if widget.deferred_file_id:
+            msg = BackMsg()
+            msg.backend_operation_request.request_id = "download"
+            msg.backend_operation_request.session_id = self.session_id
+            msg.backend_operation_request.deferred_file.file_id = widget.deferred_file_id
+            self.ws.send(msg.SerializeToString())
+            while True:
+                data = self.ws.recv()
+                step.bytes += len(data)
+                step.messages += 1
+                forward = ForwardMsg()
+                forward.ParseFromString(data)
+                if forward.WhichOneof("type") == "backend_operation_response":
+                    response = forward.backend_operation_response
+                    if response.error_msg:
+                        raise RuntimeError(f"{label}: {response.error_msg}")
+                    url = response.deferred_file.url
+                    break
+        with urllib.request.urlopen(f"http://localhost:{self.port}{url}") as response:
+            response.read()
+        if step.reran:
+            rerun = self.rerun(trigger=label)
+            step.script = rerun.script
+            step.bytes += rerun.bytes
+            step.messages += rerun.messages
+        step.seconds = time.perf_counter() - started
+        return step
+
+
+def scenario(port):
+    with connect(f"ws://localhost:{port}/_stcore/stream", subprotocols=["streamlit"],
+                 origin=f"http://localhost:{port}", max_size=None) as ws:
+        tab = Tab(ws, port)
+        steps = {"first paint": tab.rerun()}
+        tab.values.update(RECORD)
+        steps["submit form"] = tab.rerun(trigger="Generate Profile")
+        steps["rerun, unchanged"] = tab.rerun()
+        steps["switch input method"] = tab.rerun(value=("Choose input method:", "Paste Google Forms Data"))
+        steps["profile a render"] = tab.click("Profile one PDF render")
+        steps["download PDF"] = tab.click("📥 Download as PDF")
+        steps["clear form"] = tab.click("🔄 Clear Form")
+        return steps
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("localhost", 0))
+        return s.getsockname()[1]
+
+
+def start_server(app, port):
+    server = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", app, "--server.headless", "true", "--server.port", str(port),
+         "--browser.gatherUsageStats", "true"],
+        cwd=os.path.dirname(app), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(f"http://localhost:{port}/_stcore/health", timeout=1)
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError("streamlit did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="tabs to replay (the first one warms the server up)")
+    parser.add_argument("--app", default=os.path.join(ROOT, "app.py"))
+    args = parser.parse_args()
+
+    port = free_port()
+    server = start_server(os.path.abspath(args.app), port)
+    try:
+        scenario(port)   # imports, template, fonts
+        runs = [scenario(port) for _ in range(args.repeat)]
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(f"{'':20s} {'script':>10s} {'round trip':>11s} {'sent':>10s} {'messages':>9s} {'rerun':>6s}")
+    for name, step in runs[0].items():
+        script = statistics.median(run[name].script * 1000 for run in runs)
+        seconds = statistics.median(run[name].seconds * 1000 for run in runs)
+        print(f"{name:20s} {script:7.1f} ms {seconds:8.1f} ms "
+              f"{step.bytes / 1024:7.1f} KB {step.messages:9d} {'yes' if step.reran else 'no':>6s}")
+    print("(medians; sent and messages are the same in every run)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Streamlit app startup: cold and warm first paint, and the first filled-in form.
+
+Each sample runs in a fresh interpreter with Streamlit's AppTest (the whole
+script, server side, no browser):
+
+    cold first paint   first run of the page in a new process (imports included)
+    warm first paint   a new session in a process that already served one
+    filled form        the run after the required fields are filled in (the
+                       PDF itself is only made when Download is clicked; see
+                       benchmarks.app_reruns)
+
+    python -m benchmarks.app_startup --repeat 5
+    python -m benchmarks.app_startup --app /path/to/other/checkout/app.py
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SAMPLE = r"""
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+
+app = sys.argv[1]
+timings = {}
+
+started = time.perf_counter()
+at = AppTest.from_file(app, default_timeout=120).run()
+timings["cold first paint"] = time.perf_counter() - started
+loaded = {module: module in sys.modules for module in ("pandas", "reportlab")}
+
+started = time.perf_counter()
+at = AppTest.from_file(app, default_timeout=120).run()
+timings["warm first paint"] = time.perf_counter() - started
+
+for key, value in {"full_name": "Aslam", "address": "Kandy", "mobile": "0772226866", "dob": "19 February 2009",
+                   "parent_name": "Farook", "parent_mobile": "0771234567"}.items():
+    at.session_state[key] = value
+started = time.perf_counter()
+at.run()
+timings["filled form"] = time.perf_counter() - started
+
+print(json.dumps({"timings": timings, "loaded": loaded}))
+"""
+
+
+def sample(app):
+    result = subprocess.run(
+        [sys.executable, "-c", SAMPLE, app], cwd=os.path.dirname(app), capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--app", default=os.path.join(ROOT, "app.py"))
+    args = parser.parse_args()
+
+    samples = [sample(os.path.abspath(args.app)) for _ in range(args.repeat)]
+
+    print(f"{'':20s} {'median':>10s} {'min':>10s}")
+    for name in samples[0]["timings"]:
+        values = [s["timings"][name] * 1000 for s in samples]
+        print(f"{name:20s} {statistics.median(values):7.0f} ms {min(values):7.0f} ms")
+    loaded = ", ".join(f"{module} {'yes' if flag else 'no'}" for module, flag in samples[0]["loaded"].items())
+    print(f"imported by the first paint: {loaded}")
+
+
+if __name__ == "__main__":
+    main()
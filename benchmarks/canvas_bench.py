@@ -0,0 +1,54 @@
+"""
+Per-PDF latency of the platypus layout and the direct canvas layout.
+
+Both use the same precompiled ProfileTemplate. Applicants the canvas layout
+cannot draw exactly (non-Latin text, a table longer than the page) fall
+back to platypus; the fallback count is shown per kind.
+
+    python -m benchmarks.canvas_bench --count 200
+"""
+import argparse
+import random
+import statistics
+import time
+
+from cit_profile.metrics import METRICS
+from cit_profile.pdf import CanvasProfile, ProfileTemplate
+
+from .synthetic import KINDS, applicant_record
+
+
+def time_per_pdf(render, records):
+    timings = []
+    for record in records:
+        started = time.perf_counter()
+        render(record)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=200, help="applicants per kind")
+    args = parser.parse_args()
+
+    template = ProfileTemplate()
+    canvas = CanvasProfile(template)
+    rnd = random.Random(0)
+
+    print(f"{'kind':10s} {'platypus':>12s} {'canvas':>12s} {'speedup':>8s} {'fallbacks':>10s}")
+    for kind in KINDS:
+        records = [applicant_record(i, rnd, kind) for i in range(args.count)]
+        template.render(records[0])   # warm up fonts and glyph widths
+        canvas.render(records[0])
+
+        platypus_ms = statistics.mean(time_per_pdf(template.render, records)) * 1000
+        METRICS.reset()
+        canvas_ms = statistics.mean(time_per_pdf(canvas.render, records)) * 1000
+        fallbacks = METRICS.counters().get("canvas_fallbacks", 0)
+        print(f"{kind:10s} {platypus_ms:9.2f} ms {canvas_ms:9.2f} ms {platypus_ms / canvas_ms:7.2f}x "
+              f"{fallbacks:6d}/{len(records)}")
+
+
+if __name__ == "__main__":
+    main()
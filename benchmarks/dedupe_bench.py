@@ -0,0 +1,95 @@
+"""
+Duplicate detection: time, pairs compared and accuracy on exports with resubmissions.
+
+    python -m benchmarks.dedupe_bench --sizes 1000 5000 20000 --resubmit 0.15
+"""
+import argparse
+import random
+import time
+
+import pandas as pd
+
+from cit_profile.dedupe import find_duplicates
+from cit_profile.fields import FORM_FIELDS
+from cit_profile.validation import validate_export
+
+from .synthetic import CITIES, applicant_record
+
+FIRST_NAMES = ["Mohammed", "Ahamed", "Abdullah", "Ibrahim", "Rizwan", "Farook", "Aslam", "Shifas", "Nusrath", "Imran",
+               "Hafeel", "Rusdhi", "Faizal", "Nawfer", "Irshad", "Zakir", "Haseeb", "Muaz", "Rifaz", "Sajith"]
+LAST_NAMES = ["Muhammed", "Farook", "Razeek", "Careem", "Hameed", "Lafir", "Jiffry", "Marikar", "Cassim", "Rahuman",
+              "Saleem", "Nizar", "Ismail", "Haniffa", "Ansar", "Mohideen", "Azeez", "Buhary", "Thahir", "Sulaiman"]
+
+
+def typo(text, rnd):
+    """Drop, double or swap one character, as when retyping a name"""
+    i = rnd.randrange(1, len(text) - 1)
+    edit = rnd.choice(("drop", "double", "swap"))
+    if edit == "drop":
+        return text[:i] + text[i + 1:]
+    if edit == "double":
+        return text[:i] + text[i] + text[i:]
+    return text[:i - 1] + text[i] + text[i - 1] + text[i + 1:]
+
+
+def make_export(n, resubmit, seed=0):
+    """n applicants, a `resubmit` fraction of them submitting again; returns (dataframe, true duplicate rows)"""
+    rnd = random.Random(seed)
+    records = []
+    for i in range(n):
+        record = applicant_record(i, rnd)
+        record.update(
+            full_name=f"{rnd.choice(FIRST_NAMES)} {rnd.choice(FIRST_NAMES)} {rnd.choice(LAST_NAMES)}",
+            address=f"{rnd.randint(1, 400)}/{rnd.choice('ABC')}, {rnd.choice(LAST_NAMES)} Road, {rnd.choice(CITIES)}",
+            mobile=f"07{rnd.randint(0, 99999999):08d}",
+            dob=f"{rnd.randint(1, 28)} {rnd.choice(['January', 'June', 'November'])} {rnd.randint(2005, 2012)}",
+            nic="",
+        )
+        record["whatsapp_mobile"] = record["mobile"] if rnd.random() < 0.7 else f"07{rnd.randint(0, 99999999):08d}"
+        records.append(record)
+
+    duplicates = set()
+    for i in rnd.sample(range(n), int(n * resubmit)):
+        again = dict(records[i])
+        change = rnd.choice(("typo", "order", "numbers", "address"))
+        if change == "typo":
+            again["full_name"] = typo(again["full_name"], rnd)
+        elif change == "order":
+            first, *rest = again["full_name"].split()
+            again["full_name"] = " ".join(rest + [first])
+        elif change == "numbers":
+            again["mobile"], again["whatsapp_mobile"] = again["whatsapp_mobile"], again["mobile"]
+        else:
+            again["address"] = again["address"].replace("Road", "Rd.")
+        again["timestamp"] = f"2/{rnd.randint(1, 28)}/2026 09:{rnd.randint(0, 59):02d}:00"
+        records.append(again)
+        duplicates.add(len(records) - 1)
+
+    df = pd.DataFrame([[record[key] for key in FORM_FIELDS] for record in records], columns=list(FORM_FIELDS))
+    return validate_export(df).df, duplicates
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("--resubmit", type=float, default=0.15, help="fraction of applicants who submit twice")
+    args = parser.parse_args()
+
+    print(f"{'rows':>7s} {'time':>9s} {'compared':>10s} {'all pairs':>13s} {'found':>7s} {'precision':>9s} {'recall':>7s}")
+    for n in args.sizes:
+        df, truth = make_export(n, args.resubmit)
+        started = time.perf_counter()
+        result = find_duplicates(df, keep="first")
+        elapsed = time.perf_counter() - started
+
+        found = {row - 2 for row in result.duplicates["row"]}
+        correct = len(found & truth)
+        precision = correct / len(found) if found else 1.0
+        recall = correct / len(truth) if truth else 1.0
+        total_pairs = len(df) * (len(df) - 1) // 2
+        print(f"{len(df):7d} {elapsed * 1000:7.0f} ms {result.comparisons:10d} {total_pairs:13d} "
+              f"{len(found):7d} {precision:9.3f} {recall:7.3f}")
+
+
+if __name__ == "__main__":
+    main()
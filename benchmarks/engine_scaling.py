@@ -0,0 +1,38 @@
+"""
+Throughput of RenderEngine at 1..N worker processes.
+
+    python -m benchmarks.engine_scaling --rows 400
+"""
+import argparse
+import time
+
+from cit_profile.engine import RenderEngine, available_cpus, render_row
+
+from .synthetic import make_rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=400)
+    parser.add_argument("--max-workers", type=int, default=available_cpus())
+    parser.add_argument("--chunksize", type=int, default=4)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+
+    started = time.perf_counter()
+    for row_number, fields in rows:
+        render_row(row_number, fields)
+    serial = args.rows / (time.perf_counter() - started)
+    print(f"in-thread      {serial:8.1f} PDFs/sec")
+
+    for workers in range(1, args.max_workers + 1):
+        engine = RenderEngine(workers=workers, chunksize=args.chunksize)
+        for _ in engine.render(rows, ordered=False):
+            pass
+        rate = engine.stats.pdfs_per_sec
+        print(f"{workers:2d} worker(s)   {rate:8.1f} PDFs/sec   x{rate / serial:.2f} vs in-thread")
+
+
+if __name__ == "__main__":
+    main()
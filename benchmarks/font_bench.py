@@ -0,0 +1,89 @@
+"""
+PDF size and render time for Tamil and Sinhala applicants, Helvetica vs TTF.
+
+"helvetica" is the template without script fonts (those values come out as
+boxes); "ttf" sets them in the fonts from --font-dir, embedded as subsets.
+Also reports what registering the fonts costs once per process, which a
+render would pay every time if it registered them itself.
+
+    python -m benchmarks.font_bench --font-dir assets/fonts --count 200
+"""
+import argparse
+import os
+import random
+import statistics
+import time
+
+from reportlab.pdfbase.ttfonts import TTFont
+
+from cit_profile.fonts import FONT_DIR, FONT_FILES, FontSet
+from cit_profile.pdf import CanvasProfile, ProfileTemplate
+
+from .synthetic import SINHALA_ADDRESS, applicant_record
+
+KINDS = ("typical", "tamil", "sinhala", "tamil+sinhala")
+
+
+def make_records(kind, count):
+    rnd = random.Random(0)
+    if kind != "tamil+sinhala":
+        return [applicant_record(i, rnd, kind) for i in range(count)]
+    # A Tamil name at a Sinhala address: both fonts in one document
+    records = [applicant_record(i, rnd, "tamil") for i in range(count)]
+    for record in records:
+        record.update(address=SINHALA_ADDRESS, parent_address=SINHALA_ADDRESS)
+    return records
+
+
+def measure(renders, records):
+    """(median ms, mean KB) per render; the renders take turns on each record, so drift hits all alike"""
+    for render in renders.values():
+        render(records[0])   # template, glyph widths, layout cache
+    timings = {name: [] for name in renders}
+    sizes = {name: [] for name in renders}
+    for record in records:
+        for name, render in renders.items():
+            started = time.perf_counter()
+            pdf_bytes = render(record)
+            timings[name].append(time.perf_counter() - started)
+            sizes[name].append(len(pdf_bytes))
+    return {name: (statistics.median(timings[name]) * 1000, statistics.mean(sizes[name]) / 1024) for name in renders}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--font-dir", default=FONT_DIR, help="holds " + " and ".join(FONT_FILES.values()))
+    parser.add_argument("--count", type=int, default=200)
+    args = parser.parse_args()
+
+    paths = {script: os.path.join(args.font_dir, file_name) for script, file_name in FONT_FILES.items()}
+    missing = [path for path in paths.values() if not os.path.isfile(path)]
+    if missing:
+        # No fonts ship with the app (see README.md)
+        print("skipped: font file(s) not found: " + ", ".join(missing) + ". Download Noto Sans Tamil and Noto "
+              "Sans Sinhala (SIL Open Font License) into --font-dir, or set CIT_FONT_DIR.")
+        return
+
+    for path in paths.values():
+        started = time.perf_counter()
+        TTFont("bench-" + os.path.basename(path), path)
+        print(f"register {os.path.basename(path)}: {(time.perf_counter() - started) * 1000:.1f} ms "
+              f"({os.path.getsize(path) / 1024:.0f} KB file), once per process")
+
+    templates = {"helvetica": ProfileTemplate(fonts=FontSet()), "ttf": ProfileTemplate(fonts=FontSet(paths))}
+    print(f"\n{'':16s} {'':10s} {'platypus':>20s} {'canvas':>20s}")
+    for kind in KINDS:
+        records = make_records(kind, args.count)
+        renders = {}
+        for fonts, template in templates.items():
+            renders[fonts, "platypus"] = template.render
+            renders[fonts, "canvas"] = CanvasProfile(template).render
+        results = measure(renders, records)
+        for fonts in templates:
+            print(f"{kind:16s} {fonts:10s} " + " ".join(
+                f"{ms:8.2f} ms {kb:6.1f} KB" for ms, kb in (results[fonts, "platypus"], results[fonts, "canvas"])))
+    print("(median time, mean size; the canvas layout hands non-WinAnsi applicants to platypus)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Cold start time of the headless CLI vs. the Streamlit app.
+
+Each target runs in a fresh interpreter; the best of --repeat runs is reported.
+
+    python -m benchmarks.import_time
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TARGETS = {
+    "cli --help": [sys.executable, "-m", "cit_profile", "--help"],
+    "import cit_profile": [sys.executable, "-c", "import cit_profile"],
+    "import cit_profile.cli": [sys.executable, "-c", "import cit_profile.cli"],
+    # Bare-mode run of the whole script: streamlit + UI construction, no server
+    "app.py (bare)": [sys.executable, "-c", "import runpy; runpy.run_path('app.py', run_name='__main__')"],
+}
+
+
+def best_time(command, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run(command, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for name, command in TARGETS.items():
+        print(f"{name:24s} {best_time(command, args.repeat) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Per-PDF size and render time for each logo DPI.
+
+"reportlab default" is how the logo used to be embedded: the source JPEG
+wrapped in ASCII85 by ReportLab.
+
+    python -m benchmarks.logo_bench --dpi 300 200 150 96
+"""
+import argparse
+import time
+
+from reportlab.pdfbase.pdfdoc import PDFImageXObject
+
+from cit_profile.assets import LogoAsset
+from cit_profile.forms import row_to_record
+from cit_profile.pdf import ProfileTemplate
+
+from .synthetic import make_rows
+
+
+def measure(template, records):
+    template.render(records[0])  # warm up
+    started = time.perf_counter()
+    sizes = [len(template.render(record)) for record in records]
+    elapsed = time.perf_counter() - started
+    return sum(sizes) / len(sizes), elapsed / len(records)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--dpi", type=int, nargs="+", default=[300, 200, 150, 96])
+    parser.add_argument("--count", type=int, default=50)
+    args = parser.parse_args()
+
+    records = [row_to_record(fields) for _, fields in make_rows(args.count)]
+
+    legacy = LogoAsset()
+    legacy.xobject = PDFImageXObject(legacy.digest, legacy.path)
+    variants = [("reportlab default", legacy), ("source", LogoAsset())]
+    variants += [(f"{dpi} dpi", LogoAsset(dpi=dpi)) for dpi in args.dpi]
+
+    baseline = None
+    print(f"{'logo':18s} {'pixels':>10s} {'logo':>9s} {'PDF':>9s} {'saved':>9s} {'render':>9s}")
+    for name, logo in variants:
+        size, latency = measure(ProfileTemplate(logo), records)
+        baseline = baseline or size
+        print(f"{name:18s} {logo.pixel_size[0]:4d}x{logo.pixel_size[1]:<4d} "
+              f"{len(logo.jpeg_bytes) / 1024:6.1f} KB {size / 1024:6.1f} KB "
+              f"{(baseline - size) / 1024:6.1f} KB {latency * 1000:6.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
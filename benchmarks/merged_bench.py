@@ -0,0 +1,45 @@
+"""
+N separate profile PDFs vs. one merged document, by size and render time.
+
+    python -m benchmarks.merged_bench --sizes 1 10 50 200
+"""
+import argparse
+import io
+import time
+
+from cit_profile.forms import row_to_record
+from cit_profile.pdf import get_template
+
+from .synthetic import make_rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 50, 200])
+    args = parser.parse_args()
+
+    template = get_template()
+    records = [row_to_record(fields) for _, fields in make_rows(max(args.sizes))]
+    template.render(records[0])  # warm up
+
+    print(f"{'N':>5s}  {'separate':>12s} {'':>9s}  {'merged':>12s} {'':>9s}  {'per applicant':>14s}")
+    for n in args.sizes:
+        batch = records[:n]
+
+        started = time.perf_counter()
+        separate_size = sum(len(template.render(record)) for record in batch)
+        separate_time = time.perf_counter() - started
+
+        buffer = io.BytesIO()
+        started = time.perf_counter()
+        template.render_many(batch, buffer)
+        merged_time = time.perf_counter() - started
+        merged_size = len(buffer.getvalue())
+
+        print(f"{n:5d}  {separate_size / 1024:9.1f} KB {separate_time:7.2f} s  "
+              f"{merged_size / 1024:9.1f} KB {merged_time:7.2f} s  "
+              f"{merged_size / n / 1024:9.1f} KB {merged_time / n * 1000:6.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
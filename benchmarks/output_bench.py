@@ -0,0 +1,78 @@
+"""
+PDF size and CPU cost of each output profile (cit_profile.output).
+
+For every profile: the one-time cost of its template (logo recompression),
+then per PDF with each layout the mean size, median wall time and median
+CPU time, and the size per applicant of a merged document of --merged
+applicants. The profiles take turns on each applicant, so drift in the
+machine's speed hits them all alike.
+
+    python -m benchmarks.output_bench --count 200
+"""
+import argparse
+import io
+import random
+import statistics
+import time
+
+from cit_profile.output import OUTPUT_PROFILES
+from cit_profile.pdf import CanvasProfile, ProfileTemplate
+
+from .synthetic import applicant_record
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=200)
+    parser.add_argument("--merged", type=int, default=50, help="applicants in the merged document")
+    args = parser.parse_args()
+
+    rnd = random.Random(0)
+    records = [applicant_record(i, rnd) for i in range(args.count)]
+
+    ProfileTemplate()   # imports, style sheet, Pillow
+    templates, setup = {}, {}
+    for name in OUTPUT_PROFILES:
+        started = time.process_time()
+        templates[name] = ProfileTemplate(output=name)
+        setup[name] = time.process_time() - started
+
+    renders = {}
+    for name, template in templates.items():
+        renders[name, "platypus"] = template.render
+        renders[name, "canvas"] = CanvasProfile(template).render
+    for render in renders.values():
+        render(records[0])   # glyph widths, layout cache
+
+    wall = {key: [] for key in renders}
+    cpu = {key: [] for key in renders}
+    sizes = {key: [] for key in renders}
+    for record in records:
+        for key, render in renders.items():
+            started, started_cpu = time.perf_counter(), time.process_time()
+            pdf_bytes = render(record)
+            cpu[key].append(time.process_time() - started_cpu)
+            wall[key].append(time.perf_counter() - started)
+            sizes[key].append(len(pdf_bytes))
+
+    baseline = statistics.mean(sizes["default", "platypus"])
+    print(f"{'profile':12s} {'setup':>9s}  {'layout':9s} {'size':>9s} {'vs default':>10s} {'wall':>9s} {'cpu':>9s}")
+    for name in templates:
+        for layout in ("platypus", "canvas"):
+            key = name, layout
+            size = statistics.mean(sizes[key])
+            print(f"{name:12s} {setup[name] * 1000:6.1f} ms  {layout:9s} {size / 1024:6.1f} KB {size / baseline - 1:+10.0%} "
+                  f"{statistics.median(wall[key]) * 1000:6.2f} ms {statistics.median(cpu[key]) * 1000:6.2f} ms")
+
+    print(f"\nmerged document of {args.merged} applicants")
+    for name, template in templates.items():
+        buffer = io.BytesIO()
+        started = time.process_time()
+        template.render_many(records[:args.merged], buffer)
+        elapsed = time.process_time() - started
+        print(f"{name:12s} {len(buffer.getvalue()) / 1024:8.1f} KB ({len(buffer.getvalue()) / args.merged / 1024:.1f} KB "
+              f"per applicant)  cpu {elapsed * 1000 / args.merged:6.2f} ms per applicant")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Load test for the HTTP render service (cit_profile.server) on one box.
+
+Starts the service, then `--clients` threads send applicants for
+`--seconds`: one per POST /render, or `--batch` per POST /render/batch,
+each client on one kept-alive connection (or a new connection per request
+with --no-keep-alive). Reports PDFs/sec, request latency percentiles and
+how many requests were turned away with 503. The first request is timed on
+its own, to show that the pool was warm before the port opened.
+
+    python -m benchmarks.render_service --clients 8 --seconds 10
+    python -m benchmarks.render_service --clients 32 --max-pending 8   # backpressure
+    python -m benchmarks.render_service --batch 20 --workers 2
+"""
+import argparse
+import http.client
+import json
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+from .synthetic import applicant_record
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_service(port, args):
+    command = [sys.executable, "-m", "cit_profile.server", "--port", str(port), "--layout", args.layout]
+    if args.workers:
+        command += ["--workers", str(args.workers)]
+    if args.max_pending:
+        command += ["--max-pending", str(args.max_pending)]
+    started = time.perf_counter()
+    service = subprocess.Popen(command, stderr=subprocess.PIPE, text=True)
+    service.stderr.readline()   # "Rendering on ..." once the pool is warm and the port is open
+    return service, time.perf_counter() - started
+
+
+def post(connection, path, body):
+    connection.request("POST", path, body=body, headers={"Content-Type": "application/json"})
+    response = connection.getresponse()
+    response.read()
+    return response.status
+
+
+def client(port, args, bodies, stop, results):
+    connection = http.client.HTTPConnection("127.0.0.1", port)
+    path = "/render/batch" if args.batch else "/render"
+    n = 0
+    while not stop.is_set():
+        if not args.keep_alive:
+            connection.close()
+        started = time.perf_counter()
+        status = post(connection, path, bodies[n % len(bodies)])
+        results.append((status, time.perf_counter() - started))
+        if status == 503:
+            time.sleep(0.1)   # a shorter back-off than the Retry-After, to keep the queue under pressure
+        n += 1
+    connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--batch", type=int, default=0, help="applicants per /render/batch request (default: /render)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--max-pending", type=int, default=None)
+    parser.add_argument("--layout", default="canvas")
+    parser.add_argument("--no-keep-alive", dest="keep_alive", action="store_false")
+    args = parser.parse_args()
+
+    rnd = random.Random(0)
+    records = [applicant_record(i, rnd) for i in range(200)]
+    if args.batch:
+        bodies = [json.dumps({"applicants": records[i:i + args.batch]}) for i in range(0, len(records), args.batch)]
+    else:
+        bodies = [json.dumps(record) for record in records]
+
+    port = free_port()
+    service, startup = start_service(port, args)
+    try:
+        connection = http.client.HTTPConnection("127.0.0.1", port)
+        started = time.perf_counter()
+        post(connection, "/render", json.dumps(records[0]))
+        first = time.perf_counter() - started
+        connection.request("GET", "/health")
+        health = json.loads(connection.getresponse().read())
+        connection.close()
+
+        stop = threading.Event()
+        results = []
+        threads = [threading.Thread(target=client, args=(port, args, bodies, stop, results))
+                   for _ in range(args.clients)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        time.sleep(args.seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+    finally:
+        service.terminate()
+        service.wait()
+
+    ok = sorted(seconds * 1000 for status, seconds in results if status == 200)
+    rejected = sum(1 for status, _ in results if status == 503)
+    other = len(results) - len(ok) - rejected
+    pdfs = len(ok) * (args.batch or 1)
+
+    print(f"service ready in {startup:.2f}s with {health['workers']} worker(s), "
+          f"max {health['max_pending']} queued; first request {first * 1000:.1f} ms")
+    print(f"{args.clients} client(s), {'batches of ' + str(args.batch) if args.batch else 'one applicant'} per request, "
+          f"{'keep-alive' if args.keep_alive else 'new connection per request'}")
+    print(f"  {pdfs / elapsed:8.1f} PDFs/sec   {len(results) / elapsed:8.1f} requests/sec")
+    if ok:
+        print(f"  latency ms: p50 {statistics.median(ok):.1f}  p95 {ok[int(0.95 * (len(ok) - 1))]:.1f}  "
+              f"p99 {ok[int(0.99 * (len(ok) - 1))]:.1f}  max {ok[-1]:.1f}")
+    print(f"  {len(ok)} ok, {rejected} rejected (503), {other} other")
+
+
+if __name__ == "__main__":
+    main()
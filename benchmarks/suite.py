@@ -0,0 +1,159 @@
+"""
+Benchmark suite for the profile generator hot paths.
+
+Runs each benchmark (PDF render with each layout, Google Forms row parsing,
+text export) over each kind of synthetic applicant in a fresh process and
+reports p50/p95/p99 latency, operations per second, peak RSS and output size.
+
+    python -m benchmarks.suite --count 200 --output bench.json
+    python -m benchmarks.suite --compare bench.json        # against an earlier run
+"""
+import argparse
+import json
+import multiprocessing
+import platform
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from .synthetic import KINDS, make_rows
+
+BENCHMARKS = ("pdf", "pdf_canvas", "parse", "text")
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KiB on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _operation(benchmark):
+    from cit_profile import create_pdf_profile, create_text_profile, row_to_record
+
+    if benchmark == "pdf":
+        return lambda fields: create_pdf_profile(row_to_record(fields))
+    if benchmark == "pdf_canvas":
+        return lambda fields: create_pdf_profile(row_to_record(fields), layout="canvas")
+    if benchmark == "parse":
+        return lambda fields: row_to_record("\t".join(fields).split("\t"))
+    if benchmark == "text":
+        return lambda fields: create_text_profile(row_to_record(fields))
+    raise ValueError(f"Unknown benchmark: {benchmark}")
+
+
+def run_case(benchmark, kind, count, seed):
+    """Runs in a fresh worker process so peak RSS belongs to this case alone"""
+    rows = [fields for _, fields in make_rows(count, seed=seed, kind=kind)]
+    operation = _operation(benchmark)
+
+    operation(rows[0])  # warm-up: imports, font metrics, template
+    rss_before = peak_rss_mb()
+
+    timings = []
+    output_bytes = 0
+    started = time.perf_counter()
+    for fields in rows:
+        t0 = time.perf_counter()
+        output = operation(fields)
+        timings.append(time.perf_counter() - t0)
+        if isinstance(output, (bytes, str)):
+            output_bytes += len(output.encode("utf-8") if isinstance(output, str) else output)
+    elapsed = time.perf_counter() - started
+
+    cuts = statistics.quantiles(timings, n=100, method="inclusive")
+    rss_after = peak_rss_mb()
+    return {
+        "benchmark": benchmark,
+        "kind": kind,
+        "count": count,
+        "p50_ms": cuts[49] * 1000,
+        "p95_ms": cuts[94] * 1000,
+        "p99_ms": cuts[98] * 1000,
+        "mean_ms": statistics.mean(timings) * 1000,
+        "ops_per_sec": count / elapsed,
+        "peak_rss_mb": rss_after,
+        "peak_rss_growth_mb": None if rss_after is None else rss_after - rss_before,
+        "avg_output_bytes": output_bytes / count if output_bytes else None,
+    }
+
+
+def run_suite(benchmarks, kinds, count, seed=0):
+    results = []
+    context = multiprocessing.get_context("spawn")
+    for benchmark in benchmarks:
+        for kind in kinds:
+            with ProcessPoolExecutor(1, mp_context=context) as pool:
+                results.append(pool.submit(run_case, benchmark, kind, count, seed).result())
+            print(format_result(results[-1]), flush=True)
+    return results
+
+
+def environment():
+    import reportlab
+
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "reportlab": reportlab.Version,
+        "platform": platform.platform(),
+        "cpus": multiprocessing.cpu_count(),
+    }
+
+
+def format_result(result):
+    line = (f"{result['benchmark']:6s} {result['kind']:8s} "
+            f"p50 {result['p50_ms']:8.3f} ms  p95 {result['p95_ms']:8.3f} ms  p99 {result['p99_ms']:8.3f} ms  "
+            f"{result['ops_per_sec']:9.1f}/s")
+    if result["peak_rss_mb"] is not None:
+        line += f"  rss {result['peak_rss_mb']:6.1f} MB"
+    if result["avg_output_bytes"]:
+        line += f"  {result['avg_output_bytes'] / 1024:6.1f} KB"
+    return line
+
+
+def compare(results, baseline):
+    """Print the change of each case relative to a previous run"""
+    previous = {(r["benchmark"], r["kind"]): r for r in baseline["results"]}
+    print(f"\nCompared with run from {baseline['environment']['timestamp']}:")
+    for result in results:
+        old = previous.get((result["benchmark"], result["kind"]))
+        if not old:
+            continue
+        changes = "  ".join(
+            f"{metric} {(result[metric] - old[metric]) / old[metric] * 100:+6.1f}%"
+            for metric in ("p50_ms", "p95_ms", "ops_per_sec")
+            if old[metric]
+        )
+        print(f"{result['benchmark']:6s} {result['kind']:8s} {changes}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=200, help="operations per case")
+    parser.add_argument("--benchmark", action="append", choices=BENCHMARKS, help="default: all")
+    parser.add_argument("--kind", action="append", choices=KINDS, help="default: all")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--compare", help="JSON from an earlier run to compare against")
+    args = parser.parse_args()
+
+    results = run_suite(args.benchmark or BENCHMARKS, args.kind or KINDS, args.count, args.seed)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(results, json.load(f))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"environment": environment(), "results": results}, f, indent=2)
+        print(f"\nSaved {len(results)} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import random
+
+from cit_profile.forms import FORM_FIELDS
+
+SCHOOLS = ["Hejazz International", "Al Haqqaniyyah Arabic College", "Zahira College", "D. S. Senanayake College"]
+CITIES = ["Kandy", "Colombo", "Akurana", "Dehiwala", "Kattankudy"]
+
+TAMIL_NAMES = ["முகம்மது அஸ்லம் முகம்மது", "அஹமட் பாரூக் ஷிபாஸ்", "இப்ராஹிம் ரிஸ்வான்"]
+TAMIL_ADDRESS = "19, இப்ராஹிம் வீதி, கண்டி"
+SINHALA_NAMES = ["මොහොමඩ් අස්ලම් මුහම්මද්", "අහමඩ් ෆාරූක් ෂිෆාස්", "ඉබ්‍රාහිම් රිස්වාන්"]
+SINHALA_ADDRESS = "19, ඉබ්‍රාහිම් පාර, මහනුවර"
+
+REASON = (
+    "Wants to be with parents and continue studies closer to home. The family moved "
+    "to Colombo last year and travelling back to the previous institute every week is "
+    "no longer possible, especially during the rainy season."
+)
+
+
+def applicant_record(i, rnd, kind="typical"):
+    """
+    One applicant as a field -> value dict.
+
+    kind: "short" (minimal values), "typical", "long" (multi-paragraph reason
+    and long addresses, to stress wrapping), "tamil" or "sinhala" (non-ASCII
+    names and addresses).
+    """
+    memorized = rnd.choice(["Yes", "No"])
+    school = rnd.choice(SCHOOLS)
+    city = rnd.choice(CITIES)
+    record = {
+        "timestamp": f"1/{i % 28 + 1}/2026 18:{i % 60:02d}:21",
+        "full_name": f"Mohammed Aslam Muhammed {i}",
+        "address": f"{i}, Ibrahim Road, {city}",
+        "whatsapp_mobile": "0772226866",
+        "mobile": "0772226866",
+        "dob": "19 February 2009",
+        "place_of_birth": rnd.choice(CITIES),
+        "nic": rnd.choice(["", "200905012345"]),
+        "languages": "English, Tamil",
+        "school_attended": school,
+        "last_institute": school,
+        "medium": "English",
+        "last_standard": "GCE (O/L)",
+        "last_attended": "2023, June",
+        "quran_memorized": memorized,
+        "juz_count": "30" if memorized == "Yes" else "",
+        "islamic_institute": "Al Haqqaniyyah Arabic College",
+        "city_location": rnd.choice(CITIES),
+        "duration": f"{rnd.randint(1, 6)} years",
+        "reason_leaving": "Wants to be with parents and continue studies",
+        "parent_name": f"Ahamad Farook Mohammed {i}",
+        "parent_address": f"{i}, Ibrahim Road, {city}",
+        "father_residing": rnd.choice(["Inland", "Overseas"]),
+        "occupation": "Business",
+        "parent_mobile": "0771234567",
+        "parent_whatsapp": "0771234567",
+        "home_languages": "English, Tamil",
+    }
+
+    if kind == "short":
+        record.update(full_name=f"Aslam {i}", address=city, reason_leaving="Family", school_attended="Zahira",
+                      last_institute="Zahira", islamic_institute="-", parent_name=f"Farook {i}", parent_address=city)
+    elif kind == "long":
+        long_address = f"{i}/C, " + ", ".join(f"{rnd.choice(CITIES)} Cross Road Lane {n}" for n in range(12))
+        record.update(
+            address=long_address,
+            parent_address=long_address,
+            reason_leaving="\n\n".join([REASON] * 5),
+            school_attended=", ".join(SCHOOLS * 3),
+        )
+    elif kind in ("tamil", "sinhala"):
+        names, address = (TAMIL_NAMES, TAMIL_ADDRESS) if kind == "tamil" else (SINHALA_NAMES, SINHALA_ADDRESS)
+        record.update(
+            full_name=f"{rnd.choice(names)} {i}",
+            address=address,
+            parent_name=rnd.choice(names),
+            parent_address=address,
+            languages="Tamil, Sinhala",
+            home_languages="Tamil" if kind == "tamil" else "Sinhala",
+        )
+    elif kind != "typical":
+        raise ValueError(f"Unknown applicant kind: {kind}")
+
+    return record
+
+
+KINDS = ("short", "typical", "long", "tamil", "sinhala")
+
+
+def applicant_row(i, rnd, kind="typical"):
+    """One Google Forms row (27 cell values)"""
+    record = applicant_record(i, rnd, kind)
+    return [record[key] for key in FORM_FIELDS]
+
+
+def make_rows(n, seed=0, kind="typical"):
+    """(row_number, fields) pairs as produced by cit_profile.sheet.iter_rows"""
+    rnd = random.Random(seed)
+    return [(i + 2, applicant_row(i, rnd, kind)) for i in range(n)]
@@ -0,0 +1,50 @@
+"""
+Per-PDF latency with and without the precompiled ProfileTemplate.
+
+"rebuilt" constructs a new template for every PDF, which is what
+create_pdf_profile used to do on each call; "precompiled" reuses one.
+
+    python -m benchmarks.template_bench --count 200
+"""
+import argparse
+import statistics
+import time
+
+from cit_profile.forms import row_to_record
+from cit_profile.pdf import ProfileTemplate
+
+from .synthetic import make_rows
+
+
+def time_per_pdf(render, records):
+    timings = []
+    for record in records:
+        started = time.perf_counter()
+        render(record)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=200)
+    args = parser.parse_args()
+
+    records = [row_to_record(fields) for _, fields in make_rows(args.count)]
+    template = ProfileTemplate()
+    template.render(records[0])  # warm up imports and font metrics
+
+    results = {
+        "rebuilt": time_per_pdf(lambda record: ProfileTemplate().render(record), records),
+        "precompiled": time_per_pdf(template.render, records),
+    }
+
+    for name, timings in results.items():
+        print(f"{name:12s} mean {statistics.mean(timings) * 1000:6.2f} ms   "
+              f"median {statistics.median(timings) * 1000:6.2f} ms")
+    speedup = statistics.mean(results["rebuilt"]) / statistics.mean(results["precompiled"])
+    print(f"speedup      x{speedup:.2f}")
+
+
+if __name__ == "__main__":
+    main()
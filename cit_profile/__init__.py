@@ -0,0 +1,33 @@
+import importlib
+
+from .fields import FIELDS, Field
+from .forms import FORM_FIELDS, PROFILE_FIELDS, REQUIRED_FIELDS, missing_required, pdf_filename, row_to_record
+from .text import create_text_profile
+
+# Loaded on first use, so importing the package (or cit_profile.fields) does
+# not pull in ReportLab
+_LAZY = {
+    "create_pdf_profile": ".pdf",
+    "RenderEngine": ".engine",
+    "RowResult": ".engine",
+    "render_row": ".engine",
+    "PDFCache": ".cache",
+    "export_batch": ".exporters",
+}
+
+__all__ = [
+    "FIELDS", "Field", "FORM_FIELDS", "PROFILE_FIELDS", "REQUIRED_FIELDS", "missing_required", "pdf_filename",
+    "row_to_record", "create_text_profile", *_LAZY,
+]
+
+
+def __getattr__(name):
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(__all__)
@@ -0,0 +1,92 @@
+import io
+import os
+import shutil
+import zipfile
+
+
+class ZipArchive:
+    """
+    Writes files into a ZIP as they arrive. `dest` may be a path, a seekable
+    file, or an unseekable stream such as stdout or a socket.
+    """
+
+    def __init__(self, dest):
+        self._zip = zipfile.ZipFile(dest, "w", compression=zipfile.ZIP_DEFLATED)
+
+    def add(self, filename, data):
+        self._zip.writestr(filename, data)
+
+    def add_file(self, filename, path):
+        """Copy a file from disk into the ZIP without reading it all into memory"""
+        self._zip.write(path, filename)
+
+    def close(self):
+        self._zip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class DirArchive:
+    """Writes each file into a directory"""
+
+    def __init__(self, out_dir):
+        self.out_dir = out_dir
+        os.makedirs(out_dir, exist_ok=True)
+
+    def add(self, filename, data):
+        mode = "w" if isinstance(data, str) else "wb"
+        encoding = "utf-8" if isinstance(data, str) else None
+        with open(os.path.join(self.out_dir, filename), mode, encoding=encoding, newline="" if encoding else None) as f:
+            f.write(data)
+
+    def add_file(self, filename, path):
+        shutil.copyfile(path, os.path.join(self.out_dir, filename))
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class _ChunkSink(io.RawIOBase):
+    # Unseekable, so zipfile writes data descriptors instead of seeking back
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def pop(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_zip(files):
+    """
+    Yield the bytes of a ZIP built from (filename, data) pairs, one chunk per
+    file, e.g. for a chunked HTTP response. Memory use does not grow with the
+    number of files.
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for filename, data in files:
+            zf.writestr(filename, data)
+            chunk = sink.pop()
+            if chunk:
+                yield chunk
+    chunk = sink.pop()  # central directory
+    if chunk:
+        yield chunk
@@ -0,0 +1,66 @@
+import hashlib
+import io
+import os
+
+from reportlab.pdfbase.pdfdoc import PDFImageXObject
+
+LOGO_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets", "logo.jpg")
+
+# Printed size of the logo in the header, in points
+LOGO_WIDTH = 165
+LOGO_HEIGHT = 70
+
+# Typical choices for logo_dpi; None embeds the source file as it is
+PRINT_DPI = 300
+EMAIL_DPI = 150
+
+
+class LogoAsset:
+    """
+    The header logo, prepared once per process: optionally downsampled to
+    `dpi` at its printed size, encoded as JPEG and wrapped in an image XObject
+    that every document shares.
+    """
+
+    def __init__(self, path=LOGO_PATH, dpi=None, quality=85):
+        self.path = path
+        self.dpi = dpi
+        self.quality = quality
+
+        with open(path, "rb") as f:
+            self.source_bytes = f.read()
+
+        self.jpeg_bytes, self.pixel_size = self._prepare()
+        self.digest = hashlib.md5(self.jpeg_bytes).hexdigest()
+        self.xobject = self._xobject()
+
+    def _prepare(self):
+        from PIL import Image
+
+        image = Image.open(io.BytesIO(self.source_bytes))
+        if self.dpi is None:
+            return self.source_bytes, image.size
+
+        target = (round(LOGO_WIDTH / 72 * self.dpi), round(LOGO_HEIGHT / 72 * self.dpi))
+        if target[0] >= image.width:
+            # Never upsample; the source already has enough pixels for this DPI
+            return self.source_bytes, image.size
+
+        image = image.convert("RGB").resize(target, Image.LANCZOS)
+        out = io.BytesIO()
+        image.save(out, "JPEG", quality=self.quality, optimize=True)
+        return out.getvalue(), target
+
+    def _xobject(self):
+        xobject = PDFImageXObject(self.digest)
+        if not xobject.loadImageFromJPEG(io.BytesIO(self.jpeg_bytes)):
+            raise ValueError(f"Logo is not a JPEG: {self.path}")
+
+        # Embed the JPEG as raw binary; ReportLab's default ASCII85 wrapping adds 25%
+        xobject.streamContent = self.jpeg_bytes
+        xobject._filters = ("DCTDecode",)
+        return xobject
+
+    @property
+    def effective_dpi(self):
+        return self.pixel_size[0] / (LOGO_WIDTH / 72)
@@ -0,0 +1,141 @@
+import csv
+import io
+import os
+import time
+from dataclasses import dataclass, field
+
+from .archive import DirArchive, ZipArchive, iter_zip
+from .engine import RowResult, check_row, render_row
+from .forms import pdf_filename
+from .pdf import create_pdf_profile, get_template
+
+
+@dataclass
+class BatchReport:
+    rendered: int = 0
+    errors: list = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def total(self):
+        return self.rendered + len(self.errors)
+
+    @property
+    def pdfs_per_sec(self):
+        return self.rendered / self.elapsed if self.elapsed else 0.0
+
+
+def unique_name(filename, used):
+    """Suffix _2, _3, ... so applicants with the same name don't overwrite each other"""
+    stem, ext = os.path.splitext(filename)
+    candidate = filename
+    n = 2
+    while candidate in used:
+        candidate = f"{stem}_{n}{ext}"
+        n += 1
+    used.add(candidate)
+    return candidate
+
+
+def errors_csv(errors):
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=["row", "full_name", "error"])
+    writer.writeheader()
+    writer.writerows(errors)
+    return out.getvalue()
+
+
+def batch_files(rows, report, render=create_pdf_profile, engine=None):
+    """
+    Render every row and yield (filename, pdf_bytes) as soon as each PDF is
+    ready, so only a handful of documents are in memory at a time. Rows that
+    fail are skipped and added to `report.errors`.
+
+    Pass a RenderEngine to render on a process pool instead of in this thread.
+    """
+    used_names = set()
+    started = time.perf_counter()
+
+    if engine is not None:
+        results = engine.render(rows)
+    else:
+        results = (render_row(row_number, fields, render) for row_number, fields in rows)
+
+    for result in results:
+        if result.error is not None:
+            report.errors.append({"row": result.row_number, "full_name": result.full_name, "error": result.error})
+            continue
+
+        yield unique_name(pdf_filename(result.full_name), used_names), result.pdf_bytes
+        report.rendered += 1
+        report.elapsed = time.perf_counter() - started
+
+    report.elapsed = time.perf_counter() - started
+
+
+def with_error_report(files, report):
+    """Append errors.csv after the last file when any row failed"""
+    yield from files
+    if report.errors:
+        yield "errors.csv", errors_csv(report.errors)
+
+
+def render_batch(rows, archive, render=create_pdf_profile, engine=None, report=None):
+    """
+    Render every row into `archive` (ZipArchive/DirArchive); failures go to
+    errors.csv. Pass a `report` already holding errors (e.g. rows rejected by
+    validation) to have them listed there too.
+    """
+    report = BatchReport() if report is None else report
+    for filename, data in with_error_report(batch_files(rows, report, render, engine), report):
+        archive.add(filename, data)
+    return report
+
+
+def render_batch_zip(rows, dest, render=create_pdf_profile, engine=None, report=None):
+    """Render every row into a ZIP at `dest` (path, file or unseekable stream)"""
+    with ZipArchive(dest) as archive:
+        return render_batch(rows, archive, render=render, engine=engine, report=report)
+
+
+def render_batch_dir(rows, out_dir, render=create_pdf_profile, engine=None, report=None):
+    """Render every row as a PDF file in `out_dir`"""
+    with DirArchive(out_dir) as archive:
+        return render_batch(rows, archive, render=render, engine=engine, report=report)
+
+
+def stream_batch_zip(rows, report, render=create_pdf_profile, engine=None):
+    """Yield ZIP bytes chunk by chunk while rendering, e.g. for a chunked download response"""
+    return iter_zip(with_error_report(batch_files(rows, report, render, engine), report))
+
+
+def render_batch_merged(rows, dest, template=None, outline=True, report=None):
+    """
+    Render every valid row into one multi-page PDF at `dest` (path or binary
+    file) for printing, with a bookmark per applicant unless `outline` is off.
+    Unlike the ZIP writers this builds a single document, so the whole batch
+    is laid out in memory before it is written; an applicant whose page cannot
+    be laid out is left out and reported, like a failed row.
+    """
+    report = BatchReport() if report is None else report
+    template = template or get_template()
+    started = time.perf_counter()
+
+    records = []
+    for row_number, fields in rows:
+        record, failed = check_row(row_number, fields)
+        if failed is None:
+            try:
+                template.check_fits(record)
+            except Exception as e:
+                failed = RowResult(row_number, record["full_name"], error=str(e))
+        if failed is not None:
+            report.errors.append({"row": failed.row_number, "full_name": failed.full_name, "error": failed.error})
+        else:
+            records.append(record)
+
+    if records:
+        template.render_many(records, dest, outline=outline)
+    report.rendered = len(records)
+    report.elapsed = time.perf_counter() - started
+    return report
@@ -0,0 +1,175 @@
+import functools
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from .forms import PROFILE_FIELDS
+from .pdf import TEMPLATE_VERSION, create_pdf_profile, get_template
+
+
+def template_fingerprint(template=None, layout="platypus"):
+    """Identifies everything besides the applicant data that ends up in the PDF"""
+    import reportlab
+
+    template = template or get_template()
+    digest = hashlib.sha256()
+    digest.update(f"{TEMPLATE_VERSION}|{reportlab.Version}|".encode())
+    if layout != "platypus":
+        digest.update(f"{layout}|".encode())   # keeps the keys of existing platypus caches valid
+    if template.output.name != "default":
+        digest.update(f"{template.output}|".encode())
+    digest.update(template.logo.jpeg_bytes)
+    if template.fonts:
+        digest.update(f"|fonts:{template.fonts.digest}".encode())
+    return digest.hexdigest()[:16]
+
+
+def cache_key(data, fingerprint):
+    """Stable hash of the 26 profile fields plus the template fingerprint"""
+    values = [str(data.get(field) or "") for field in PROFILE_FIELDS]
+    payload = json.dumps([fingerprint, values], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.disk_hits + self.misses
+        return (self.hits + self.disk_hits) / lookups if lookups else 0.0
+
+
+class PDFCache:
+    """
+    Content-addressed cache of rendered PDFs.
+
+    Keeps up to `max_items` documents in memory (LRU). If `disk_dir` is set,
+    documents are also written there as <key>.pdf so they survive restarts;
+    once it holds more than `max_disk_items` files, the least recently used
+    are deleted down to 90% of that, so the directory is only scanned every
+    `max_disk_items // 10` new files. `layout`, `output` (the output
+    profile) and `logo_dpi` are passed to create_pdf_profile unless `render`
+    is given. Safe to share between Streamlit sessions.
+    """
+
+    def __init__(self, max_items=128, disk_dir=None, max_disk_items=5000, render=None, layout="platypus",
+                 output=None, logo_dpi=None):
+        self.max_items = max_items
+        self.disk_dir = disk_dir
+        self.max_disk_items = max_disk_items
+        self.render = render or functools.partial(create_pdf_profile, logo_dpi=logo_dpi, layout=layout, output=output)
+        self.fingerprint = template_fingerprint(get_template(logo_dpi, output=output), layout=layout)
+        self.stats = CacheStats()
+        self._items = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+
+        self._disk_files = 0   # .pdf files in disk_dir, as far as this cache knows
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            self._disk_files = sum(1 for entry in os.scandir(disk_dir) if entry.name.endswith(".pdf"))
+
+    def __len__(self):
+        return len(self._items)
+
+    @property
+    def nbytes(self):
+        """Bytes of PDF held in memory"""
+        return self._nbytes
+
+    def key(self, data):
+        return cache_key(data, self.fingerprint)
+
+    def get_or_render(self, data):
+        key = self.key(data)
+
+        with self._lock:
+            pdf_bytes = self._items.get(key)
+            if pdf_bytes is not None:
+                self._items.move_to_end(key)
+                self.stats.hits += 1
+                return pdf_bytes
+
+        pdf_bytes = self._read_disk(key)
+        if pdf_bytes is not None:
+            with self._lock:
+                self.stats.disk_hits += 1
+        else:
+            pdf_bytes = self.render(data)
+            with self._lock:
+                self.stats.misses += 1
+            self._write_disk(key, pdf_bytes)
+
+        self._remember(key, pdf_bytes)
+        return pdf_bytes
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._nbytes = 0
+            self.stats = CacheStats()
+
+    def _remember(self, key, pdf_bytes):
+        with self._lock:
+            previous = self._items.pop(key, None)
+            if previous is not None:
+                self._nbytes -= len(previous)
+            self._items[key] = pdf_bytes
+            self._nbytes += len(pdf_bytes)
+            while len(self._items) > self.max_items:
+                _, evicted = self._items.popitem(last=False)
+                self._nbytes -= len(evicted)
+
+    # ---------- DISK TIER ----------
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.pdf")
+
+    def _read_disk(self, key):
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, "rb") as f:
+                pdf_bytes = f.read()
+            os.utime(path)  # mark as recently used for eviction
+            return pdf_bytes
+        except OSError:
+            return None
+
+    def _write_disk(self, key, pdf_bytes):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        new = not os.path.exists(path)
+        fd, tmp_path = tempfile.mkstemp(dir=self.disk_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(pdf_bytes)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._disk_files += new
+            full = self._disk_files > self.max_disk_items
+        if full:
+            self._trim_disk()
+
+    def _trim_disk(self):
+        entries = [e for e in os.scandir(self.disk_dir) if e.name.endswith(".pdf")]
+        keep = self.max_disk_items - self.max_disk_items // 10
+        removed = 0
+        if len(entries) > keep:
+            entries.sort(key=lambda e: e.stat().st_mtime)
+            for entry in entries[:len(entries) - keep]:
+                try:
+                    os.remove(entry.path)
+                    removed += 1
+                except OSError:
+                    pass
+        with self._lock:
+            self._disk_files = len(entries) - removed
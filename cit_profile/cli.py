@@ -0,0 +1,239 @@
+"""
+Headless batch export: Google Forms export in, applicant PDFs out.
+
+    python -m cit_profile responses.xlsx -o profiles.zip
+    python -m cit_profile responses.tsv -o profiles/ --workers 4
+    python -m cit_profile responses.csv --merged -o committee.pdf
+    python -m cit_profile responses.csv -o - > profiles.zip
+    python -m cit_profile responses.csv --skip-duplicates --keep first --name-threshold 90
+    python -m cit_profile responses.xlsx -o profiles/ --incremental
+    python -m cit_profile responses.csv --metrics metrics.prom --profile
+    python -m cit_profile responses.csv -o export.zip --format pdf --format xlsx --format json
+    python -m cit_profile responses.csv -o archive/ --incremental --output-profile archive
+
+Never imports streamlit, so it runs on servers and from cron.
+"""
+import argparse
+import functools
+import os
+import sys
+
+from .archive import DirArchive, ZipArchive
+from .batch import BatchReport, render_batch_dir, render_batch_merged, render_batch_zip
+from .dedupe import ADDRESS_THRESHOLD, KEEP_CHOICES, NAME_THRESHOLD, find_duplicates
+from .engine import RenderEngine
+from .exporters import EXPORTERS, export_batch
+from .forms import row_to_record
+from .manifest import render_incremental
+from .metrics import METRICS, profile_call
+from .output import OUTPUT_PROFILES
+from .pdf import LAYOUTS, create_pdf_profile, get_template
+from .sheet import EXPORT_TYPES, MATCH_THRESHOLD, iter_rows, load_export
+from .validation import validate_export
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m cit_profile",
+        description="Generate CIT applicant profile PDFs from a Google Forms export.",
+    )
+    parser.add_argument("input", help=f"Google Forms export ({', '.join(EXPORT_TYPES)}); first row is the header")
+    parser.add_argument(
+        "-o", "--output", default="CIT_Applications.zip",
+        help="a .zip file, a directory to write the PDFs into, or - to stream the ZIP to stdout "
+             "(default: %(default)s)",
+    )
+    parser.add_argument("--merged", action="store_true", help="write one multi-page PDF to --output instead")
+    parser.add_argument("--no-outline", action="store_true", help="with --merged, leave out the per-applicant bookmarks")
+    parser.add_argument(
+        "--format", action="append", choices=list(EXPORTERS), dest="formats",
+        help="what to export, repeat for several: per-applicant pdf, docx or txt files, one xlsx master sheet, "
+             "one json file. With anything besides pdf, PDFs render in this process (default: pdf)",
+    )
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="with a directory --output, only render applicants that are new or changed since the last run",
+    )
+    parser.add_argument(
+        "--prune", action="store_true",
+        help="with --incremental, delete the PDFs of applicants no longer in the export (default: just list them)",
+    )
+    parser.add_argument("--workers", type=int, default=None, help="render processes (default: one per CPU)")
+    parser.add_argument("--serial", action="store_true", help="render in this process instead of a process pool")
+    parser.add_argument(
+        "--output-profile", choices=list(OUTPUT_PROFILES), default="default",
+        help="how the PDFs are written: email-small (smallest, downsampled logo, no metadata), print, or archive "
+             "(full-resolution logo, title/author/XMP metadata, sRGB output intent) (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--logo-dpi", type=int, default=None,
+        help="downsample the logo to this DPI, e.g. 300 for print or 150 for email (default: as the output profile "
+             "says; the default profile embeds it as is)",
+    )
+    parser.add_argument(
+        "--layout", choices=LAYOUTS, default="platypus",
+        help="canvas draws each page directly, several times faster and identical to look at; applicants it "
+             "cannot lay out exactly still go through platypus. --merged always uses platypus (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--match-threshold", type=int, default=MATCH_THRESHOLD,
+        help="minimum 0-100 similarity for a column header to match a field (default: %(default)s)",
+    )
+    parser.add_argument("--show-mapping", action="store_true", help="print which column each field was read from")
+    parser.add_argument(
+        "--skip-duplicates", action="store_true",
+        help="render one profile per applicant who submitted the form more than once (default: render every "
+             "submission and list the likely repeats)",
+    )
+    parser.add_argument(
+        "--keep", choices=KEEP_CHOICES, default="latest",
+        help="with --skip-duplicates, which submission to keep for a repeated applicant (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--name-threshold", type=int, default=NAME_THRESHOLD,
+        help="minimum 0-100 name similarity for two submissions to be the same applicant (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--address-threshold", type=int, default=ADDRESS_THRESHOLD,
+        help="minimum 0-100 address similarity for two submissions to be the same applicant (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--metrics", metavar="PATH",
+        help="write per-stage timings when done: Prometheus text for a .prom path, JSON otherwise, - for stderr",
+    )
+    parser.add_argument("--profile", action="store_true", help="print a cProfile report of the first profile's render")
+    parser.add_argument("--quiet-warnings", action="store_true", help="don't list validation warnings")
+    args = parser.parse_args(argv)
+
+    if args.incremental and (args.merged or args.output == "-" or args.output.lower().endswith(".zip")):
+        parser.error("--incremental needs a directory --output")
+    if args.prune and not args.incremental:
+        parser.error("--prune only applies with --incremental")
+    args.formats = list(dict.fromkeys(args.formats or ["pdf"]))
+    if args.formats != ["pdf"] and (args.merged or args.incremental):
+        parser.error("--format only applies to a ZIP or directory --output")
+    return args
+
+
+def print_mapping(mapping, verbose):
+    if mapping.positional:
+        print("Header row not recognised; columns mapped by position", file=sys.stderr)
+    if verbose:
+        for row in mapping.rows():
+            print(f"  {row['field']:18s} <- {row['column'] or '(missing)'}"
+                  + (f"  [{row['score']}]" if row["column"] and row["score"] < 100 else ""), file=sys.stderr)
+        return
+    for key, header, score in mapping.fuzzy if not mapping.positional else []:
+        print(f"  {key} <- {header!r} (similarity {score:.0f})", file=sys.stderr)
+    if mapping.missing:
+        print(f"  no column found for: {', '.join(mapping.missing)}", file=sys.stderr)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    try:
+        with open(args.input, "rb") as f, METRICS.timer("read_export"):
+            df, mapping = load_export(f, args.input, threshold=args.match_threshold)
+    except (OSError, ValueError) as e:
+        print(f"Error reading export: {e}", file=sys.stderr)
+        return 2
+
+    print_mapping(mapping, args.show_mapping)
+
+    # Rejected rows are reported with the render failures and never rendered
+    with METRICS.timer("validate"):
+        validation = validate_export(df)
+    if not args.quiet_warnings:
+        for issue in validation.issues[validation.issues["severity"] == "warning"].itertuples():
+            print(f"  warning: row {issue.row} {issue.field}: {issue.message}", file=sys.stderr)
+    report = BatchReport(errors=validation.error_rows())
+    applicants = validation.valid
+
+    # A match is a guess (siblings share phones and addresses), so repeats are
+    # only listed unless asked to skip them
+    with METRICS.timer("dedupe"):
+        dedupe = find_duplicates(applicants, args.name_threshold, args.address_threshold, keep=args.keep)
+    kind, relation = ("duplicate", "same applicant as") if args.skip_duplicates else ("possible duplicate", "looks like")
+    for duplicate in dedupe.duplicates.itertuples():
+        print(f"  {kind}: row {duplicate.row} {duplicate.full_name} ({relation} row {duplicate.kept_row}, "
+              f"matched on {duplicate.matched_on})", file=sys.stderr)
+    if args.skip_duplicates:
+        applicants = dedupe.df
+    elif dedupe.dropped:
+        print("  (rendered anyway; --skip-duplicates renders one profile per applicant)", file=sys.stderr)
+
+    render = functools.partial(create_pdf_profile, logo_dpi=args.logo_dpi, layout=args.layout,
+                               output=args.output_profile)
+    if args.profile and len(applicants):
+        _, fields = next(iter_rows(applicants.head(1)))
+        record = row_to_record(fields)
+        render(record)   # load the template first, so only the render itself is profiled
+        _, report_text = profile_call(render, record)
+        print(report_text, file=sys.stderr)
+
+    engine = None if args.serial else RenderEngine(workers=args.workers, render=render)
+    rows = iter_rows(applicants)
+    to_stdout = args.output == "-"
+
+    if args.merged:
+        output = sys.stdout.buffer if to_stdout else args.output
+        report = render_batch_merged(rows, output, template=get_template(args.logo_dpi, args.output_profile),
+                                     outline=not args.no_outline, report=report)
+    elif args.formats != ["pdf"]:
+        if to_stdout or args.output.lower().endswith(".zip"):
+            archive = ZipArchive(sys.stdout.buffer if to_stdout else args.output)
+        else:
+            archive = DirArchive(args.output)
+        with archive:
+            report = export_batch(rows, args.formats, archive, render=render, report=report)
+    elif args.incremental:
+        report = render_incremental(rows, args.output, render=render, engine=engine, report=report,
+                                    template=get_template(args.logo_dpi, args.output_profile), prune=args.prune,
+                                    layout=args.layout)
+    elif to_stdout:
+        report = render_batch_zip(rows, sys.stdout.buffer, render=render, engine=engine, report=report)
+    elif args.output.lower().endswith(".zip"):
+        report = render_batch_zip(rows, args.output, render=render, engine=engine, report=report)
+    else:
+        report = render_batch_dir(rows, args.output, render=render, engine=engine, report=report)
+
+    destination = "stdout" if to_stdout else os.path.abspath(args.output)
+    print(f"Generated {report.rendered} of {report.total} profiles in {report.elapsed:.1f}s "
+          f"({report.pdfs_per_sec:.1f} PDFs/sec) -> {destination}", file=sys.stderr if to_stdout else sys.stdout)
+    counters = METRICS.counters()
+    hits, misses = counters.get("layout_cache_hits", 0), counters.get("layout_cache_misses", 0)
+    if hits + misses:
+        print(f"  layout cache: {hits / (hits + misses):.1%} hit rate ({misses} of {hits + misses} cell layouts "
+              f"measured)", file=sys.stderr if to_stdout else sys.stdout)
+
+    if args.incremental:
+        print(f"  {report.new} new, {report.changed} changed, {report.unchanged} unchanged")
+        for removed in report.removed:
+            action = "deleted" if report.pruned else "no longer in the export"
+            print(f"  {action}: {removed['file']} ({removed['full_name']})", file=sys.stderr)
+
+    for error in sorted(report.errors, key=lambda error: error["row"]):
+        print(f"  row {error['row']} {error['full_name'] or '(no name)'}: {error['error']}", file=sys.stderr)
+
+    if args.metrics:
+        write_metrics(args.metrics, report)
+
+    return 1 if report.errors else 0
+
+
+def write_metrics(path, report):
+    run = {"rendered": report.rendered, "failed": len(report.errors), "elapsed": round(report.elapsed, 3),
+           "pdfs_per_sec": round(report.pdfs_per_sec, 2)}
+    if path.endswith(".prom"):
+        text = METRICS.to_prometheus() + "".join(
+            f"# TYPE cit_batch_{key} gauge\ncit_batch_{key} {value}\n" for key, value in run.items()
+        )
+    else:
+        text = METRICS.to_json(run=run) + "\n"
+
+    if path == "-":
+        sys.stderr.write(text)
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
@@ -0,0 +1,182 @@
+"""
+Find applicants who submitted the form more than once.
+
+Comparing every pair of rows is O(n^2), so rows are first grouped into
+blocks that share an exact key: a phone number, the NIC or the date of
+birth (all normalized by validate_export). Names and addresses are only
+compared with rapidfuzz inside a block, which keeps the work close to
+linear for real exports where most blocks hold one or two rows.
+
+Siblings share a phone number and an address, and twins a date of birth
+too, so a similar name in a block is not enough: the two rows must also
+agree on who the applicant is (see find_duplicates). Even so a match is a
+guess, so by default the CLI and the app only list them for checking.
+"""
+import re
+from dataclasses import dataclass
+
+NAME_THRESHOLD = 95
+ADDRESS_THRESHOLD = 75
+
+# A key shared by more rows than this is a placeholder (an office number, a
+# default date), not an identity, and would make the block quadratic again
+MAX_BLOCK = 200
+
+# Columns whose exact values make two rows worth comparing. The two
+# applicant phone columns share one key space: a WhatsApp number given on
+# one submission often turns up as the mobile number on the next.
+BLOCK_KEYS = {
+    "phone": ("mobile", "whatsapp_mobile"),
+    "nic": ("nic",),
+    "dob": ("dob",),
+}
+
+KEEP_CHOICES = ("latest", "first")
+
+DUPLICATE_COLUMNS = ["row", "full_name", "kept_row", "kept_name", "name_score", "address_score", "matched_on"]
+
+
+@dataclass
+class DedupeResult:
+    df: object          # one row per applicant, same index as the input
+    duplicates: object  # dataframe with DUPLICATE_COLUMNS, one row per dropped submission
+    comparisons: int = 0  # name/address pairs scored
+
+    @property
+    def dropped(self):
+        return len(self.duplicates)
+
+
+def blocks(df):
+    """Yield (block key name, array of row positions) for every key shared by two or more rows"""
+    import numpy as np
+    import pandas as pd
+
+    positions = np.arange(len(df))
+    for name, columns in BLOCK_KEYS.items():
+        keys = pd.concat([pd.Series(df[column].to_numpy(), index=positions) for column in columns])
+        keys = keys[keys != ""]
+        # drop_duplicates: the same row can carry a number twice (mobile == WhatsApp)
+        pairs = pd.DataFrame({"key": keys.to_numpy(), "pos": keys.index}).drop_duplicates()
+        pairs = pairs[pairs["key"].duplicated(keep=False)]   # most keys are unique: skip them in bulk
+        for _, group in pairs.groupby("key", sort=False)["pos"]:
+            if len(group) <= MAX_BLOCK:
+                yield name, group.to_numpy()
+
+
+def submission_order(df):
+    """Rank of each row by form timestamp; unparseable timestamps fall back to sheet order"""
+    import numpy as np
+    import pandas as pd
+
+    # Google Forms writes month-first timestamps ("1/3/2026 18:07:21"); the
+    # fixed format is parsed in bulk, anything else one value at a time
+    timestamps = pd.to_datetime(df["timestamp"], format="%m/%d/%Y %H:%M:%S", errors="coerce")
+    other = timestamps.isna() & (df["timestamp"] != "")
+    if other.any():
+        timestamps[other] = pd.to_datetime(df.loc[other, "timestamp"], format="mixed", errors="coerce")
+    order = pd.DataFrame({"timestamp": timestamps.to_numpy(), "pos": np.arange(len(df))})
+    order = order.sort_values(["timestamp", "pos"], na_position="first", kind="stable")
+    rank = np.empty(len(df), dtype=int)
+    rank[order["pos"].to_numpy()] = np.arange(len(df))
+    return rank
+
+
+def _numbers(text):
+    return sorted(re.findall(r"\d+", text))
+
+
+def find_duplicates(df, name_threshold=NAME_THRESHOLD, address_threshold=ADDRESS_THRESHOLD, keep="latest"):
+    """
+    Group repeated submissions of a validated export (see validate_export)
+    and keep one row per applicant: the latest submission by timestamp, or
+    the first. Two rows are the same applicant when they share a blocking
+    key and
+      - their names score at least `name_threshold`,
+      - they give the same NIC, or the same date of birth if either left
+        the NIC out (two different NICs are two people),
+      - the numbers in their names and addresses (house numbers) are the
+        same, and if both gave an address the addresses score at least
+        `address_threshold`.
+    Matches do not chain: a row is only dropped for the row kept in its
+    place, never because it resembles a row that resembles that one.
+    """
+    import numpy as np
+    import pandas as pd
+    from rapidfuzz import fuzz, process, utils
+
+    if keep not in KEEP_CHOICES:
+        raise ValueError(f"keep must be one of {', '.join(KEEP_CHOICES)}, not {keep!r}")
+
+    names = df["full_name"].tolist()
+    addresses = df["address"].tolist()
+    nics = df["nic"].tolist()
+    dobs = df["dob"].tolist()
+    name_numbers = [_numbers(name) for name in names]
+    address_numbers = [_numbers(address) for address in addresses]
+    matches = {}   # (i, j), i < j -> (name score, address score, block key name)
+    comparisons = 0
+
+    for key_name, members in blocks(df):
+        block_names = [names[i] for i in members]
+        name_scores = process.cdist(block_names, block_names, scorer=fuzz.token_sort_ratio,
+                                    processor=utils.default_process)
+        comparisons += len(members) * (len(members) - 1) // 2
+
+        for a, b in zip(*np.nonzero(np.triu(name_scores >= name_threshold, k=1))):
+            i, j = sorted((int(members[a]), int(members[b])))
+            if (i, j) in matches:
+                continue
+            if nics[i] and nics[j]:
+                if nics[i] != nics[j]:
+                    continue
+            elif not dobs[i] or dobs[i] != dobs[j]:
+                continue
+            if name_numbers[i] != name_numbers[j]:
+                continue
+            if addresses[i] and addresses[j]:
+                if address_numbers[i] != address_numbers[j]:
+                    continue
+                address_score = fuzz.token_set_ratio(addresses[i], addresses[j], processor=utils.default_process)
+                if address_score < address_threshold:
+                    continue
+            else:
+                address_score = float("nan")
+            matches[i, j] = (float(name_scores[a, b]), address_score, key_name)
+
+    linked = {}
+    for i, j in matches:
+        linked.setdefault(i, []).append(j)
+        linked.setdefault(j, []).append(i)
+
+    # The preferred submissions first: each row not yet taken is kept, and
+    # takes the rows it matches itself
+    rank = submission_order(df)
+    kept_for = {}
+    for i in sorted(range(len(df)), key=lambda i: -rank[i] if keep == "latest" else rank[i]):
+        if i in kept_for:
+            continue
+        kept_for[i] = i
+        for j in linked.get(i, ()):
+            kept_for.setdefault(j, i)
+
+    dropped = []
+    for i in range(len(df)):
+        kept = kept_for[i]
+        if kept == i:
+            continue
+        name_score, address_score, key_name = matches[min(i, kept), max(i, kept)]
+        dropped.append({
+            "row": df.index[i] + 2,
+            "full_name": names[i],
+            "kept_row": df.index[kept] + 2,
+            "kept_name": names[kept],
+            "name_score": round(name_score),
+            "address_score": None if address_score != address_score else round(address_score),
+            "matched_on": key_name,
+        })
+
+    drop_positions = [i for i in range(len(df)) if kept_for[i] != i]
+    kept_df = df.drop(index=df.index[drop_positions])
+    duplicates = pd.DataFrame(dropped, columns=DUPLICATE_COLUMNS)
+    return DedupeResult(kept_df, duplicates, comparisons)
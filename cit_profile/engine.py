@@ -0,0 +1,193 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from itertools import islice
+
+from .forms import missing_required, row_to_record
+from .metrics import METRICS
+from .pdf import create_pdf_profile
+
+
+@dataclass
+class RowResult:
+    row_number: int
+    full_name: str = ""
+    pdf_bytes: bytes = None
+    error: str = None
+
+
+@dataclass
+class EngineStats:
+    workers: int = 0
+    rendered: int = 0
+    failed: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def pdfs_per_sec(self):
+        return self.rendered / self.elapsed if self.elapsed else 0.0
+
+
+def engine_context():
+    """
+    How long-lived services (jobs, the render server) start worker processes.
+    Forking from one of their threads copies whatever locks other threads
+    (sessions, other jobs, other requests) hold at that moment, such as the
+    template's or the metrics', and a worker that inherits one locked waits
+    forever; a fork server forks from a clean process instead.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(["cit_profile.pdf"])   # so each worker starts with ReportLab loaded
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+def check_row(row_number, fields):
+    """Map and check one sheet row: (record, None) if it can be rendered, else (None, failed RowResult)"""
+    full_name = ""
+    try:
+        record = row_to_record(fields)
+        full_name = record["full_name"]
+
+        missing = missing_required(record)
+        if missing:
+            raise ValueError("Missing required field(s): " + ", ".join(missing))
+    except Exception as e:
+        return None, RowResult(row_number, full_name, error=str(e))
+    return record, None
+
+
+def render_row(row_number, fields, render=create_pdf_profile):
+    """Render one sheet row, returning any failure in the result instead of raising"""
+    record, failed = check_row(row_number, fields)
+    if failed is not None:
+        return failed
+
+    try:
+        return RowResult(row_number, record["full_name"], pdf_bytes=render(record))
+    except Exception as e:
+        return RowResult(row_number, record["full_name"], error=str(e))
+
+
+def _render_chunk(chunk, render):
+    # Runs in a worker process; its stage timings travel back with the results
+    METRICS.drain()   # drop anything inherited from the parent when forked
+    results = [render_row(row_number, fields, render) for row_number, fields in chunk]
+    return results, METRICS.drain()
+
+
+def _chunks(rows, size):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def available_cpus():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+class RenderEngine:
+    """
+    Fans (row_number, fields) rows out over a process pool.
+
+    Rows are submitted in chunks of `chunksize`, and at most `max_in_flight`
+    chunks are pending or waiting to be yielded at any time, so memory stays
+    flat no matter how long the input is. A row that fails comes back as a
+    RowResult with `error` set; the rest of the batch carries on. A worker
+    process that dies takes the chunks in flight with it (they fail too) and
+    the rest of the rows go to a new pool.
+    """
+
+    def __init__(self, workers=None, chunksize=4, max_in_flight=None, render=create_pdf_profile, mp_context=None):
+        self.workers = workers or available_cpus()
+        self.chunksize = chunksize
+        self.max_in_flight = max_in_flight or 2 * self.workers
+        self.render_func = render
+        self.mp_context = mp_context
+        self.stats = EngineStats(workers=self.workers)
+
+    def render(self, rows, ordered=True):
+        """Yield a RowResult per row, in input order or as soon as each chunk completes"""
+        self.stats = EngineStats(workers=self.workers)
+        started = time.perf_counter()
+        try:
+            for result in self._run(rows, ordered):
+                if result.error is None:
+                    self.stats.rendered += 1
+                else:
+                    self.stats.failed += 1
+                yield result
+        finally:
+            self.stats.elapsed = time.perf_counter() - started
+
+    def _run(self, rows, ordered):
+        chunks = enumerate(_chunks(rows, self.chunksize))
+        pending = {}    # future -> (chunk index, chunk, the pool it went to)
+        completed = {}  # chunk index -> results, held back until their turn in ordered mode
+        next_index = 0
+        exhausted = False
+
+        pool = self._new_pool()
+        try:
+            while True:
+                while not exhausted and len(pending) + len(completed) < self.max_in_flight:
+                    try:
+                        index, chunk = next(chunks)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    try:
+                        future = pool.submit(_render_chunk, chunk, self.render_func)
+                    except BrokenProcessPool:
+                        # A worker died since the last wait; its chunks are already failing
+                        pool = self._replace_pool(pool)
+                        future = pool.submit(_render_chunk, chunk, self.render_func)
+                    pending[future] = (index, chunk, pool)
+
+                if not pending:
+                    break
+
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    index, chunk, submitted_to = pending.pop(future)
+                    if submitted_to is pool and isinstance(future.exception(), BrokenProcessPool):
+                        pool = self._replace_pool(pool)
+                    results = self._chunk_results(future, chunk)
+                    if ordered:
+                        completed[index] = results
+                    else:
+                        yield from results
+
+                while next_index in completed:
+                    yield from completed.pop(next_index)
+                    next_index += 1
+        finally:
+            pool.shutdown()
+
+    def _new_pool(self):
+        return ProcessPoolExecutor(self.workers, mp_context=self.mp_context)
+
+    def _replace_pool(self, pool):
+        # A broken pool fails everything submitted to it, so it is no use for the rest
+        pool.shutdown(wait=False)
+        return self._new_pool()
+
+    @staticmethod
+    def _chunk_results(future, chunk):
+        try:
+            results, samples = future.result()
+        except Exception as e:
+            # The chunk could not be pickled, or a worker died and broke the pool (see _run)
+            return [RowResult(row_number, error=f"Worker failed: {e}") for row_number, _ in chunk]
+        METRICS.merge(samples)
+        return results
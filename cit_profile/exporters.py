@@ -0,0 +1,341 @@
+"""
+Export pipeline: read the applicants once and hand every record to each
+exporter.
+
+    with ZipArchive("applicants.zip") as archive:
+        report = export_batch(iter_rows(df), ["pdf", "xlsx", "json"], archive)
+
+Per-applicant exporters (PDF, Word, text) add one file per record to the
+archive as they go. Summary exporters (the Excel master sheet and JSON)
+stream their rows to a temporary file, which is copied into the archive
+when the pipeline closes, so memory stays flat however many applicants
+there are.
+"""
+import io
+import json
+import os
+import re
+import tempfile
+import time
+import zipfile
+from xml.sax.saxutils import escape
+
+from .batch import BatchReport, errors_csv, unique_name
+from .engine import check_row
+from .fields import FIELDS, PDF_ROWS
+from .forms import FORM_FIELDS, pdf_filename
+from .pdf import create_pdf_profile
+from .text import create_text_profile
+
+SUMMARY_NAME = "CIT_Applicants"
+
+
+class ExportPipeline:
+    """
+    Feeds (row number, fields) rows to `exporters`. Rows that cannot be
+    mapped or lack required fields go to `report.errors`; so does a row an
+    exporter fails on (the other exporters still get it).
+    """
+
+    def __init__(self, exporters, report=None):
+        self.exporters = exporters
+        self.report = BatchReport() if report is None else report
+        self._started = time.perf_counter()
+
+    def add(self, row_number, fields):
+        record, failed = check_row(row_number, fields)
+        if failed is not None:
+            self.report.errors.append({"row": row_number, "full_name": failed.full_name, "error": failed.error})
+            return
+
+        errors = []
+        for exporter in self.exporters:
+            try:
+                exporter.add(row_number, record)
+            except Exception as e:
+                errors.append(f"{exporter.format}: {e}")
+        if errors:
+            self.report.errors.append({"row": row_number, "full_name": record["full_name"], "error": "; ".join(errors)})
+        else:
+            self.report.rendered += 1
+        self.report.elapsed = time.perf_counter() - self._started
+
+    def close(self):
+        """
+        Finish every exporter; summary files are written into the archive
+        here. One that fails does not stop the rest from closing (and
+        removing their temporary files); the first error is raised after.
+        """
+        error = None
+        for exporter in self.exporters:
+            try:
+                exporter.close()
+            except Exception as e:
+                error = error or e
+        self.report.elapsed = time.perf_counter() - self._started
+        if error is not None:
+            raise error
+
+
+# ---------- PER APPLICANT ----------
+class FileExporter:
+    """One file per applicant, named like the PDF (CIT_Application_<name>.<ext>)"""
+
+    format = None
+
+    def __init__(self, archive):
+        self.archive = archive
+        self._used_names = set()
+
+    def add(self, row_number, record):
+        data = self.convert(record)
+        self.archive.add(unique_name(pdf_filename(record["full_name"], ext=self.format), self._used_names), data)
+
+    def convert(self, record):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class PDFExporter(FileExporter):
+    format = "pdf"
+
+    def __init__(self, archive, render=create_pdf_profile):
+        FileExporter.__init__(self, archive)
+        self.render = render
+
+    def convert(self, record):
+        return self.render(record)
+
+
+class TextExporter(FileExporter):
+    format = "txt"
+
+    def convert(self, record):
+        return create_text_profile(record)
+
+
+class DocxExporter(FileExporter):
+    """
+    The profile table as a Word document: the same rows, labels and blank
+    placeholders as the PDF. Written as plain WordprocessingML, so it needs
+    no Word library.
+    """
+
+    format = "docx"
+
+    def convert(self, record):
+        rows = "".join(
+            _DOCX_ROW.format(
+                label=_xml_text(label),
+                value=_docx_runs(record[key] if default is None else (record.get(key) or default)),
+            )
+            for label, key, default in PDF_ROWS
+        )
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as docx:
+            docx.writestr("[Content_Types].xml", _DOCX_CONTENT_TYPES)
+            docx.writestr("_rels/.rels", _DOCX_RELS)
+            docx.writestr("word/document.xml", _DOCX_DOCUMENT.format(rows=rows))
+        return buffer.getvalue()
+
+
+# ---------- SUMMARIES ----------
+class SummaryExporter:
+    """Streams one entry per applicant to a temporary file, added to the archive as `<SUMMARY_NAME>.<ext>`"""
+
+    format = None
+
+    def __init__(self, archive, filename=None):
+        self.archive = archive
+        self.filename = filename or f"{SUMMARY_NAME}.{self.format}"
+        fd, self.tmp_path = tempfile.mkstemp(prefix="cit_export_", suffix="." + self.format)
+        os.close(fd)
+
+    def close(self):
+        try:
+            self.finish()
+            self.archive.add_file(self.filename, self.tmp_path)
+        finally:
+            os.remove(self.tmp_path)
+
+    def finish(self):
+        raise NotImplementedError
+
+
+class XLSXExporter(SummaryExporter):
+    """
+    Master sheet with a row per applicant, built with openpyxl's write-only
+    mode, which writes each row out as it is appended.
+    """
+
+    format = "xlsx"
+
+    def __init__(self, archive, filename=None):
+        from openpyxl import Workbook
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Font
+
+        SummaryExporter.__init__(self, archive, filename)
+        self._workbook = Workbook(write_only=True)
+        self._sheet = self._workbook.create_sheet("Applicants")
+        self._sheet.freeze_panes = "C2"
+        self._cell = WriteOnlyCell
+
+        headers = ["Row", "Timestamp"] + [field.preview_label for field in FIELDS]
+        for letter, width in (("A", 6), ("B", 20), ("C", 30)):
+            self._sheet.column_dimensions[letter].width = width
+        bold = Font(bold=True)
+        header_cells = []
+        for header in headers:
+            cell = WriteOnlyCell(self._sheet, header)
+            cell.font = bold
+            header_cells.append(cell)
+        self._sheet.append(header_cells)
+
+    def add(self, row_number, record):
+        cells = [row_number]
+        for key in FORM_FIELDS:
+            # Always text: answers are never dates, numbers or formulas (e.g. a value starting with "=")
+            cell = self._cell(self._sheet, _ILLEGAL_XML_CHARS.sub("", record[key]))
+            cell.data_type = "s"
+            cells.append(cell)
+        self._sheet.append(cells)
+
+    def finish(self):
+        self._workbook.save(self.tmp_path)
+
+
+class JSONExporter(SummaryExporter):
+    """A JSON array with one object per applicant: the sheet row number and every form field"""
+
+    format = "json"
+
+    def __init__(self, archive, filename=None):
+        SummaryExporter.__init__(self, archive, filename)
+        self._file = open(self.tmp_path, "w", encoding="utf-8")
+        self._file.write("[")
+        self._count = 0
+
+    def add(self, row_number, record):
+        self._file.write(",\n  " if self._count else "\n  ")
+        self._file.write(json.dumps({"row": row_number, **{key: record[key] for key in FORM_FIELDS}},
+                                    ensure_ascii=False))
+        self._count += 1
+
+    def finish(self):
+        self._file.write("\n]\n" if self._count else "]\n")
+        self._file.close()
+
+
+EXPORTERS = {
+    "pdf": PDFExporter,
+    "docx": DocxExporter,
+    "txt": TextExporter,
+    "xlsx": XLSXExporter,
+    "json": JSONExporter,
+}
+
+FORMAT_LABELS = {
+    "pdf": "PDF profiles",
+    "docx": "Word profiles",
+    "txt": "Text profiles",
+    "xlsx": "Excel master sheet",
+    "json": "JSON for the records system",
+}
+
+
+def make_exporters(formats, archive, render=create_pdf_profile):
+    """Exporters for the given formats (keys of EXPORTERS), all writing into `archive`"""
+    unknown = [fmt for fmt in formats if fmt not in EXPORTERS]
+    if unknown:
+        raise ValueError(f"Unknown export format(s): {', '.join(unknown)}")
+    return [
+        PDFExporter(archive, render=render) if fmt == "pdf" else EXPORTERS[fmt](archive)
+        for fmt in dict.fromkeys(formats)
+    ]
+
+
+def export_with_errors(pipeline, archive):
+    """Close the pipeline and add errors.csv to the archive when any row failed"""
+    pipeline.close()
+    if pipeline.report.errors:
+        archive.add("errors.csv", errors_csv(pipeline.report.errors))
+    return pipeline.report
+
+
+def export_batch(rows, formats, archive, render=create_pdf_profile, report=None):
+    """Export every (row number, fields) row in each of `formats` into `archive`, like render_batch"""
+    pipeline = ExportPipeline(make_exporters(formats, archive, render=render), report)
+    for row_number, fields in rows:
+        pipeline.add(row_number, fields)
+    return export_with_errors(pipeline, archive)
+
+
+# ---------- WORDPROCESSINGML ----------
+_ILLEGAL_XML_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def _xml_text(value):
+    return escape(_ILLEGAL_XML_CHARS.sub("", value))
+
+
+def _docx_runs(value):
+    # Line breaks inside an answer become <w:br/> within one paragraph
+    lines = [_xml_text(line) for line in value.splitlines()] or [""]
+    return "<w:br/>".join(f'<w:t xml:space="preserve">{line}</w:t>' for line in lines)
+
+
+_DOCX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '</Types>'
+)
+
+_DOCX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/>'
+    '</Relationships>'
+)
+
+# A4 with 25pt margins; label column 2.6in and value column 4.0in as in the PDF (sizes in twips,
+# font sizes in half points)
+_DOCX_ROW = (
+    '<w:tr>'
+    '<w:tc><w:tcPr><w:tcW w:w="3744" w:type="dxa"/><w:shd w:val="clear" w:color="auto" w:fill="E9F5EA"/></w:tcPr>'
+    '<w:p><w:r><w:rPr><w:b/><w:sz w:val="18"/></w:rPr><w:t xml:space="preserve">{label}</w:t></w:r></w:p></w:tc>'
+    '<w:tc><w:tcPr><w:tcW w:w="5760" w:type="dxa"/></w:tcPr>'
+    '<w:p><w:r><w:rPr><w:sz w:val="18"/></w:rPr>{value}</w:r></w:p></w:tc>'
+    '</w:tr>'
+)
+
+_DOCX_BORDER = '<w:{side} w:val="single" w:sz="4" w:space="0" w:color="808080"/>'
+
+_DOCX_DOCUMENT = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>'
+    + "".join(
+        f'<w:p><w:pPr><w:jc w:val="right"/><w:spacing w:after="0"/></w:pPr><w:r><w:t>{line}</w:t></w:r></w:p>'
+        for line in ("No. 37, 32nd Lane Colombo 06.", "Tel: +94 11 236 1793 / +94 77 736 5964",
+                     "Reg. No R/2552/C/238 (MRCA)")
+    )
+    + '<w:p><w:pPr><w:jc w:val="center"/><w:spacing w:before="480" w:after="240"/></w:pPr>'
+    '<w:r><w:rPr><w:b/><w:color w:val="0A7A3B"/><w:sz w:val="32"/></w:rPr>'
+    '<w:t>New Admission Applicant Profile</w:t></w:r></w:p>'
+    '<w:tbl><w:tblPr><w:jc w:val="center"/><w:tblBorders>'
+    + "".join(_DOCX_BORDER.format(side=side) for side in ("top", "left", "bottom", "right", "insideH", "insideV"))
+    + '</w:tblBorders></w:tblPr><w:tblGrid><w:gridCol w:w="3744"/><w:gridCol w:w="5760"/></w:tblGrid>'
+    '{rows}</w:tbl>'
+    '<w:p/><w:p><w:r><w:rPr><w:b/></w:rPr><w:t>Additional Notes:</w:t></w:r></w:p>'
+    '<w:sectPr><w:pgSz w:w="11906" w:h="16838"/>'
+    '<w:pgMar w:top="500" w:right="500" w:bottom="500" w:left="500" w:header="0" w:footer="0" w:gutter="0"/>'
+    '</w:sectPr></w:body></w:document>'
+)
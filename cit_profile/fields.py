@@ -0,0 +1,70 @@
+from typing import NamedTuple
+
+
+class Field(NamedTuple):
+    key: str
+    label: str           # PDF row label, and the question's column header in the Google Forms sheet
+    preview_label: str   # app preview and missing-field messages
+    required: bool = False
+    empty: str = ""      # what the preview shows when the value is blank
+    pdf_empty: str = ""  # what the PDF shows when the value is blank
+    visible_if: tuple = None  # (key, value): only applies when another field has that value
+    kind: str = "text"   # "phone", "nic", "date" and "juz" get format checks in bulk validation
+    choices: tuple = None
+    aliases: tuple = ()  # other column headers the question has had, for matching exports by name
+
+    def visible(self, record):
+        return self.visible_if is None or record.get(self.visible_if[0]) == self.visible_if[1]
+
+
+# The 26 profile fields, in Google Forms column order (after the timestamp)
+FIELDS = (
+    Field("full_name", "Full Name", "Full Name", required=True),
+    Field("address", "Address", "Address", required=True, aliases=("Home Address",)),
+    Field("whatsapp_mobile", "Mobile (Whatsapp)", "Mobile (WhatsApp)", kind="phone"),
+    Field("mobile", "Mobile", "Mobile", required=True, kind="phone"),
+    Field("dob", "Date of Birth", "Date of Birth", required=True, kind="date"),
+    Field("place_of_birth", "Place of Birth", "Place of Birth"),
+    Field("nic", "N.I.C No", "NIC No", empty="Not provided", pdf_empty="-", kind="nic", aliases=("NIC Number",)),
+    Field("languages", "Languages Spoken", "Languages Spoken"),
+
+    Field("school_attended", "Name of School/College attended", "School/College Attended"),
+    Field("last_institute", "Name of Institute/College last attended", "Last Institute Attended"),
+    Field("medium", "Medium of Instruction", "Medium of Instruction"),
+    Field("last_standard", "Last standard acquired", "Last Standard Acquired"),
+    Field("last_attended", "Year and Last month attended", "Year & Month Last Attended"),
+    Field("quran_memorized", "Have you completed memorizing the Quran?", "Completed Memorizing Quran?",
+          choices=("Yes", "No")),
+    Field("juz_count", "If yes, how many Juzu’?", "If Yes, How Many Juz?", pdf_empty="-",
+          visible_if=("quran_memorized", "Yes"), kind="juz"),
+    Field("islamic_institute", "Name of Islamic Institute last attended", "Islamic Institute Last Attended"),
+    Field("city_location", "City/ Location", "City/Location"),
+    Field("duration", "Duration attended", "Duration Attended"),
+    Field("reason_leaving", "Reason for leaving/intending to leave", "Reason for Leaving"),
+
+    Field("parent_name", "Parent/Guardian Full Name", "Parent/Guardian Full Name", required=True),
+    Field("parent_address", "Parent/Guardian Address", "Parent/Guardian Address"),
+    Field("father_residing", "Father Residing (Inland/Overseas)", "Father Residing", choices=("Inland", "Overseas")),
+    Field("occupation", "Occupation", "Occupation"),
+    Field("parent_mobile", "Parent/Guardian Mobile No.", "Parent/Guardian Mobile No.", required=True, kind="phone"),
+    Field("parent_whatsapp", "WhatsApp No.", "WhatsApp No.", kind="phone"),
+    Field("home_languages", "Language(s) spoken at home", "Language(s) spoken at home"),
+)
+
+# ---------- COMPILED VIEWS (built once at import) ----------
+FIELDS_BY_KEY = {field.key: field for field in FIELDS}
+
+PROFILE_FIELDS = tuple(field.key for field in FIELDS)
+FORM_FIELDS = ("timestamp",) + PROFILE_FIELDS
+FORM_HEADERS = ("Timestamp",) + tuple(field.label for field in FIELDS)
+REQUIRED_FIELDS = tuple(field.key for field in FIELDS if field.required)
+CONDITIONAL_FIELDS = tuple(field for field in FIELDS if field.visible_if is not None)
+
+# (label, key, shown when empty) per PDF table row
+PDF_ROWS = tuple((field.label, field.key, field.pdf_empty or None) for field in FIELDS)
+
+
+def field_label(key):
+    """Human-readable name of a field for messages"""
+    field = FIELDS_BY_KEY.get(key)
+    return field.preview_label if field else key.replace("_", " ").title()
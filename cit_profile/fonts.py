@@ -0,0 +1,144 @@
+"""
+TrueType fonts for the scripts Helvetica has no glyphs for.
+
+The standard PDF fonts only cover Western European text, so Tamil and
+Sinhala names and addresses come out as boxes. A FontSet maps a script to
+a TTF file; value cells stay in Helvetica and switch to the script's font
+for each run of its characters, since most applicants mix scripts (a Tamil
+name, an English school, digits). Each font file is parsed and registered
+with ReportLab once per process. ReportLab embeds a TTF as a subset of the
+glyphs a document actually uses, so a PDF carries a few KB per script
+rather than the whole font.
+
+By default the fonts are looked up in $CIT_FONT_DIR (or assets/fonts) by
+the file names in FONT_FILES; none ship with the app. Scripts without a
+file there keep Helvetica, and the first value a process cannot show logs
+a warning saying which file to add.
+ReportLab draws characters in code point order unless uharfbuzz is
+installed, in which case it shapes them (reordered vowel signs, conjuncts).
+"""
+import hashlib
+import logging
+import os
+import re
+import threading
+
+FONT_DIR = os.environ.get("CIT_FONT_DIR") or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets", "fonts"
+)
+
+# Unicode block of each script
+SCRIPTS = {
+    "tamil": ("\u0b80", "\u0bff"),
+    "sinhala": ("\u0d80", "\u0dff"),
+}
+
+FONT_FILES = {
+    "tamil": "NotoSansTamil-Regular.ttf",
+    "sinhala": "NotoSansSinhala-Regular.ttf",
+}
+
+# Zero-width (non-)joiners select conjunct forms, so they belong to the run
+# around them; so do the spaces between two words of the same script
+_JOINERS = "\u200c\u200d "
+
+_registered = {}   # path -> (font name, file digest)
+_register_lock = threading.Lock()
+_warned = False
+
+
+def register_font(path):
+    """
+    Register the TTF at `path` with ReportLab, once per process. Returns
+    (font name, digest of the file).
+    """
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+
+    from .metrics import METRICS
+
+    path = os.path.abspath(path)
+    with _register_lock:
+        registered = _registered.get(path)
+        if registered is None:
+            with METRICS.timer("font_register"):
+                with open(path, "rb") as f:
+                    digest = hashlib.md5(f.read()).hexdigest()
+                name = "CIT-" + os.path.splitext(os.path.basename(path))[0]
+                if name in {taken for taken, _ in _registered.values()}:
+                    name += f"-{len(_registered)}"
+                pdfmetrics.registerFont(TTFont(name, path, asciiReadable=False))
+            registered = _registered[path] = (name, digest)
+    return registered
+
+
+class FontSet:
+    """
+    The TTF font for each script in `paths` (script -> file), registered on
+    construction. markup() puts the runs of those scripts in a value into
+    <font> tags for Paragraph.
+    """
+
+    def __init__(self, paths=None):
+        self.paths = {script: path for script, path in (paths or {}).items() if path}
+        self.names = {}
+        digests = []
+        for script, path in sorted(self.paths.items()):
+            self.names[script], digest = register_font(path)
+            digests.append(f"{script}:{digest}")
+        self.digest = hashlib.md5("|".join(digests).encode()).hexdigest() if digests else ""
+
+        runs = []
+        for script in self.names:
+            block = "%s-%s" % SCRIPTS[script]
+            runs.append(f"(?P<{script}>[{block}](?:[{block}{_JOINERS}]*[{block}\u200c\u200d])?)")
+        self._runs = re.compile("|".join(runs)) if runs else None
+
+    def __bool__(self):
+        return bool(self.names)
+
+    @classmethod
+    def from_dir(cls, font_dir=FONT_DIR):
+        """The scripts whose FONT_FILES file exists in `font_dir`"""
+        paths = {script: os.path.join(font_dir, file_name) for script, file_name in FONT_FILES.items()}
+        return cls({script: path for script, path in paths.items() if os.path.isfile(path)})
+
+    def markup(self, text):
+        if text.isascii():
+            return text
+        if not _warned:
+            _warn_unshown(text if self._runs is None else self._runs.sub("", text))
+        if self._runs is None:
+            return text
+        return self._runs.sub(self._font_tag, text)
+
+    def _font_tag(self, match):
+        return f'<font name="{self.names[match.lastgroup]}">{match.group()}</font>'
+
+
+def _warn_unshown(text):
+    """Log, once per process, that `text` has characters the standard PDF fonts have no glyphs for"""
+    global _warned
+    try:
+        text.encode("cp1252")
+        return
+    except UnicodeEncodeError as e:
+        char = text[e.start]
+    _warned = True
+    script = next((script for script, (low, high) in SCRIPTS.items() if low <= char <= high), None)
+    hint = (f"put {FONT_FILES[script]} (Noto Sans, SIL Open Font License) in {FONT_DIR} or set CIT_FONT_DIR"
+            if script else "no font is configured for it")
+    logging.getLogger(__name__).warning(
+        "Applicant text has characters the PDF fonts cannot show (U+%04X), which come out as empty boxes; %s",
+        ord(char), hint)
+
+
+_default = None
+
+
+def default_fonts():
+    """The process-wide FontSet from FONT_DIR, found and registered on first use"""
+    global _default
+    if _default is None:
+        _default = FontSet.from_dir()
+    return _default
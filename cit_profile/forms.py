@@ -0,0 +1,36 @@
+from .fields import CONDITIONAL_FIELDS, FORM_FIELDS, PROFILE_FIELDS, REQUIRED_FIELDS
+from .metrics import METRICS
+
+
+def row_to_record(fields):
+    """Map one Google Forms row (list of cell values) to a profile dict"""
+    with METRICS.timer("parse"):
+        return _row_to_record(fields)
+
+
+def _row_to_record(fields):
+    if len(fields) < len(FORM_FIELDS):
+        raise ValueError(
+            f"Expected {len(FORM_FIELDS)} fields (timestamp + {len(PROFILE_FIELDS)}), "
+            f"got {len(fields)}. Please check your data format."
+        )
+    record = {key: str(value).strip() for key, value in zip(FORM_FIELDS, fields)}
+
+    # Same rule as the form, e.g. juz count only applies when the Quran is memorized
+    for field in CONDITIONAL_FIELDS:
+        if not field.visible(record):
+            record[field.key] = ""
+
+    return record
+
+
+def missing_required(record):
+    """Return the required fields that are empty in a record"""
+    return [field for field in REQUIRED_FIELDS if not record.get(field, "")]
+
+
+def pdf_filename(full_name, ext="pdf"):
+    """CIT_Application_<name>.<ext>, safe to use as a file or ZIP entry name"""
+    name_part = full_name.strip().replace(" ", "_") if full_name else "Applicant"
+    name_part = "".join(c for c in name_part if c not in '\\/:*?"<>|') or "Applicant"
+    return f"CIT_Application_{name_part}.{ext}"
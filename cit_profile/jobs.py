@@ -0,0 +1,312 @@
+"""
+Background batch jobs, so long renders never run in the Streamlit script thread.
+
+A JobQueue owns a fixed pool of worker threads. submit() returns a Job
+with an ID straight away; workers always start a job of the waiting owner
+served longest ago (so users take turns, however many jobs each has
+queued) and write progress to a JSON file per job in `store_dir`, next to
+the finished ZIP or PDF.
+Progress and results outlive the page that started the job, so a browser
+refresh only needs the job ID to pick it up again.
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from dataclasses import asdict, dataclass, field
+
+from .archive import ZipArchive
+from .batch import BatchReport, batch_files, render_batch_merged, with_error_report
+from .engine import RenderEngine, available_cpus, engine_context
+from .exporters import ExportPipeline, export_with_errors, make_exporters
+from .pdf import create_pdf_profile
+
+FINISHED = ("done", "failed", "cancelled")
+
+
+class QueueFull(RuntimeError):
+    """Too many jobs are waiting; try again when one has finished"""
+
+
+@dataclass
+class Job:
+    id: str
+    owner: str
+    total: int
+    merged: bool = False
+    formats: list = field(default_factory=lambda: ["pdf"])   # with a ZIP, see exporters.EXPORTERS
+    status: str = "queued"       # queued, running, done, failed or cancelled
+    rendered: int = 0
+    errors: list = field(default_factory=list)
+    output_path: str = None
+    error: str = None
+    created: float = 0.0
+    started: float = None
+    finished: float = None
+
+    @property
+    def done(self):
+        return self.status in FINISHED
+
+    @property
+    def processed(self):
+        return self.rendered + len(self.errors)
+
+    @property
+    def progress(self):
+        return min(self.processed / self.total, 1.0) if self.total else 1.0
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+    @property
+    def pdfs_per_sec(self):
+        return self.rendered / self.elapsed if self.elapsed else 0.0
+
+
+class JobQueue:
+    """
+    Renders submitted batches on `workers` background threads.
+
+    Each job renders with its own RenderEngine of `engine_workers` processes
+    (default: the CPUs shared out between the job threads; 1 renders in the
+    job's thread), started by a fork server rather than forked from this
+    process. At most `max_pending` jobs wait in total and
+    `max_pending_per_owner` per owner, beyond which submit() raises
+    QueueFull. Finished jobs and their files are removed after `keep_for`
+    seconds.
+    """
+
+    def __init__(self, store_dir, workers=2, engine_workers=None, max_pending=20, max_pending_per_owner=3,
+                 keep_for=24 * 3600, render=create_pdf_profile, template=None):
+        self.store_dir = store_dir
+        self.workers = workers
+        self.engine_workers = engine_workers or max(1, available_cpus() // workers)
+        self.max_pending = max_pending
+        self.max_pending_per_owner = max_pending_per_owner
+        self.keep_for = keep_for
+        self.render = render
+        self.template = template   # for merged jobs; the default template if None
+        self.mp_context = engine_context() if self.engine_workers > 1 else None
+
+        self._jobs = {}
+        self._inputs = {}            # job id -> rows, only held until the job starts
+        self._queues = OrderedDict()  # owner -> deque of job ids, in order of arrival
+        self._last_served = {}        # owner -> when their last job started
+        self._cancel = set()
+        self._saved_at = {}
+        self._lock = threading.Condition()
+
+        os.makedirs(store_dir, exist_ok=True)
+        self._load()
+
+        self._threads = [
+            threading.Thread(target=self._work, name=f"cit-job-worker-{n}", daemon=True) for n in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    # ---------- PUBLIC API ----------
+    def submit(self, rows, owner, merged=False, errors=None, formats=("pdf",)):
+        """
+        Queue (row number, fields) rows for rendering and return the Job.
+        `errors` (e.g. rows rejected by validation) are carried into the
+        job's report and errors.csv. Unless `merged`, the ZIP holds every
+        export format in `formats`.
+        """
+        rows = list(rows)
+        with self._lock:
+            pending = sum(len(queue) for queue in self._queues.values())
+            if pending >= self.max_pending:
+                raise QueueFull(f"{pending} batches are already waiting")
+            if len(self._queues.get(owner, ())) >= self.max_pending_per_owner:
+                raise QueueFull(f"You already have {self.max_pending_per_owner} batches waiting")
+
+            job = Job(uuid.uuid4().hex[:12], owner, total=len(rows) + len(errors or []), merged=merged,
+                      formats=list(formats), errors=list(errors or []), created=time.time())
+            self._jobs[job.id] = job
+            self._inputs[job.id] = rows
+            self._queues.setdefault(owner, deque()).append(job.id)
+            self._save(job)
+            self._lock.notify()
+        return job
+
+    def get(self, job_id):
+        """A snapshot of the job, or None if it is unknown or expired"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return None if job is None else Job(**asdict(job))
+
+    def position(self, job_id):
+        """Number of jobs that will start before this one (0 = next), or None once it has started"""
+        with self._lock:
+            queues = OrderedDict((owner, list(queue)) for owner, queue in self._queues.items())
+            last_served = dict(self._last_served)
+        ahead = 0
+        tick = time.monotonic()
+        while queues:
+            owner = self._pick(queues, last_served)
+            if queues[owner].pop(0) == job_id:
+                return ahead
+            if not queues[owner]:
+                del queues[owner]
+            tick += 1
+            last_served[owner] = tick
+            ahead += 1
+        return None
+
+    def cancel(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.done:
+                return
+            queue = self._queues.get(job.owner)
+            if queue and job_id in queue:
+                queue.remove(job_id)
+                if not queue:
+                    del self._queues[job.owner]
+                self._inputs.pop(job_id, None)
+                self._finish(job, "cancelled")
+            else:
+                self._cancel.add(job_id)   # picked up by the worker between two PDFs
+
+    # ---------- WORKERS ----------
+    def _pick(self, queues, last_served):
+        # The waiting owner served longest ago (or never) goes next; ties in order of arrival
+        return min(queues, key=lambda owner: last_served.get(owner, 0.0))
+
+    def _next(self):
+        with self._lock:
+            while not self._queues:
+                self._lock.wait()
+            owner = self._pick(self._queues, self._last_served)
+            queue = self._queues[owner]
+            job_id = queue.popleft()
+            if not queue:
+                del self._queues[owner]
+            self._last_served[owner] = time.monotonic()
+
+            job = self._jobs[job_id]
+            job.status = "running"
+            job.started = time.time()
+            self._save(job)
+            return job, self._inputs.pop(job_id)
+
+    def _work(self):
+        while True:
+            job, rows = self._next()
+            try:
+                self._run(job, rows)
+            except Exception as e:
+                with self._lock:
+                    job.error = str(e)
+                    self._finish(job, "failed")
+            self._expire()
+
+    def _run(self, job, rows):
+        report = BatchReport(errors=job.errors)   # the same list, so progress shows errors as they happen
+        ext = ".pdf" if job.merged else ".zip"
+        fd, tmp_path = tempfile.mkstemp(dir=self.store_dir, prefix=f"{job.id}_", suffix=".tmp")
+        os.close(fd)
+
+        try:
+            if job.merged:
+                # One layout pass for the whole document, so progress only moves at the end
+                render_batch_merged(rows, tmp_path, template=self.template, report=report)
+            elif job.formats != ["pdf"]:
+                # Every format from one pass over the rows; PDFs render in this thread
+                with ZipArchive(tmp_path) as archive:
+                    pipeline = ExportPipeline(make_exporters(job.formats, archive, render=self.render), report)
+                    for row_number, fields in rows:
+                        pipeline.add(row_number, fields)
+                        with self._lock:
+                            job.rendered = report.rendered
+                            if job.id in self._cancel:
+                                break
+                            self._save(job, throttle=0.5)
+                    export_with_errors(pipeline, archive)
+            else:
+                engine = None
+                if self.engine_workers > 1:
+                    engine = RenderEngine(workers=self.engine_workers, render=self.render, mp_context=self.mp_context)
+                with ZipArchive(tmp_path) as archive:
+                    for filename, data in with_error_report(batch_files(rows, report, self.render, engine), report):
+                        archive.add(filename, data)
+                        with self._lock:
+                            job.rendered = report.rendered
+                            if job.id in self._cancel:
+                                break
+                            self._save(job, throttle=0.5)
+        except BaseException:
+            # Failed jobs keep no output, so nothing else would ever remove it
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+        with self._lock:
+            job.rendered = report.rendered
+            if job.id in self._cancel:
+                self._cancel.discard(job.id)
+                os.remove(tmp_path)
+                self._finish(job, "cancelled")
+                return
+            job.output_path = os.path.join(self.store_dir, job.id + ext)
+            os.replace(tmp_path, job.output_path)
+            self._finish(job, "done")
+
+    # ---------- STORE ----------
+    def _finish(self, job, status):
+        job.status = status
+        job.finished = time.time()
+        self._save(job)
+
+    def _job_path(self, job_id):
+        return os.path.join(self.store_dir, f"{job_id}.json")
+
+    def _save(self, job, throttle=0.0):
+        now = time.monotonic()
+        if throttle and now - self._saved_at.get(job.id, 0.0) < throttle:
+            return
+        self._saved_at[job.id] = now
+        fd, tmp_path = tempfile.mkstemp(dir=self.store_dir, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(asdict(job), f)
+        os.replace(tmp_path, self._job_path(job.id))
+
+    def _load(self):
+        """Pick up jobs from a previous process; ones that never finished cannot be resumed"""
+        for entry in os.scandir(self.store_dir):
+            if entry.name.endswith(".tmp"):
+                os.remove(entry.path)   # output of a job that was interrupted
+                continue
+            if not entry.name.endswith(".json"):
+                continue
+            try:
+                with open(entry.path, encoding="utf-8") as f:
+                    job = Job(**json.load(f))
+            except (OSError, ValueError, TypeError):
+                continue
+            if not job.done:
+                job.error = "Interrupted by a server restart; please submit the batch again"
+                self._finish(job, "failed")
+            self._jobs[job.id] = job
+        self._expire()
+
+    def _expire(self):
+        cutoff = time.time() - self.keep_for
+        with self._lock:
+            expired = [job for job in self._jobs.values() if job.done and job.finished < cutoff]
+            for job in expired:
+                del self._jobs[job.id]
+                self._saved_at.pop(job.id, None)
+                for path in (job.output_path, self._job_path(job.id)):
+                    if path and os.path.exists(path):
+                        os.remove(path)
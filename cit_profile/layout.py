@@ -0,0 +1,92 @@
+"""
+Memoized text layout for the profile table.
+
+Most of a platypus render is breaking the 52 table cells into lines, and
+applicants share many values ("English, Tamil", "Inland", "GCE (O/L)",
+school names), while the 26 labels never change. LayoutCache keeps line
+breaks and heights per (text, style, width), so a repeated value is
+measured once per process.
+"""
+import threading
+from collections import OrderedDict
+
+from reportlab.platypus import Paragraph
+
+from .metrics import METRICS
+
+
+class LayoutCache:
+    """
+    Bounded LRU of layout results. Hits and misses are counted here and
+    handed to METRICS (layout_cache_hits / layout_cache_misses) by
+    report(), once per document rather than once per cell.
+    """
+
+    def __init__(self, max_items=4096):
+        self.max_items = max_items
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._reported = (0, 0)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, key):
+        with self._lock:
+            value = self._items.get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self._items.move_to_end(key)
+                self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+    def report(self):
+        with self._lock:
+            hits, misses = self.hits - self._reported[0], self.misses - self._reported[1]
+            self._reported = (self.hits, self.misses)
+        if hits:
+            METRICS.count("layout_cache_hits", hits)
+        if misses:
+            METRICS.count("layout_cache_misses", misses)
+
+
+class CachedParagraph(Paragraph):
+    """
+    Paragraph whose line breaks come from a LayoutCache when the same text
+    was already wrapped in the same style and width. The cached line list is
+    shared between paragraphs; drawing only reads it. Pieces of a paragraph
+    split across pages are laid out as usual.
+    """
+
+    def __init__(self, text, style=None, layout_cache=None, **kwargs):
+        Paragraph.__init__(self, text, style, **kwargs)
+        self.layout_cache = layout_cache
+
+    def wrap(self, availWidth, availHeight):
+        if self.layout_cache is None:
+            return Paragraph.wrap(self, availWidth, availHeight)
+
+        key = (self.text, self.style.name, availWidth)
+        cached = self.layout_cache.get(key)
+        if cached is None:
+            Paragraph.wrap(self, availWidth, availHeight)
+            self.layout_cache.put(key, (self._wrapWidths, self.blPara, self.height))
+        else:
+            self._wrapWidths, self.blPara, self.height = cached
+            self.width = availWidth
+        return self.width, self.height
@@ -0,0 +1,182 @@
+"""
+Incremental batch runs into an output directory.
+
+The directory keeps a JSON manifest mapping each applicant's identity
+(form timestamp, NIC and name) to a hash of their fields and the PDF
+written for them. On the next run over a re-exported
+sheet only new or changed applicants are rendered; unchanged ones are
+skipped without touching the PDF, and applicants no longer in the sheet
+are reported (or their PDFs deleted with `prune`).
+"""
+import json
+import os
+import re
+import tempfile
+import time
+from dataclasses import dataclass, field
+
+from .batch import BatchReport, errors_csv, unique_name
+from .cache import cache_key, template_fingerprint
+from .engine import render_row
+from .forms import pdf_filename, row_to_record
+from .pdf import create_pdf_profile
+
+MANIFEST_NAME = ".cit_manifest.json"
+MANIFEST_VERSION = 1
+
+
+@dataclass
+class IncrementalReport(BatchReport):
+    new: int = 0
+    changed: int = 0
+    unchanged: int = 0
+    removed: list = field(default_factory=list)  # manifest entries no longer in the sheet
+    pruned: bool = False                         # whether their PDFs were deleted
+
+    @property
+    def total(self):
+        return self.rendered + self.unchanged + len(self.errors)
+
+
+def row_identity(record):
+    """Which applicant a row belongs to across exports, even when other fields change"""
+    name = re.sub(r"\s+", " ", record.get("full_name", "")).casefold()
+    return f"{record.get('timestamp', '')}|{record.get('nic', '')}|{name}"
+
+
+def load_manifest(out_dir):
+    """The manifest entries of `out_dir` ({} for a new directory or another template)"""
+    try:
+        with open(os.path.join(out_dir, MANIFEST_NAME), encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}, None
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {}, None
+    return manifest.get("entries", {}), manifest.get("fingerprint")
+
+
+def save_manifest(out_dir, entries, fingerprint):
+    """Write the manifest atomically, so an interrupted run never leaves it half written"""
+    payload = {"version": MANIFEST_VERSION, "fingerprint": fingerprint, "entries": entries}
+    fd, tmp_path = tempfile.mkstemp(dir=out_dir, prefix=".cit_manifest", suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, os.path.join(out_dir, MANIFEST_NAME))
+
+
+def render_incremental(rows, out_dir, render=create_pdf_profile, engine=None, report=None, template=None, prune=False,
+                       layout="platypus"):
+    """
+    Bring the PDFs in `out_dir` up to date with `rows` ((row number, fields)
+    pairs, as from sheet.iter_rows). Pass the `template` and `layout` the
+    PDFs are rendered with so a template, logo, output profile or layout
+    change re-renders everything.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    report = IncrementalReport(errors=list(report.errors) if report else [])
+    started = time.perf_counter()
+
+    fingerprint = template_fingerprint(template, layout)
+    old_entries, old_fingerprint = load_manifest(out_dir)
+    if old_fingerprint != fingerprint:
+        # Same applicants, different layout: keep the file names, render again
+        old_entries = {identity: dict(entry, hash=None) for identity, entry in old_entries.items()}
+
+    entries = {}
+    # Every file the manifest knows, including applicants about to be reported
+    # as removed: an edited response is a new identity with the same name
+    used_names = {entry["file"] for entry in old_entries.values()}
+    to_render = []    # (row number, fields)
+    pending = {}      # row number -> (identity, content hash, previous entry)
+    parsed = []       # (row number, fields, record or None if it cannot be mapped, identity)
+    last_row = {}     # identity -> the row that wins when a response appears more than once
+    for row_number, fields in rows:
+        try:
+            record = row_to_record(fields)
+        except ValueError:
+            parsed.append((row_number, fields, None, None))
+            continue
+        identity = row_identity(record)
+        last_row[identity] = row_number
+        parsed.append((row_number, fields, record, identity))
+
+    for row_number, fields, record, identity in parsed:
+        if record is None:
+            to_render.append((row_number, fields))   # render_row reports the error
+            continue
+        if last_row[identity] != row_number:
+            # One manifest entry per identity, so a second PDF would never be tracked (or pruned)
+            report.errors.append({"row": row_number, "full_name": record["full_name"],
+                                  "error": f"Duplicate of row {last_row[identity]}, which is used instead"})
+            continue
+        content_hash = cache_key(record, fingerprint)
+        old = old_entries.get(identity)
+
+        if old and old["hash"] == content_hash and os.path.exists(os.path.join(out_dir, old["file"])):
+            entries[identity] = dict(old, row=row_number)
+            report.unchanged += 1
+        else:
+            pending[row_number] = (identity, content_hash, old)
+            to_render.append((row_number, fields))
+
+    if engine is not None:
+        results = engine.render(to_render)
+    else:
+        results = (render_row(row_number, fields, render) for row_number, fields in to_render)
+
+    try:
+        for result in results:
+            if result.error is not None:
+                report.errors.append({"row": result.row_number, "full_name": result.full_name, "error": result.error})
+                continue
+
+            identity, content_hash, old = pending[result.row_number]
+            filename = old["file"] if old else unique_name(pdf_filename(result.full_name), used_names)
+            _write_file(out_dir, filename, result.pdf_bytes)
+            entries[identity] = {"hash": content_hash, "file": filename, "row": result.row_number,
+                                 "full_name": result.full_name}
+            report.rendered += 1
+            if old:
+                report.changed += 1
+            else:
+                report.new += 1
+    finally:
+        # Rows that failed this time keep their last good PDF until fixed
+        for identity, _, old in pending.values():
+            if old and identity not in entries:
+                entries[identity] = old
+
+        removed = {identity: entry for identity, entry in old_entries.items() if identity not in entries}
+        report.removed = [{"full_name": entry["full_name"], "file": entry["file"]} for entry in removed.values()]
+        report.pruned = prune
+        if prune:
+            live = {entry["file"] for entry in entries.values()}
+            for entry in removed.values():
+                if entry["file"] in live:
+                    continue
+                try:
+                    os.remove(os.path.join(out_dir, entry["file"]))
+                except OSError:
+                    pass
+        else:
+            entries.update(removed)   # flagged on every run until pruned
+
+        save_manifest(out_dir, entries, fingerprint)
+        report.elapsed = time.perf_counter() - started
+
+    errors_path = os.path.join(out_dir, "errors.csv")
+    if report.errors:
+        _write_file(out_dir, "errors.csv", errors_csv(report.errors).encode("utf-8"))
+    elif os.path.exists(errors_path):
+        os.remove(errors_path)
+
+    return report
+
+
+def _write_file(out_dir, filename, data):
+    # Atomic, so a PDF viewer or sync client never sees a half-written file
+    fd, tmp_path = tempfile.mkstemp(dir=out_dir, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, os.path.join(out_dir, filename))
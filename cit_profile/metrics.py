@@ -0,0 +1,149 @@
+"""
+Per-stage timers and counters.
+
+    with METRICS.timer("parse"):
+        record = row_to_record(fields)
+
+METRICS is shared by the whole process (every Streamlit session, every
+batch row). Each stage keeps a count, a running total and the most recent
+samples for percentiles. Render worker processes send their samples back
+with their results (see engine.RenderEngine), so batch runs see every row.
+"""
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+SAMPLES_KEPT = 2000
+
+
+class Stage:
+    __slots__ = ("count", "total", "max", "samples")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = deque(maxlen=SAMPLES_KEPT)
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.samples.append(seconds)
+
+    def percentile(self, q):
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Metrics:
+    def __init__(self):
+        self._stages = {}
+        self._counters = {}
+        self._pending = []   # ("stage"/"count", name, value) not yet sent to the parent process
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def timer(self, stage):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started)
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            self._stages.setdefault(stage, Stage()).add(seconds)
+            self._keep(("stage", stage, seconds))
+
+    def count(self, counter, n=1):
+        with self._lock:
+            self._counters[counter] = self._counters.get(counter, 0) + n
+            self._keep(("count", counter, n))
+
+    def _keep(self, sample):
+        self._pending.append(sample)
+        if len(self._pending) > SAMPLES_KEPT:
+            del self._pending[:-SAMPLES_KEPT]
+
+    def drain(self):
+        """Samples recorded since the last drain, for sending from a worker process to the parent"""
+        with self._lock:
+            pending, self._pending = self._pending, []
+            return pending
+
+    def merge(self, samples):
+        with self._lock:
+            for kind, name, value in samples:
+                if kind == "stage":
+                    self._stages.setdefault(name, Stage()).add(value)
+                else:
+                    self._counters[name] = self._counters.get(name, 0) + value
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+            self._counters.clear()
+            self._pending.clear()
+
+    # ---------- EXPORT ----------
+    def summary(self):
+        """One dict per stage (times in milliseconds), for display"""
+        with self._lock:
+            return [
+                {
+                    "stage": name,
+                    "count": stage.count,
+                    "total_ms": round(stage.total * 1000, 1),
+                    "mean_ms": round(stage.total / stage.count * 1000, 2) if stage.count else 0.0,
+                    "p50_ms": round(stage.percentile(0.50) * 1000, 2),
+                    "p95_ms": round(stage.percentile(0.95) * 1000, 2),
+                    "max_ms": round(stage.max * 1000, 2),
+                }
+                for name, stage in self._stages.items()
+            ]
+
+    def counters(self):
+        with self._lock:
+            return dict(self._counters)
+
+    def to_json(self, **extra):
+        return json.dumps({"stages": self.summary(), "counters": self.counters(), **extra}, indent=2)
+
+    def to_prometheus(self, prefix="cit"):
+        """Prometheus text exposition format: a summary per stage and a counter per counter"""
+        lines = [
+            f"# HELP {prefix}_stage_seconds Time spent per stage",
+            f"# TYPE {prefix}_stage_seconds summary",
+        ]
+        with self._lock:
+            for name, stage in self._stages.items():
+                for q in (0.5, 0.95, 0.99):
+                    lines.append(f'{prefix}_stage_seconds{{stage="{name}",quantile="{q}"}} {stage.percentile(q):.6f}')
+                lines.append(f'{prefix}_stage_seconds_sum{{stage="{name}"}} {stage.total:.6f}')
+                lines.append(f'{prefix}_stage_seconds_count{{stage="{name}"}} {stage.count}')
+            for name, value in self._counters.items():
+                lines.append(f"# TYPE {prefix}_{name}_total counter")
+                lines.append(f"{prefix}_{name}_total {value}")
+        return "\n".join(lines) + "\n"
+
+
+METRICS = Metrics()
+
+
+def profile_call(func, *args, limit=30, **kwargs):
+    """Run func once under cProfile; returns (result, report text sorted by cumulative time)"""
+    import cProfile
+    import io
+    import pstats
+
+    profiler = cProfile.Profile()
+    result = profiler.runcall(func, *args, **kwargs)
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).strip_dirs().sort_stats("cumulative").print_stats(limit)
+    return result, out.getvalue()
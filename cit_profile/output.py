@@ -0,0 +1,158 @@
+"""
+Output profiles: how a finished profile PDF is written.
+
+    default       ReportLab's defaults, as profiles have always been written
+    email-small   logo at 150 dpi and JPEG quality 60, no ASCII85, no
+                  document info (no names or dates beyond the page itself)
+    print         logo at 300 dpi and quality 85, no ASCII85
+    archive       the logo file untouched, no ASCII85, title, author and
+                  subject in the document info and as XMP metadata, an sRGB
+                  output intent and the document language
+
+Nearly all of a profile's bytes are the logo, so the logo settings decide
+the size; ASCII85 (which ReportLab wraps the compressed page content in by
+default) adds a quarter to the page content. The archive profile follows
+PDF/A-1b as far as ReportLab allows, but Helvetica is referenced rather
+than embedded, so it does not claim PDF/A and a validator will say so.
+ReportLab writes a plain cross-reference table; object streams are not
+available, and would save little on a document of ten objects.
+"""
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+
+from reportlab.pdfbase import pdfdoc
+
+AUTHOR = "CIT"
+CREATOR = "CIT Applicant Profile Generator"
+SUBJECT = "New Admission Applicant Profile"
+LANGUAGE = "en-GB"
+
+_XMP = """<?xpacket begin="\ufeff" id="W5M0MpCehiHzreSzNTczkc9d"?>
+<x:xmpmeta xmlns:x="adobe:ns:meta/">
+<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#">
+<rdf:Description rdf:about="" xmlns:dc="http://purl.org/dc/elements/1.1/"
+ xmlns:xmp="http://ns.adobe.com/xap/1.0/" xmlns:pdf="http://ns.adobe.com/pdf/1.3/">
+<dc:format>application/pdf</dc:format>
+<dc:title><rdf:Alt><rdf:li xml:lang="x-default">{title}</rdf:li></rdf:Alt></dc:title>
+<dc:creator><rdf:Seq><rdf:li>{author}</rdf:li></rdf:Seq></dc:creator>
+<dc:description><rdf:Alt><rdf:li xml:lang="x-default">{subject}</rdf:li></rdf:Alt></dc:description>
+<dc:language><rdf:Bag><rdf:li>{language}</rdf:li></rdf:Bag></dc:language>
+<xmp:CreateDate>{date}</xmp:CreateDate>
+<xmp:ModifyDate>{date}</xmp:ModifyDate>
+<xmp:MetadataDate>{date}</xmp:MetadataDate>
+<xmp:CreatorTool>{creator}</xmp:CreatorTool>
+<pdf:Producer>{producer}</pdf:Producer>
+<pdf:Keywords>{keywords}</pdf:Keywords>
+</rdf:Description>
+</rdf:RDF>
+</x:xmpmeta>
+<?xpacket end="w"?>"""
+
+
+@dataclass(frozen=True)
+class OutputProfile:
+    name: str
+    logo_dpi: int = None        # None embeds the logo file as it is
+    logo_quality: int = 85      # JPEG quality of a downsampled logo
+    compress: bool = True       # Flate the page content
+    ascii85: bool = True        # ...and wrap it in ASCII85, as ReportLab does by default
+    info: str = "default"       # document info: "none", "default" (ReportLab's placeholders) or "full"
+    archival: bool = False      # XMP metadata, sRGB output intent, document language
+
+    def document_args(self, data=None):
+        """SimpleDocTemplate keyword arguments for the document of `data` (None for several applicants)"""
+        if self.info != "full":
+            return {"pageCompression": self.compress}
+        name = data and data.get("full_name")
+        return {
+            "pageCompression": self.compress,
+            "title": f"Applicant Profile: {name}" if name else "Applicant Profiles",
+            "author": AUTHOR,
+            "subject": SUBJECT,
+            "creator": CREATOR,
+            "keywords": ["admission", "applicant profile"],
+            "lang": LANGUAGE if self.archival else None,
+        }
+
+    def finish(self, canv):
+        """Apply the rest of the profile to a canvas about to be saved"""
+        doc = canv._doc
+        if self.compress and not self.ascii85:
+            for page in doc.Pages.pages:
+                if page.Contents is None and page.stream:
+                    page.Contents = pdfdoc.PDFStream(content=page.stream, filters=[pdfdoc.PDFZCompress])
+        if self.info == "none":
+            doc.info = NoInfo()
+        if self.archival:
+            doc.Catalog.Metadata = pdfdoc.XMP(creator=_xmp)   # not compressed, as PDF/A wants
+            intent = _srgb_output_intent()
+            if intent is not None:
+                doc.Catalog.OutputIntents = pdfdoc.PDFArray([intent])
+                doc.Catalog.__NoDefault__ = doc.Catalog.__NoDefault__ + ["OutputIntents"]
+
+
+class NoInfo(pdfdoc.PDFInfo):
+    """Document info with nothing in it"""
+
+    def format(self, document):
+        return pdfdoc.PDFDictionary({}).format(document)
+
+
+OUTPUT_PROFILES = {
+    profile.name: profile
+    for profile in [
+        OutputProfile("default"),
+        OutputProfile("email-small", logo_dpi=150, logo_quality=60, ascii85=False, info="none"),
+        OutputProfile("print", logo_dpi=300, logo_quality=85, ascii85=False),
+        OutputProfile("archive", ascii85=False, info="full", archival=True),
+    ]
+}
+
+
+def get_output_profile(output=None):
+    """An OutputProfile, or the one of that name (None for "default")"""
+    if isinstance(output, OutputProfile):
+        return output
+    try:
+        return OUTPUT_PROFILES[output or "default"]
+    except KeyError:
+        raise ValueError(f"Unknown output profile {output!r}; expected one of {', '.join(OUTPUT_PROFILES)}")
+
+
+def _xml(text):
+    return str(text).replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _xmp(doc):
+    # The same values and time as the document info, as PDF/A requires
+    info, stamp = doc.info, doc._timeStamp
+    offset = timezone(timedelta(hours=stamp.dhh, minutes=stamp.dmm if stamp.dhh >= 0 else -stamp.dmm))
+    date = datetime(*stamp.YMDhms, tzinfo=offset).isoformat()
+    return _XMP.format(title=_xml(info.title), author=_xml(info.author), subject=_xml(info.subject),
+                       creator=_xml(info.creator), producer=_xml(info.producer), keywords=_xml(info.keywords),
+                       language=LANGUAGE, date=date).encode("utf-8")
+
+
+def _srgb_output_intent():
+    profile = _srgb_profile()
+    if profile is None:
+        return None
+    stream = pdfdoc.PDFStream(pdfdoc.PDFDictionary({"N": 3}), profile, filters=[pdfdoc.PDFZCompress])
+    return pdfdoc.PDFDictionary({
+        "Type": pdfdoc.PDFName("OutputIntent"),
+        "S": pdfdoc.PDFName("GTS_PDFA1"),
+        "OutputConditionIdentifier": pdfdoc.PDFString("sRGB IEC61966-2.1"),
+        "Info": pdfdoc.PDFString("sRGB IEC61966-2.1"),
+        "DestOutputProfile": stream,
+    })
+
+
+@lru_cache(maxsize=None)
+def _srgb_profile():
+    # The ICC profile comes from Pillow's littleCMS, which some builds leave out
+    try:
+        from PIL import ImageCms
+    except ImportError:
+        return None
+    return ImageCms.ImageCmsProfile(ImageCms.createProfile("sRGB")).tobytes()
@@ -0,0 +1,53 @@
+"""
+The on-screen profile: preview HTML, summary lines and missing fields.
+
+Each view takes the field values as a tuple in PROFILE_FIELDS order and is
+memoized on it, so a rerun that changed nothing about the applicant (a
+widget elsewhere on the page, a second submit) reuses the previous result.
+"""
+from functools import lru_cache
+
+from .fields import FIELDS, PROFILE_FIELDS
+from .forms import missing_required
+
+_PREVIEW_ITEM = """<div style='margin-bottom: 15px;'>
+    <div class='info-label'>{label}</div>
+    <div class='info-value'>{value}</div>
+</div>"""
+
+
+def field_values(record):
+    """Hashable key for the views below"""
+    return tuple(record.get(field, "") for field in PROFILE_FIELDS)
+
+
+@lru_cache(maxsize=64)
+def preview_html(values):
+    """Label/value blocks for every visible field with something to show, as one HTML string"""
+    record = dict(zip(PROFILE_FIELDS, values))
+    items = []
+    for field in FIELDS:
+        if not field.visible(record):
+            continue
+        value = record[field.key] or field.empty
+        if value:  # Only show if there's a value
+            items.append(_PREVIEW_ITEM.format(label=field.preview_label, value=value))
+    return "\n".join(items)
+
+
+@lru_cache(maxsize=64)
+def summary_markdown(values):
+    record = dict(zip(PROFILE_FIELDS, values))
+    summary = {
+        "Applicant Name": record["full_name"],
+        "Date of Birth": record["dob"],
+        "Last Education": f"{record['last_standard']} ({record['last_attended']})",
+        "Current Status": f"Studied at {record['last_institute']} for {record['duration']}",
+        "Parent Contact": record["parent_mobile"],
+    }
+    return "\n\n".join(f"**{key}:** {value}" for key, value in summary.items() if value)
+
+
+@lru_cache(maxsize=64)
+def missing_fields(values):
+    return tuple(missing_required(dict(zip(PROFILE_FIELDS, values))))
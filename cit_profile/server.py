@@ -0,0 +1,407 @@
+"""
+Local HTTP render service: applicant JSON in, profile PDF out.
+
+    python -m cit_profile.server --port 8765 --workers 4
+
+    POST /render          one applicant, a JSON object of profile fields
+                          ("full_name", "address", ...) -> application/pdf
+    POST /render/batch    {"applicants": [...]} -> {"results": [{"file_name",
+                          "pdf" (base64), "error"}, ...]} in the same order
+    GET  /health          pool size and queue depth, as JSON
+    GET  /metrics         per-stage timings, Prometheus text
+
+Renders run in worker processes that are started, and have rendered a
+throwaway page (template, fonts, logo, glyph widths), before the port
+opens. Connections are kept alive (HTTP/1.1). At most `max_pending`
+applicants are queued or rendering at any time; a request that does not fit
+gets 503 with Retry-After at once rather than waiting. If a worker dies,
+the requests it takes down get 503 too and the pool is started afresh for
+the next ones. Workers come from a fork server (or are spawned where there
+is none), never forked from a request thread. Standard library only, and
+listens on 127.0.0.1 unless told otherwise.
+"""
+import argparse
+import base64
+import functools
+import json
+import os
+import shutil
+import signal
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from .engine import available_cpus, engine_context
+from .fields import PROFILE_FIELDS
+from .forms import missing_required, pdf_filename
+from .metrics import METRICS
+from .output import OUTPUT_PROFILES
+from .pdf import LAYOUTS, create_pdf_profile
+
+MAX_BODY = 16 * 1024 * 1024
+
+# Rendered once by each worker before it takes requests
+WARMUP_RECORD = {
+    "full_name": "Mohammed Aslam Muhammed", "address": "19, Ibrahim Road, Kandy",
+    "whatsapp_mobile": "0772226866", "mobile": "0772226866", "dob": "19 February 2009",
+    "place_of_birth": "Kandy", "nic": "200905012345", "languages": "English, Tamil",
+    "school_attended": "Zahira College", "last_institute": "Zahira College", "medium": "English",
+    "last_standard": "GCE (O/L)", "last_attended": "2023, June", "quran_memorized": "Yes", "juz_count": "30",
+    "islamic_institute": "Al Haqqaniyyah Arabic College", "city_location": "Akurana", "duration": "3 years",
+    "reason_leaving": "Wants to be with parents and continue studies",
+    "parent_name": "Ahamad Farook Mohammed", "parent_address": "19, Ibrahim Road, Kandy",
+    "father_residing": "Inland", "occupation": "Business", "parent_mobile": "0771234567",
+    "parent_whatsapp": "0771234567", "home_languages": "English, Tamil",
+}
+
+
+class Overloaded(RuntimeError):
+    """The render queue is full; retry shortly"""
+
+
+class RequestError(ValueError):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# ---------- WORKER PROCESSES ----------
+_render = None
+
+
+def _warm_worker(logo_dpi, layout, output):
+    global _render
+    _render = functools.partial(create_pdf_profile, logo_dpi=logo_dpi, layout=layout, output=output)
+    _render(WARMUP_RECORD)
+    METRICS.reset()   # not the warm-up's samples
+
+
+def _render_one(record, out_dir):
+    # Runs in a worker process; its stage timings travel back with the result.
+    # The PDF goes back as a file in `out_dir`: a worker killed halfway through
+    # sending a large result leaves the executor waiting for the rest of it
+    # for good, while a result this small is written to the pipe in one go.
+    try:
+        pdf_bytes, error = _render(record), None
+    except Exception as e:
+        pdf_bytes, error = None, str(e)
+    path = None
+    if pdf_bytes is not None:
+        fd, path = tempfile.mkstemp(dir=out_dir, suffix=".pdf")
+        with os.fdopen(fd, "wb") as f:
+            f.write(pdf_bytes)
+    return path, error, METRICS.drain()
+
+
+def _take_output(path):
+    if path is None:
+        return None
+    with open(path, "rb") as f:
+        pdf_bytes = f.read()
+    os.remove(path)
+    return pdf_bytes
+
+
+def _drop_output(future):
+    # For results nobody will collect (the request timed out or failed)
+    if not future.cancelled() and future.exception() is None:
+        path = future.result()[0]
+        if path is not None and os.path.exists(path):
+            os.remove(path)
+
+
+class RenderPool:
+    """
+    `workers` warm render processes, and a cap of `max_pending` applicants
+    queued or rendering across all requests.
+    """
+
+    def __init__(self, workers=None, max_pending=None, logo_dpi=None, layout="canvas", output=None, timeout=60):
+        self.workers = workers or available_cpus()
+        self.max_pending = max_pending or 32 * self.workers
+        self.timeout = timeout
+        self.pending = 0
+        self._lock = threading.Lock()
+        self._restart_lock = threading.Lock()
+        self._warmup = (logo_dpi, layout, output)
+        self._out_dir = tempfile.mkdtemp(prefix="cit_render_")
+        self._pool = self._start_pool()
+
+    def _start_pool(self):
+        """A new pool with every worker started and warm, within `timeout` seconds"""
+        pool = ProcessPoolExecutor(self.workers, mp_context=engine_context(), initializer=_warm_worker,
+                                   initargs=self._warmup)
+        # Each submit while no worker is idle starts another one, so this
+        # starts (and warms) the whole pool before it takes a request
+        deadline = time.monotonic() + self.timeout
+        try:
+            for future in [pool.submit(os.getpid) for _ in range(self.workers)]:
+                future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except BaseException:
+            _discard(pool)
+            raise
+        return pool
+
+    def render(self, records):
+        """
+        (pdf bytes, None) or (None, error) per record. Raises Overloaded if
+        they don't fit in the queue, TimeoutError if they take longer than
+        `timeout` seconds altogether, BrokenProcessPool if a worker died (the
+        pool has been replaced, or is being replaced, by the time it is raised).
+        """
+        with self._lock:
+            if self.pending + len(records) > self.max_pending:
+                METRICS.count("server_rejected")
+                raise Overloaded(f"{self.pending} applicant(s) already queued")
+            self.pending += len(records)
+
+        pool = self._pool
+        futures, results = [], []
+        try:
+            try:
+                for record in records:
+                    future = pool.submit(_render_one, record, self._out_dir)
+                    future.add_done_callback(self._finished)
+                    futures.append(future)
+            finally:
+                with self._lock:
+                    self.pending -= len(records) - len(futures)   # never submitted
+
+            deadline = time.monotonic() + self.timeout
+            for future in futures:
+                path, error, samples = future.result(timeout=max(0.0, deadline - time.monotonic()))
+                METRICS.merge(samples)
+                results.append((_take_output(path), error))
+        except BaseException as e:
+            for future in futures[len(results):]:
+                future.cancel()
+                future.add_done_callback(_drop_output)
+            if isinstance(e, BrokenProcessPool):
+                self._replace_pool(pool)
+            elif isinstance(e, (RuntimeError, CancelledError)) and pool is not self._pool:
+                # Another request found this pool broken and shut it down
+                # after this one picked it up, so it takes no new work
+                raise BrokenProcessPool("the render pool was being replaced") from e
+            raise
+        return results
+
+    def _replace_pool(self, broken):
+        # Every request on the broken pool gets here; the first replaces it
+        # while the rest answer 503 rather than queue behind the warm-up
+        if not self._restart_lock.acquire(blocking=False):
+            return
+        try:
+            if self._pool is not broken:
+                return
+            METRICS.count("server_pool_restarts")
+            try:
+                self._pool = self._start_pool()
+            except Exception as e:
+                # The broken pool stays, so the next request tries again
+                print(f"Could not restart the render pool: {type(e).__name__}: {e}", file=sys.stderr, flush=True)
+                return
+            _discard(broken)
+        finally:
+            self._restart_lock.release()
+
+    def _finished(self, future):
+        with self._lock:
+            self.pending -= 1
+
+    def close(self):
+        self._pool.shutdown(cancel_futures=True)
+        shutil.rmtree(self._out_dir, ignore_errors=True)
+
+
+def _discard(pool):
+    # shutdown() alone leaves behind a worker that hangs, and the executor's
+    # thread waiting on it; they go once every worker has exited
+    for process in list((pool._processes or {}).values()):
+        process.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+# ---------- HTTP ----------
+def to_record(applicant):
+    """Profile fields of a request's applicant object, as strings"""
+    if not isinstance(applicant, dict):
+        raise RequestError(HTTPStatus.BAD_REQUEST, "an applicant must be a JSON object of profile fields")
+    record = {}
+    for key in PROFILE_FIELDS:
+        value = applicant.get(key)
+        record[key] = "" if value is None else str(value).strip()
+    missing = missing_required(record)
+    if missing:
+        raise RequestError(HTTPStatus.UNPROCESSABLE_ENTITY, "Missing required field(s): " + ", ".join(missing))
+    return record
+
+
+class RenderHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive
+    server_version = "cit-render/1.0"
+    disable_nagle_algorithm = True   # headers and body are separate writes; don't hold the body for an ACK
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        if path == "/health":
+            pool = self.server.pool
+            self.send_json(HTTPStatus.OK, {"status": "ok", "workers": pool.workers, "pending": pool.pending,
+                                           "max_pending": pool.max_pending})
+        elif path == "/metrics":
+            self.send_body(HTTPStatus.OK, METRICS.to_prometheus().encode(), "text/plain; version=0.0.4")
+        else:
+            self.send_json(HTTPStatus.NOT_FOUND, {"error": f"no such endpoint: {path}"})
+
+    def do_POST(self):
+        path = urlsplit(self.path).path
+        with METRICS.timer("request"):
+            try:
+                body = self.read_json()
+                if path == "/render":
+                    self.render_one(body)
+                elif path == "/render/batch":
+                    self.render_batch(body)
+                else:
+                    raise RequestError(HTTPStatus.NOT_FOUND, f"no such endpoint: {path}")
+            except RequestError as e:
+                self.send_json(e.status, {"error": str(e)})
+            except Overloaded as e:
+                self.send_json(HTTPStatus.SERVICE_UNAVAILABLE, {"error": str(e)}, {"Retry-After": "1"})
+            except FutureTimeout:
+                self.send_json(HTTPStatus.GATEWAY_TIMEOUT, {"error": "render timed out"})
+            except BrokenProcessPool:
+                self.send_json(HTTPStatus.SERVICE_UNAVAILABLE,
+                               {"error": "a render worker died; the pool was restarted"}, {"Retry-After": "1"})
+
+    def render_one(self, body):
+        record = to_record(body)
+        [(pdf_bytes, error)] = self.server.pool.render([record])
+        if error:
+            raise RequestError(HTTPStatus.INTERNAL_SERVER_ERROR, error)
+        file_name = pdf_filename(record["full_name"])
+        self.send_body(HTTPStatus.OK, pdf_bytes, "application/pdf",
+                       {"Content-Disposition": f'attachment; filename="{file_name}"'})
+
+    def render_batch(self, body):
+        applicants = body.get("applicants") if isinstance(body, dict) else None
+        if not isinstance(applicants, list):
+            raise RequestError(HTTPStatus.BAD_REQUEST, 'expected {"applicants": [...]}')
+        if len(applicants) > self.server.pool.max_pending:
+            raise RequestError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                               f"at most {self.server.pool.max_pending} applicants per batch")
+
+        # Applicants that fail the checks are answered without a render
+        results = [None] * len(applicants)
+        records = []
+        for index, applicant in enumerate(applicants):
+            try:
+                records.append((index, to_record(applicant)))
+            except RequestError as e:
+                full_name = applicant.get("full_name", "") if isinstance(applicant, dict) else ""
+                results[index] = {"file_name": pdf_filename(full_name), "pdf": None, "error": str(e)}
+
+        rendered = self.server.pool.render([record for _, record in records])
+        for (index, record), (pdf_bytes, error) in zip(records, rendered):
+            results[index] = {
+                "file_name": pdf_filename(record["full_name"]),
+                "pdf": base64.b64encode(pdf_bytes).decode("ascii") if pdf_bytes else None,
+                "error": error,
+            }
+        self.send_json(HTTPStatus.OK, {"results": results})
+
+    def read_json(self):
+        try:
+            length = int(self.headers.get("Content-Length", ""))
+        except ValueError:
+            self.close_connection = True
+            raise RequestError(HTTPStatus.LENGTH_REQUIRED, "Content-Length required")
+        if length < 0:
+            self.close_connection = True   # rfile.read(-1) would wait for the client to close
+            raise RequestError(HTTPStatus.BAD_REQUEST, "negative Content-Length")
+        if length > MAX_BODY:
+            self.close_connection = True   # the body is left unread
+            raise RequestError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"body over {MAX_BODY} bytes")
+        try:
+            return json.loads(self.rfile.read(length))
+        except ValueError as e:
+            raise RequestError(HTTPStatus.BAD_REQUEST, f"invalid JSON: {e}")
+
+    def send_json(self, status, payload, headers=None):
+        self.send_body(status, json.dumps(payload).encode(), "application/json", headers)
+
+    def send_body(self, status, body, content_type, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.access_log:
+            super().log_message(format, *args)
+
+
+class RenderServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, address, pool, access_log=False):
+        super().__init__(address, RenderHandler)
+        self.pool = pool
+        self.access_log = access_log
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m cit_profile.server",
+        description="Serve applicant profile PDFs over HTTP from a pool of warm render processes.",
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on (default: %(default)s)")
+    parser.add_argument("--port", type=int, default=8765, help="(default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=None, help="render processes (default: one per CPU)")
+    parser.add_argument(
+        "--max-pending", type=int, default=None,
+        help="applicants queued or rendering before requests get 503, and the largest batch (default: 32 per worker)",
+    )
+    parser.add_argument("--timeout", type=float, default=60, help="seconds to wait for a render (default: %(default)s)")
+    parser.add_argument("--layout", choices=LAYOUTS, default="canvas", help="(default: %(default)s)")
+    parser.add_argument(
+        "--output-profile", choices=list(OUTPUT_PROFILES), default="default",
+        help="how the PDFs are written, e.g. email-small or archive (default: %(default)s)",
+    )
+    parser.add_argument("--logo-dpi", type=int, default=None, help="downsample the logo to this DPI")
+    parser.add_argument("--access-log", action="store_true", help="log every request to stderr")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    pool = RenderPool(args.workers, args.max_pending, logo_dpi=args.logo_dpi, layout=args.layout,
+                      output=args.output_profile, timeout=args.timeout)
+    server = RenderServer((args.host, args.port), pool, access_log=args.access_log)
+    print(f"Rendering on http://{args.host}:{server.server_port} with {pool.workers} warm worker(s), "
+          f"up to {pool.max_pending} applicants queued", file=sys.stderr, flush=True)
+    # Stop on `kill` as on Ctrl+C, so the workers are shut down rather than left running
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        pool.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+import os
+import re
+from dataclasses import dataclass, field
+
+from .fields import FIELDS, FORM_FIELDS, FORM_HEADERS
+
+CHOICE_FIELDS = tuple(field for field in FIELDS if field.choices)
+
+# Every header a column may have, and the index in FORM_FIELDS of its field
+HEADER_NAMES = FORM_HEADERS + tuple(alias for field in FIELDS for alias in field.aliases)
+HEADER_FIELDS = tuple(range(len(FORM_HEADERS))) + tuple(
+    FORM_FIELDS.index(field.key) for field in FIELDS for _ in field.aliases
+)
+
+EXPORT_TYPES = ["tsv", "csv", "txt", "xlsx"]
+
+# Minimum rapidfuzz score (0-100) for a column header to count as a match
+MATCH_THRESHOLD = 80
+
+
+@dataclass
+class ColumnMapping:
+    """How the columns of an export were matched to the form fields"""
+    matches: list = field(default_factory=list)   # (field key, column header, score)
+    missing: list = field(default_factory=list)   # field keys with no matching column
+    unused: list = field(default_factory=list)    # column headers that matched no field
+    positional: bool = False                      # no usable header row; mapped by position
+
+    @property
+    def fuzzy(self):
+        return [match for match in self.matches if match[2] < 100]
+
+    def rows(self):
+        """One row per field, for display"""
+        matched = {key: (header, score) for key, header, score in self.matches}
+        return [
+            {
+                "field": key,
+                "column": matched.get(key, ("", 0))[0],
+                "score": round(matched.get(key, ("", 0))[1]),
+            }
+            for key in FORM_FIELDS
+        ]
+
+
+def read_export(source, filename, header=0):
+    """Read a whole Google Forms export (TSV/CSV/XLSX) as a dataframe of strings; header=None if it has no header row"""
+    import pandas as pd  # only needed here, and slow to import
+
+    ext = os.path.splitext(filename)[1].lower().lstrip(".")
+
+    if ext == "xlsx":
+        df = pd.read_excel(source, header=header, dtype=str, keep_default_na=False, engine="openpyxl")
+    elif ext in ("tsv", "txt"):
+        df = pd.read_csv(source, sep="\t", header=header, dtype=str, keep_default_na=False)
+    elif ext == "csv":
+        df = pd.read_csv(source, header=header, dtype=str, keep_default_na=False)
+    else:
+        raise ValueError(f"Unsupported export format: .{ext}")
+
+    return df.fillna("")
+
+
+def _squash(text):
+    # "N.I.C No" and "NIC No" -> "nicno"
+    return re.sub(r"[\W_]+", "", text.lower())
+
+
+def match_columns(headers, threshold=MATCH_THRESHOLD):
+    """
+    Match export column headers to the form fields by name (the question,
+    or one of the field's aliases). Scores every name/header pair at once
+    with rapidfuzz, then assigns the best pairs first so each column is used
+    at most once.
+    """
+    import numpy as np
+    from rapidfuzz import fuzz, process, utils
+
+    headers = [str(header) for header in headers]
+    mapping = ColumnMapping()
+    if not headers:
+        mapping.missing = list(FORM_FIELDS)
+        return mapping
+
+    # Word order changes score well on the first, punctuation/spacing changes on the second
+    name_scores = np.maximum(
+        process.cdist(HEADER_NAMES, headers, scorer=fuzz.token_sort_ratio, processor=utils.default_process),
+        process.cdist(HEADER_NAMES, headers, scorer=fuzz.ratio, processor=_squash),
+    )
+    # Each field scores as its best name
+    scores = np.zeros((len(FORM_FIELDS), len(headers)), dtype=name_scores.dtype)
+    np.maximum.at(scores, np.array(HEADER_FIELDS), name_scores)
+
+    pairs = sorted(
+        ((scores[i, j], i, j) for i in range(len(FORM_FIELDS)) for j in range(len(headers))
+         if scores[i, j] >= threshold),
+        reverse=True,
+    )
+    field_done, column_done = set(), set()
+    for score, i, j in pairs:
+        if i in field_done or j in column_done:
+            continue
+        field_done.add(i)
+        column_done.add(j)
+        mapping.matches.append((FORM_FIELDS[i], headers[j], float(score)))
+
+    order = {key: n for n, key in enumerate(FORM_FIELDS)}
+    mapping.matches.sort(key=lambda match: order[match[0]])
+    mapping.missing = [key for i, key in enumerate(FORM_FIELDS) if i not in field_done]
+    mapping.unused = [header for j, header in enumerate(headers) if j not in column_done]
+    return mapping
+
+
+def normalize_export(df, threshold=MATCH_THRESHOLD):
+    """
+    Map a raw export to one column per form field (in FORM_FIELDS order) and
+    clean every value column-wise: line endings, surrounding whitespace, the
+    case of multiple-choice answers. Returns (dataframe, ColumnMapping).
+
+    If fewer than half the fields match a header, the export is assumed to
+    have no usable header row and columns are taken by position, as when
+    pasting a single row.
+    """
+    import pandas as pd
+
+    mapping = match_columns(df.columns, threshold)
+
+    if len(mapping.matches) < len(FORM_FIELDS) // 2 and len(df.columns) >= len(FORM_FIELDS):
+        positional = ColumnMapping(positional=True)
+        positional.matches = [(key, str(header), 0.0) for key, header in zip(FORM_FIELDS, df.columns)]
+        positional.unused = [str(header) for header in df.columns[len(FORM_FIELDS):]]
+        mapping = positional
+
+    columns = {}
+    source = {key: header for key, header, _ in mapping.matches}
+    by_name = {str(header): n for n, header in enumerate(df.columns)}
+    for key in FORM_FIELDS:
+        if key in source:
+            values = df.iloc[:, by_name[source[key]]].fillna("").astype(str)
+            columns[key] = values.str.replace("\r\n", "\n", regex=False).str.strip()
+        else:
+            columns[key] = pd.Series("", index=df.index, dtype=str)
+    out = pd.DataFrame(columns, index=df.index)
+
+    for choice_field in CHOICE_FIELDS:
+        # "yes" -> "Yes"; anything unrecognised is left for validation to report
+        canonical = {choice.lower(): choice for choice in choice_field.choices}
+        column = out[choice_field.key]
+        out[choice_field.key] = column.str.lower().map(canonical).fillna(column)
+
+    return out, mapping
+
+
+def load_export(source, filename, threshold=MATCH_THRESHOLD):
+    """
+    read_export + normalize_export. An export without a header row is read
+    again without one, so its first row is an applicant too and row numbers
+    match the sheet.
+    """
+    df, mapping = normalize_export(read_export(source, filename), threshold)
+    if mapping.positional:
+        if hasattr(source, "seek"):
+            source.seek(0)
+        raw = read_export(source, filename, header=None)
+        raw.index -= 1   # iter_rows numbers rows from 2, after a header row
+        df, mapping = normalize_export(raw, threshold)
+    return df, mapping
+
+
+def iter_rows(df):
+    """
+    Yield (sheet row number, cell values) for every data row; the header is
+    row 1. Numbers come from the index, so they still match the sheet after
+    rows are filtered out.
+    """
+    for index, values in zip(df.index, df.itertuples(index=False, name=None)):
+        yield index + 2, list(values)
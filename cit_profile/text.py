@@ -0,0 +1,55 @@
+from datetime import datetime
+
+from .metrics import METRICS
+
+
+def create_text_profile(data, generated_on=None):
+    """
+    Plain-text version of the profile for copying into other systems. Staff
+    paste it elsewhere, so its layout is kept exactly as it has always been
+    rather than following the field schema.
+    """
+    with METRICS.timer("text_export"):
+        juz_line = f"Juz Count: {data['juz_count']}" if data["quran_memorized"] == "Yes" else ""
+
+        return f"""CIT APPLICANT PROFILE
+=============================
+
+APPLICANT INFORMATION:
+---------------------
+Full Name: {data['full_name']}
+Address: {data['address']}
+Mobile: {data['mobile']} (WhatsApp: {data['whatsapp_mobile']})
+Date of Birth: {data['dob']}
+Place of Birth: {data['place_of_birth']}
+NIC No: {data.get('nic') or 'Not provided'}
+Languages Spoken: {data['languages']}
+
+EDUCATIONAL BACKGROUND:
+----------------------
+School/College Attended: {data['school_attended']}
+Last Institute Attended: {data['last_institute']}
+Medium of Instruction: {data['medium']}
+Last Standard Acquired: {data['last_standard']}
+Year & Month Last Attended: {data['last_attended']}
+
+Quran Memorization: {data['quran_memorized']}
+{juz_line}
+
+Islamic Institute: {data['islamic_institute']}
+City/Location: {data['city_location']}
+Duration Attended: {data['duration']}
+Reason for Leaving: {data['reason_leaving']}
+
+PARENT/GUARDIAN INFORMATION:
+---------------------------
+Parent/Guardian Name: {data['parent_name']}
+Parent/Guardian Address: {data['parent_address']}
+Father Residing: {data['father_residing']}
+Occupation: {data['occupation']}
+Parent Mobile: {data['parent_mobile']}
+Parent WhatsApp: {data['parent_whatsapp']}
+Languages at Home: {data['home_languages']}
+
+Generated on: {(generated_on or datetime.now()).strftime('%Y-%m-%d %H:%M:%S')}
+"""
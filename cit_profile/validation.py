@@ -0,0 +1,168 @@
+"""
+Whole-export validation, run column-wise before anything is rendered.
+
+validate_export() checks and normalizes every row of a normalized export at
+once and returns a table of issues. Rows with an "error" are rejected and
+never reach the renderer; "warning" rows are rendered with the normalized
+values. A malformed phone or NIC number in an optional field is only a
+warning, and is rendered as entered.
+"""
+from dataclasses import dataclass
+from datetime import date
+
+from .fields import CONDITIONAL_FIELDS, FIELDS, FIELDS_BY_KEY, REQUIRED_FIELDS
+
+PHONE_FIELDS = tuple(field.key for field in FIELDS if field.kind == "phone")
+DATE_FIELDS = tuple(field.key for field in FIELDS if field.kind == "date")
+NIC_FIELDS = tuple(field.key for field in FIELDS if field.kind == "nic")
+JUZ_FIELDS = tuple(field.key for field in FIELDS if field.kind == "juz")
+CHOICE_FIELDS = tuple(field for field in FIELDS if field.choices)
+
+# Sri Lankan numbers in any common form: 0771234567, 771234567, +94 77 123 4567, 0094771234567
+LOCAL_PHONE = r"^(?:\+94|0094|94)?0?(?P<number>[1-9]\d{8})$"
+# Anything else must be a full international number (parents living overseas)
+INTERNATIONAL_PHONE = r"^(?:\+|00)(?P<number>[1-9]\d{6,14})$"
+
+OLD_NIC = r"^(?P<year>\d{2})(?P<day>\d{3})\d{4}[VX]$"    # 9 digits + V/X, 19YY births
+NEW_NIC = r"^(?P<year>\d{4})(?P<day>\d{3})\d{5}$"       # 12 digits since 2016
+
+MIN_AGE = 5
+MAX_AGE = 100
+MAX_JUZ = 30
+
+ISSUE_COLUMNS = ["row", "full_name", "field", "value", "severity", "message"]
+
+
+@dataclass
+class ValidationResult:
+    df: object       # normalized dataframe, same index as the input
+    issues: object   # dataframe with ISSUE_COLUMNS, one row per problem
+
+    @property
+    def rejected(self):
+        """Boolean Series: rows with at least one error"""
+        error_rows = self.issues.loc[self.issues["severity"] == "error", "row"]
+        return (self.df.index.to_series() + 2).isin(error_rows)
+
+    @property
+    def valid(self):
+        """The rows that can be rendered"""
+        return self.df[~self.rejected]
+
+    def error_rows(self):
+        """One {"row", "full_name", "error"} dict per rejected row, as in BatchReport.errors"""
+        errors = self.issues[self.issues["severity"] == "error"]
+        return [
+            {"row": int(row), "full_name": group["full_name"].iloc[0],
+             "error": "; ".join(f"{field}: {message}" for field, message in zip(group["field"], group["message"]))}
+            for row, group in errors.groupby("row", sort=True)
+        ]
+
+
+def normalize_phones(column):
+    """Vectorized: (normalized numbers, mask of non-empty values that are not phone numbers)"""
+    compact = column.str.replace(r"[\s\-().]", "", regex=True)
+    local = compact.str.extract(LOCAL_PHONE)["number"]
+    international = compact.str.extract(INTERNATIONAL_PHONE)["number"]
+
+    normalized = ("0" + local).fillna("+" + international).fillna(column)
+    invalid = (column != "") & local.isna() & international.isna()
+    return normalized, invalid
+
+
+def validate_export(df, today=None):
+    """Check every row of a normalized export (see sheet.normalize_export) at once"""
+    import pandas as pd
+
+    today = today or date.today()
+    out = df.copy()
+    issues = []
+
+    def flag(mask, key, severity, message, values=None):
+        if mask.any():
+            issues.append(pd.DataFrame({
+                "row": out.index[mask] + 2,
+                "full_name": out.loc[mask, "full_name"].to_numpy(),
+                "field": key,
+                "value": (df[key] if values is None else values)[mask].to_numpy(),
+                "severity": severity,
+                "message": message,
+            }))
+
+    # ---------- REQUIRED FIELDS ----------
+    for key in REQUIRED_FIELDS:
+        flag(out[key] == "", key, "error", "required")
+
+    # ---------- MULTIPLE CHOICE ----------
+    for field in CHOICE_FIELDS:
+        column = out[field.key]
+        flag((column != "") & ~column.isin(field.choices), field.key, "error",
+             "expected one of " + ", ".join(field.choices))
+
+    def format_severity(key):
+        return "error" if FIELDS_BY_KEY[key].required else "warning"
+
+    # ---------- PHONE NUMBERS ----------
+    for key in PHONE_FIELDS:
+        normalized, invalid = normalize_phones(out[key])
+        flag(invalid, key, format_severity(key), "not a phone number")
+        out[key] = normalized
+
+    # ---------- DATE OF BIRTH ----------
+    for key in DATE_FIELDS:
+        column = out[key]
+        parsed = pd.to_datetime(column, format="mixed", dayfirst=True, errors="coerce")
+        flag((column != "") & parsed.isna(), key, "error", "unrecognised date")
+
+        age = today.year - parsed.dt.year
+        flag(parsed.notna() & ((age < MIN_AGE) | (age > MAX_AGE)), key, "error",
+             f"age outside {MIN_AGE}-{MAX_AGE} years")
+
+        # Same style everywhere, e.g. "19 February 2009"
+        pretty = parsed.dt.day.astype("Int64").astype(str) + parsed.dt.strftime(" %B %Y")
+        out[key] = pretty.where(parsed.notna(), column)
+        out[f"_{key}_year"] = parsed.dt.year
+
+    # ---------- NIC ----------
+    for key in NIC_FIELDS:
+        column = out[key].str.replace(r"\s", "", regex=True).str.upper()
+        old = column.str.extract(OLD_NIC)
+        new = column.str.extract(NEW_NIC)
+        flag((column != "") & old["year"].isna() & new["year"].isna(), key, format_severity(key),
+             "not an old (123456789V) or new (12 digit) NIC number")
+        out[key] = column
+
+        # The NIC starts with the year of birth; compare it with the date of birth
+        nic_year = pd.to_numeric("19" + old["year"], errors="coerce").fillna(pd.to_numeric(new["year"], errors="coerce"))
+        for date_key in DATE_FIELDS:
+            birth_year = out[f"_{date_key}_year"]
+            flag(nic_year.notna() & birth_year.notna() & (nic_year != birth_year), key, "warning",
+                 f"year of birth in NIC does not match {date_key}")
+
+    out = out.drop(columns=[f"_{key}_year" for key in DATE_FIELDS])
+
+    # ---------- JUZ COUNT ----------
+    for key in JUZ_FIELDS:
+        column = out[key]
+        count = pd.to_numeric(column, errors="coerce")
+        # Only where it applies; elsewhere the value is ignored (with a warning) below
+        visible_if = FIELDS_BY_KEY[key].visible_if
+        applies = out[visible_if[0]] == visible_if[1] if visible_if else True
+        flag(applies & (column != "") & ~count.between(1, MAX_JUZ), key, "error",
+             f"expected a number from 1 to {MAX_JUZ}")
+
+    # ---------- CONDITIONAL FIELDS ----------
+    for field in CONDITIONAL_FIELDS:
+        depends_on, value = field.visible_if
+        not_applicable = out[depends_on] != value
+        flag(not_applicable & (out[field.key] != ""), field.key, "warning",
+             f"ignored because {depends_on} is not {value}")
+        out.loc[not_applicable, field.key] = ""
+
+    if issues:
+        issues = pd.concat(issues, ignore_index=True).sort_values(["row", "severity"], kind="stable")
+        issues = issues.reset_index(drop=True)
+    else:
+        issues = pd.DataFrame(columns=ISSUE_COLUMNS)
+
+    return ValidationResult(out, issues)
@@ -0,0 +1,89 @@
+"""PDFCache: hits and misses in memory and on disk, and keys that change with everything that changes a PDF"""
+import os
+
+from benchmarks.synthetic import make_rows
+from cit_profile import cache as cache_module
+from cit_profile.cache import PDFCache, template_fingerprint
+from cit_profile.fields import FORM_FIELDS
+from cit_profile.pdf import get_template
+
+RECORDS = [dict(zip(FORM_FIELDS, fields)) for _, fields in make_rows(30)]
+
+
+class CountingRender:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, data):
+        self.calls += 1
+        return f"%PDF {data['full_name']}".encode()
+
+
+def test_memory_hits_and_misses():
+    render = CountingRender()
+    cache = PDFCache(max_items=2, render=render)
+    first, second, third = RECORDS[:3]
+
+    assert cache.get_or_render(first) == b"%PDF " + first["full_name"].encode()
+    cache.get_or_render(first)
+    assert (cache.stats.hits, cache.stats.misses, render.calls) == (1, 1, 1)
+
+    # An edit is a new document
+    cache.get_or_render({**first, "address": "20, Ibrahim Road, Kandy"})
+    assert (cache.stats.misses, render.calls) == (2, 2)
+
+    # Least recently used goes first
+    cache.get_or_render(first)
+    cache.get_or_render(second)
+    cache.get_or_render(third)
+    assert len(cache) == 2
+    cache.get_or_render(first)
+    assert render.calls == 5
+
+
+def test_disk_hits_survive_a_restart(tmp_path):
+    render = CountingRender()
+    PDFCache(disk_dir=str(tmp_path), render=render).get_or_render(RECORDS[0])
+
+    cache = PDFCache(disk_dir=str(tmp_path), render=render)
+    assert cache.get_or_render(RECORDS[0]) == b"%PDF " + RECORDS[0]["full_name"].encode()
+    assert (cache.stats.disk_hits, cache.stats.misses, render.calls) == (1, 0, 1)
+
+
+def test_disk_is_trimmed_without_a_scan_per_write(tmp_path, monkeypatch):
+    scans = []
+    trim = PDFCache._trim_disk
+    monkeypatch.setattr(PDFCache, "_trim_disk", lambda self: scans.append(1) or trim(self))
+
+    cache = PDFCache(max_items=1, disk_dir=str(tmp_path), max_disk_items=20, render=CountingRender())
+    for record in RECORDS:
+        cache.get_or_render(record)
+
+    files = [name for name in os.listdir(tmp_path) if name.endswith(".pdf")]
+    assert len(files) <= 20
+    assert cache.key(RECORDS[-1]) + ".pdf" in files
+    # Down to 18 each time it goes over 20
+    assert len(scans) == 4
+
+
+def test_fingerprint_changes_with_the_template(monkeypatch):
+    base = template_fingerprint(get_template())
+    assert template_fingerprint(get_template()) == base
+    assert template_fingerprint(get_template(logo_dpi=72)) != base
+    assert template_fingerprint(get_template(output="email-small")) != base
+    assert template_fingerprint(get_template(), layout="canvas") != base
+
+    monkeypatch.setattr(cache_module, "TEMPLATE_VERSION", cache_module.TEMPLATE_VERSION + "-next")
+    assert template_fingerprint(get_template()) != base
+
+
+def test_keys_change_with_the_cache_settings():
+    record = RECORDS[0]
+    keys = {
+        PDFCache().key(record),
+        PDFCache(logo_dpi=72).key(record),
+        PDFCache(output="email-small").key(record),
+        PDFCache(layout="canvas").key(record),
+    }
+    assert len(keys) == 4
+    assert PDFCache().key(record) == PDFCache().key(dict(record))
@@ -0,0 +1,82 @@
+"""find_duplicates: repeated submissions are found, different applicants are never merged"""
+import pandas as pd
+
+from benchmarks.synthetic import make_rows
+from cit_profile.dedupe import find_duplicates
+from cit_profile.fields import FORM_FIELDS
+from cit_profile.validation import validate_export
+
+BASE = {
+    **dict(zip(FORM_FIELDS, make_rows(1)[0][1])),
+    "full_name": "Mohammed Rizwan Cassim",
+    "address": "38/C Kawdana Road, Dehiwala",
+    "mobile": "0772226866",
+    "whatsapp_mobile": "0772226866",
+    "dob": "19 February 2009",
+    "nic": "",
+}
+
+
+def export(*changes):
+    """A validated export with one row per dict of changes to BASE, submitted a day apart in that order"""
+    rows = [{**BASE, "timestamp": f"1/{n + 1}/2026 10:00:00", **row} for n, row in enumerate(changes)]
+    return validate_export(pd.DataFrame(rows, columns=list(FORM_FIELDS))).df
+
+
+def kept_names(df, **kwargs):
+    return sorted(find_duplicates(df, **kwargs).df["full_name"])
+
+
+def test_distinct_synthetic_applicants_are_kept():
+    # They share a phone number, a date of birth and often a NIC, but not a name or a house number
+    df = validate_export(pd.DataFrame([fields for _, fields in make_rows(40)], columns=list(FORM_FIELDS))).df
+    result = find_duplicates(df)
+    assert len(result.df) == 40
+    assert result.dropped == 0
+
+
+def test_resubmission_with_a_typo_keeps_the_latest():
+    df = export({}, {"full_name": "Mohamed Rizwan Cassim", "address": "38/C Kawdana Rd., Dehiwala"})
+    result = find_duplicates(df)
+    assert list(result.df["full_name"]) == ["Mohamed Rizwan Cassim"]
+    assert result.duplicates.loc[0, ["row", "kept_row"]].tolist() == [2, 3]
+
+
+def test_keep_first():
+    df = export({}, {"full_name": "Mohamed Rizwan Cassim"})
+    assert kept_names(df, keep="first") == ["Mohammed Rizwan Cassim"]
+
+
+def test_siblings_with_a_shared_phone_and_address_are_kept():
+    df = export({"full_name": "Ahamed Farook Shifas", "dob": "3 March 2010"},
+                {"full_name": "Ahamed Farook Rifas", "dob": "19 February 2009"})
+    assert kept_names(df) == ["Ahamed Farook Rifas", "Ahamed Farook Shifas"]
+
+
+def test_twins_are_kept():
+    df = export({"full_name": "Fathima Rizna Farook"}, {"full_name": "Fathima Rifka Farook"})
+    assert kept_names(df) == ["Fathima Rifka Farook", "Fathima Rizna Farook"]
+
+
+def test_different_nics_are_different_applicants():
+    df = export({"nic": "200905012345"}, {"nic": "200905012346"})
+    assert len(find_duplicates(df).df) == 2
+
+
+def test_same_nic_matches_without_a_date_of_birth_match():
+    df = export({"nic": "200905012345"}, {"nic": "200905012345", "dob": "20 February 2009"})
+    assert len(find_duplicates(df).df) == 1
+
+
+def test_different_house_numbers_are_different_applicants():
+    df = export({"address": "12, Ibrahim Road, Akurana"}, {"address": "14, Ibrahim Road, Akurana"})
+    assert len(find_duplicates(df).df) == 2
+
+
+def test_matches_do_not_chain():
+    # Each name is close to the next one, but the first and the last are not close
+    df = export({"full_name": "Mohammed Rizwan Cassim"}, {"full_name": "Mohammed Rizwan Casim"},
+                {"full_name": "Mohamed Rizwan Casim"}, {"full_name": "Mohamed Rizwn Casim"})
+    result = find_duplicates(df)
+    assert sorted(result.df["full_name"]) == ["Mohamed Rizwn Casim", "Mohammed Rizwan Cassim"]
+    assert set(result.duplicates["kept_row"]) == {5}
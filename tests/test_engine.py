@@ -0,0 +1,77 @@
+"""RenderEngine: same PDFs and failures as rendering in-thread, in either order, and a dead worker only fails its chunk"""
+import multiprocessing
+import os
+
+import pytest
+from reportlab import rl_config
+
+from benchmarks.synthetic import make_rows
+from cit_profile.batch import BatchReport, batch_files
+from cit_profile.engine import RenderEngine, render_row
+from cit_profile.fields import FORM_FIELDS
+from cit_profile.pdf import create_pdf_profile
+
+FORK = multiprocessing.get_context("fork")   # the render functions below live in this test module
+
+
+@pytest.fixture(autouse=True)
+def invariant(monkeypatch):
+    # No timestamps or random document ids, so PDFs can be compared byte for byte
+    monkeypatch.setattr(rl_config, "invariant", 1)
+
+
+def make_batch(n=10):
+    rows = make_rows(n)
+    rows[3][1][FORM_FIELDS.index("parent_name")] = ""   # missing a required field
+    return rows
+
+
+def render_or_die(data):
+    if data["full_name"].endswith(" 5"):
+        os._exit(1)
+    return create_pdf_profile(data)
+
+
+def test_ordered_matches_in_thread_render():
+    rows = make_batch()
+    engine = RenderEngine(workers=2, chunksize=3, mp_context=FORK)
+    results = list(engine.render(rows))
+
+    assert [result.row_number for result in results] == [row_number for row_number, _ in rows]
+    assert [result.pdf_bytes for result in results] == [render_row(*row).pdf_bytes for row in rows]
+    assert results[3].pdf_bytes is None
+    assert "parent_name" in results[3].error
+    assert (engine.stats.rendered, engine.stats.failed) == (9, 1)
+
+
+def test_unordered_returns_every_row_once():
+    rows = make_batch()
+    engine = RenderEngine(workers=2, chunksize=2, max_in_flight=2, mp_context=FORK)
+    results = list(engine.render(rows, ordered=False))
+
+    assert sorted(result.row_number for result in results) == [row_number for row_number, _ in rows]
+    assert [result.row_number for result in results if result.error] == [rows[3][0]]
+
+
+def test_batch_files_serial_and_engine_agree():
+    rows = make_batch()
+    serial, pooled = BatchReport(), BatchReport()
+    serial_files = list(batch_files(rows, serial))
+    pooled_files = list(batch_files(rows, pooled, engine=RenderEngine(workers=2, mp_context=FORK)))
+
+    assert serial_files == pooled_files
+    assert len(serial_files) == serial.rendered == pooled.rendered == 9
+    assert serial.errors == pooled.errors
+    assert [error["row"] for error in serial.errors] == [rows[3][0]]
+
+
+def test_dead_worker_fails_its_chunk_and_the_rest_carry_on():
+    rows = make_rows(12)
+    engine = RenderEngine(workers=2, chunksize=2, max_in_flight=1, render=render_or_die, mp_context=FORK)
+    results = list(engine.render(rows))
+
+    # One chunk in flight at a time, so only the chunk with applicant 5 is lost
+    failed = [result.row_number for result in results if result.error]
+    assert failed == [rows[4][0], rows[5][0]]
+    assert all("Worker failed" in result.error for result in results if result.error)
+    assert engine.stats.rendered == 10
@@ -0,0 +1,38 @@
+"""JobQueue: a job that fails leaves no files behind"""
+import os
+import tempfile
+import time
+
+from benchmarks.synthetic import make_rows
+from cit_profile.exporters import XLSXExporter
+from cit_profile.jobs import JobQueue
+
+
+def wait_for(queue, job_id, timeout=30):
+    deadline = time.monotonic() + timeout
+    while not queue.get(job_id).done:
+        assert time.monotonic() < deadline, "job did not finish"
+        time.sleep(0.05)
+    return queue.get(job_id)
+
+
+def test_failed_export_removes_its_temporary_files(tmp_path, monkeypatch):
+    scratch = tmp_path / "tmp"
+    scratch.mkdir()
+    monkeypatch.setattr(tempfile, "tempdir", str(scratch))
+
+    finish = XLSXExporter.finish
+
+    def fail(self):
+        finish(self)
+        raise OSError("disk full")
+    monkeypatch.setattr(XLSXExporter, "finish", fail)
+
+    store = tmp_path / "jobs"
+    queue = JobQueue(str(store), workers=1, engine_workers=1)
+    job = wait_for(queue, queue.submit(make_rows(3), "a", formats=("xlsx", "json", "txt")).id)
+
+    assert (job.status, job.error, job.output_path) == ("failed", "disk full", None)
+    # The JSON summary still closed and removed its file, and the half-written ZIP is gone
+    assert os.listdir(scratch) == []
+    assert sorted(os.listdir(store)) == [job.id + ".json"]
@@ -0,0 +1,44 @@
+"""render_incremental: file names stay unique across runs, and pruning never deletes a live PDF"""
+import os
+
+from benchmarks.synthetic import make_rows
+from cit_profile.fields import FORM_FIELDS
+from cit_profile.manifest import load_manifest, render_incremental
+
+
+def test_edited_response_gets_its_own_file_and_prune_keeps_it(tmp_path):
+    out_dir = str(tmp_path)
+    rows = make_rows(2)
+    render_incremental(rows, out_dir)
+
+    # A new NIC is a new identity with the same name as the entry it replaces
+    rows[0][1][FORM_FIELDS.index("nic")] = "200905099999"
+    report = render_incremental(rows, out_dir, prune=True)
+    assert (report.new, report.unchanged, len(report.removed)) == (1, 1, 1)
+
+    entries, _ = load_manifest(out_dir)
+    files = [entry["file"] for entry in entries.values()]
+    assert len(files) == len(set(files)) == 2
+    assert all(os.path.exists(os.path.join(out_dir, name)) for name in files)
+    assert sorted(name for name in os.listdir(out_dir) if name.endswith(".pdf")) == sorted(files)
+
+
+def test_duplicate_rows_render_once_and_prune_cleans_up(tmp_path):
+    out_dir = str(tmp_path)
+    rows = make_rows(3)
+    duplicate = (len(rows) + 2, list(rows[1][1]))
+    duplicate[1][FORM_FIELDS.index("address")] = "20, Ibrahim Road, Kandy"   # same identity, later edit
+    report = render_incremental(rows + [duplicate], out_dir)
+    assert (report.new, report.total) == (3, 4)
+    assert report.errors == [{"row": rows[1][0], "full_name": rows[1][1][FORM_FIELDS.index("full_name")],
+                              "error": f"Duplicate of row {duplicate[0]}, which is used instead"}]
+
+    entries, _ = load_manifest(out_dir)
+    assert sorted(entry["row"] for entry in entries.values()) == [rows[0][0], rows[2][0], duplicate[0]]
+    pdfs = sorted(name for name in os.listdir(out_dir) if name.endswith(".pdf"))
+    assert pdfs == sorted(entry["file"] for entry in entries.values())
+
+    # Once the sheet drops the applicant, prune leaves no PDF of theirs behind
+    report = render_incremental([rows[0], rows[2]], out_dir, prune=True)
+    assert len(report.removed) == 1
+    assert len([name for name in os.listdir(out_dir) if name.endswith(".pdf")]) == 2
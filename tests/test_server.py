@@ -0,0 +1,91 @@
+"""Render service: a dead worker costs one 503, not every later request; a negative Content-Length is refused"""
+import http.client
+import json
+import os
+import signal
+import threading
+import time
+
+import pytest
+
+from benchmarks.synthetic import make_rows
+from cit_profile.fields import FORM_FIELDS, PROFILE_FIELDS
+from cit_profile.server import RenderPool, RenderServer
+
+APPLICANT = {key: value for key, value in zip(FORM_FIELDS, make_rows(1)[0][1]) if key in PROFILE_FIELDS}
+
+
+@pytest.fixture(scope="module")
+def server():
+    pool = RenderPool(workers=2, max_pending=256, timeout=10)
+    server = RenderServer(("127.0.0.1", 0), pool)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    pool.close()
+
+
+def post(server, body, headers=None, path="/render"):
+    conn = http.client.HTTPConnection("127.0.0.1", server.server_port, timeout=30)
+    try:
+        conn.request("POST", path, body, headers or {"Content-Type": "application/json"})
+        response = conn.getresponse()
+        return response.status, response.read()
+    finally:
+        conn.close()
+
+
+def test_render(server):
+    status, body = post(server, json.dumps(APPLICANT))
+    assert status == 200
+    assert body.startswith(b"%PDF")
+
+
+def test_dead_worker_gets_503_and_the_pool_recovers(server):
+    pool = server.pool._pool
+    with pytest.raises(Exception):
+        pool.submit(os._exit, 1).result(timeout=30)
+
+    status, body = post(server, json.dumps(APPLICANT))
+    assert status == 503
+    assert "worker died" in json.loads(body)["error"]
+    assert server.pool._pool is not pool
+
+    status, body = post(server, json.dumps(APPLICANT))
+    assert status == 200
+    assert body.startswith(b"%PDF")
+    assert server.pool.pending == 0
+
+
+def test_negative_content_length_is_refused(server):
+    status, body = post(server, b"{}", {"Content-Length": "-1"})
+    assert status == 400
+
+
+def test_worker_killed_under_concurrent_requests(server):
+    batch = json.dumps({"applicants": [APPLICANT] * 20})
+    statuses = []
+
+    def client():
+        for _ in range(3):
+            statuses.append(post(server, batch, path="/render/batch")[0])
+
+    clients = [threading.Thread(target=client) for _ in range(6)]
+    for thread in clients:
+        thread.start()
+    time.sleep(0.3)
+    os.kill(next(iter(server.pool._pool._processes)), signal.SIGKILL)
+    for thread in clients:
+        thread.join(timeout=60)
+
+    # Every request is answered: rendered, or 503 while the pool was broken or being replaced
+    assert not any(thread.is_alive() for thread in clients)
+    assert len(statuses) == 18
+    assert set(statuses) <= {200, 503}
+    assert 503 in statuses
+
+    status, body = post(server, json.dumps(APPLICANT))
+    assert status == 200
+    assert server.pool.pending == 0
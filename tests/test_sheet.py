@@ -0,0 +1,73 @@
+"""Reading exports: columns found by header name, or by position when there is no header row"""
+import io
+
+import pandas as pd
+
+from benchmarks.synthetic import make_rows
+from cit_profile.fields import FORM_FIELDS, FORM_HEADERS
+from cit_profile.sheet import iter_rows, load_export, match_columns, normalize_export
+
+ROWS = [fields for _, fields in make_rows(3)]
+
+
+def tsv(rows, headers=None):
+    lines = ([headers] if headers else []) + rows
+    return io.BytesIO("\n".join("\t".join(line) for line in lines).encode())
+
+
+def test_exact_headers():
+    mapping = match_columns(FORM_HEADERS)
+    assert [key for key, _, _ in mapping.matches] == list(FORM_FIELDS)
+    assert mapping.missing == mapping.unused == []
+    assert mapping.fuzzy == []
+
+
+def test_renamed_headers():
+    renamed = {"N.I.C No": "NIC number", "Address": "Home Address", "Mobile (Whatsapp)": "Mobile (WhatsApp)",
+               "Name of School/College attended": "School / College attended", "Date of Birth": "Date of birth"}
+    mapping = match_columns([renamed.get(header, header) for header in FORM_HEADERS])
+    matched = {key: header for key, header, _ in mapping.matches}
+    assert mapping.missing == []
+    assert matched["nic"] == "NIC number"
+    assert matched["address"] == "Home Address"
+    assert matched["whatsapp_mobile"] == "Mobile (WhatsApp)"
+    assert matched["school_attended"] == "School / College attended"
+    assert matched["dob"] == "Date of birth"
+
+
+def test_reordered_columns():
+    order = list(reversed(range(len(FORM_FIELDS))))
+    df = pd.DataFrame([[row[i] for i in order] for row in ROWS], columns=[FORM_HEADERS[i] for i in order])
+    out, mapping = normalize_export(df)
+    assert not mapping.positional
+    assert out.columns.tolist() == list(FORM_FIELDS)
+    assert out.values.tolist() == ROWS
+
+
+def test_headers_below_the_threshold_are_not_matched():
+    # "Name" scores 67 against "Full Name" and "Mobile Number" 67 against "Mobile"
+    headers = [header for header in FORM_HEADERS if header not in ("Full Name", "Mobile")] + ["Name", "Mobile Number"]
+    mapping = match_columns(headers)
+    assert set(mapping.missing) == {"full_name", "mobile"}
+    assert set(mapping.unused) == {"Name", "Mobile Number"}
+
+    # A lower threshold takes them
+    mapping = match_columns(headers, threshold=65)
+    matched = {key: header for key, header, _ in mapping.matches}
+    assert matched["full_name"] == "Name"
+    assert matched["mobile"] == "Mobile Number"
+
+
+def test_export_with_headers():
+    df, mapping = load_export(tsv(ROWS, list(FORM_HEADERS)), "export.tsv")
+    assert not mapping.positional
+    assert [row for _, row in iter_rows(df)] == ROWS
+    assert [number for number, _ in iter_rows(df)] == [2, 3, 4]
+
+
+def test_export_without_a_header_row_keeps_its_first_row():
+    df, mapping = load_export(tsv(ROWS), "export.tsv")
+    assert mapping.positional
+    assert [row for _, row in iter_rows(df)] == ROWS
+    # Row numbers are the sheet's own, starting at 1
+    assert [number for number, _ in iter_rows(df)] == [1, 2, 3]
@@ -0,0 +1,101 @@
+"""validate_export: each rule, and which problems reject an applicant"""
+from datetime import date
+
+import pandas as pd
+
+from benchmarks.synthetic import make_rows
+from cit_profile.fields import FORM_FIELDS
+from cit_profile.validation import validate_export
+
+TODAY = date(2026, 10, 1)
+BASE = {
+    **dict(zip(FORM_FIELDS, make_rows(1)[0][1])),
+    "dob": "19 February 2009",
+    "nic": "",
+    "quran_memorized": "Yes",
+    "juz_count": "30",
+}
+
+
+def validate(**changes):
+    return validate_export(pd.DataFrame([{**BASE, **changes}], columns=list(FORM_FIELDS)), today=TODAY)
+
+
+def issues(result):
+    return [(field, severity) for field, severity in zip(result.issues["field"], result.issues["severity"])]
+
+
+def test_clean_row_passes():
+    result = validate()
+    assert issues(result) == []
+    assert len(result.valid) == 1
+
+
+def test_missing_required_field_rejects_the_row():
+    result = validate(parent_name="")
+    assert issues(result) == [("parent_name", "error")]
+    assert result.rejected.tolist() == [True]
+    assert result.error_rows() == [{"row": 2, "full_name": BASE["full_name"], "error": "parent_name: required"}]
+
+
+def test_choices_are_checked():
+    assert issues(validate(father_residing="Abroad")) == [("father_residing", "error")]
+
+
+def test_phone_numbers_are_normalized():
+    for entered, expected in [("077 222 6866", "0772226866"), ("+94 77 222 6866", "0772226866"),
+                              ("0094772226866", "0772226866"), ("772226866", "0772226866"),
+                              ("+44 20 7946 0958", "+442079460958")]:
+        result = validate(mobile=entered)
+        assert issues(result) == []
+        assert result.df.loc[0, "mobile"] == expected
+
+
+def test_bad_required_phone_rejects_the_row():
+    result = validate(parent_mobile="077 222")
+    assert issues(result) == [("parent_mobile", "error")]
+    assert result.rejected.tolist() == [True]
+
+
+def test_bad_optional_phone_is_only_a_warning():
+    result = validate(parent_whatsapp="077-22-686")
+    assert issues(result) == [("parent_whatsapp", "warning")]
+    assert result.rejected.tolist() == [False]
+    assert result.df.loc[0, "parent_whatsapp"] == "077-22-686"
+
+
+def test_dates_are_normalized():
+    for entered in ("19/02/2009", "2009-02-19", "19 Feb 2009"):
+        result = validate(dob=entered)
+        assert issues(result) == []
+        assert result.df.loc[0, "dob"] == "19 February 2009"
+
+
+def test_bad_dates_reject_the_row():
+    assert issues(validate(dob="sometime in 2009")) == [("dob", "error")]
+    assert issues(validate(dob="19 February 2024")) == [("dob", "error")]   # 2 years old
+    assert issues(validate(dob="19 February 1900")) == [("dob", "error")]
+
+
+def test_nic_numbers():
+    assert issues(validate(nic="200905012345")) == []
+    assert issues(validate(nic="995012345v", dob="19 February 1999")) == []
+    assert validate(nic="995012345v", dob="19 February 1999").df.loc[0, "nic"] == "995012345V"
+
+    # Another year than the date of birth
+    assert issues(validate(nic="201005012345")) == [("nic", "warning")]
+
+    # The NIC is optional, so a malformed one does not reject the applicant
+    result = validate(nic="20090501234")
+    assert issues(result) == [("nic", "warning")]
+    assert result.rejected.tolist() == [False]
+
+
+def test_juz_count_is_range_checked_where_it_applies():
+    assert issues(validate(juz_count="31")) == [("juz_count", "error")]
+    assert issues(validate(juz_count="many")) == [("juz_count", "error")]
+
+    # Not memorized: whatever was entered is ignored, with a warning
+    result = validate(quran_memorized="No", juz_count="31")
+    assert issues(result) == [("juz_count", "warning")]
+    assert result.df.loc[0, "juz_count"] == ""